@@ -0,0 +1,52 @@
+"""add composite and partial indexes for the hot filters
+
+Revision ID: 3b8e41d7a2c9
+Revises: c15b6b92109f
+Create Date: 2026-10-18 11:03:27.540981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e41d7a2c9'
+down_revision: Union[str, Sequence[str], None] = 'c15b6b92109f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial-index predicate)
+INDEXES = [
+    ('ix_contracts_buyer_id_status', 'contracts', ['buyer_id', 'status'], None),
+    ('ix_contracts_farmer_id_status', 'contracts', ['farmer_id', 'status'], None),
+    ('ix_contracts_listing_id_status', 'contracts', ['listing_id', 'status'], None),
+    ('ix_transactions_contract_id_created_at', 'transactions', ['contract_id', 'created_at'], None),
+    ('ix_transactions_wallet_id_created_at', 'transactions', ['wallet_id', 'created_at'], None),
+    ('ix_milestones_contract_id_created_at', 'milestones', ['contract_id', 'created_at'], None),
+    ('ix_negotiation_messages_contract_id_created_at', 'negotiation_messages', ['contract_id', 'created_at'], None),
+    ('ix_crop_lists_farmer_id', 'crop_lists', ['farmer_id'], None),
+    ('ix_crop_lists_status', 'crop_lists', ['status'], None),
+    ('ix_crop_lists_active_created_at', 'crop_lists', ['created_at'], "status = 'active'"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY avoids locking writes on live tables, but cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _where in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,43 @@
+"""add template_recommendation_cache table
+
+Revision ID: 5a9c2e7f4b13
+Revises: e4a17c3b9d05
+Create Date: 2026-10-18 16:48:12.604928
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9c2e7f4b13'
+down_revision: Union[str, Sequence[str], None] = 'e4a17c3b9d05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'template_recommendation_cache',
+        sa.Column('fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('features', sa.Text(), nullable=False),
+        sa.Column('template_name', sa.String(), nullable=False),
+        sa.Column('reason', sa.Text(), nullable=True),
+        sa.Column('hit_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('fingerprint'),
+    )
+    op.create_index('ix_template_recommendation_cache_last_used_at', 'template_recommendation_cache', ['last_used_at'])
+    op.create_index('ix_template_recommendation_cache_expires_at', 'template_recommendation_cache', ['expires_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_template_recommendation_cache_expires_at', table_name='template_recommendation_cache')
+    op.drop_index('ix_template_recommendation_cache_last_used_at', table_name='template_recommendation_cache')
+    op.drop_table('template_recommendation_cache')
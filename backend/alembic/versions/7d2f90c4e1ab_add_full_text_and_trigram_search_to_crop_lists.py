@@ -0,0 +1,64 @@
+"""add full-text and trigram search to crop_lists
+
+Revision ID: 7d2f90c4e1ab
+Revises: 3b8e41d7a2c9
+Create Date: 2026-10-18 13:41:09.872315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f90c4e1ab'
+down_revision: Union[str, Sequence[str], None] = '3b8e41d7a2c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(crop_type, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(farming_practice, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(location, '')), 'C')"
+)
+
+TRIGRAM_COLUMNS = ['crop_type', 'location', 'farming_practice']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('crop_lists', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)
+    ))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_crop_lists_search_vector', 'crop_lists', ['search_vector'],
+            postgresql_using='gin', postgresql_concurrently=True,
+        )
+        for column in TRIGRAM_COLUMNS:
+            op.create_index(
+                f'ix_crop_lists_{column}_trgm', 'crop_lists', [column],
+                postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+        # Soil type is stored as entered; the search filter compares lower(soil_type)
+        op.create_index(
+            'ix_crop_lists_soil_type_lower', 'crop_lists', [sa.text('lower(soil_type)')],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_crop_lists_soil_type_lower', table_name='crop_lists', postgresql_concurrently=True)
+        for column in reversed(TRIGRAM_COLUMNS):
+            op.drop_index(f'ix_crop_lists_{column}_trgm', table_name='crop_lists', postgresql_concurrently=True)
+        op.drop_index('ix_crop_lists_search_vector', table_name='crop_lists', postgresql_concurrently=True)
+    op.drop_column('crop_lists', 'search_vector')
+    # pg_trgm is left installed; other objects may depend on it.
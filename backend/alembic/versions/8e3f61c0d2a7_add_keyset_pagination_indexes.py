@@ -0,0 +1,40 @@
+"""add (created_at, id) indexes for keyset-paginated lists
+
+Revision ID: 8e3f61c0d2a7
+Revises: 5a9c2e7f4b13
+Create Date: 2026-10-18 19:12:40.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3f61c0d2a7'
+down_revision: Union[str, Sequence[str], None] = '5a9c2e7f4b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns): each matches a list endpoint's filter and its (created_at, id) page order
+INDEXES = [
+    ('ix_users_created_at_id', 'users', ['created_at', 'id']),
+    ('ix_contracts_buyer_id_created_at_id', 'contracts', ['buyer_id', 'created_at', 'id']),
+    ('ix_forum_posts_created_at_id', 'forum_posts', ['created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY avoids locking writes on live tables, but cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
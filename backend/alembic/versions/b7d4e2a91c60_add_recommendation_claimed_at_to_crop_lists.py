@@ -0,0 +1,28 @@
+"""add recommendation_claimed_at to crop_lists
+
+Revision ID: b7d4e2a91c60
+Revises: 8e3f61c0d2a7
+Create Date: 2026-10-18 19:40:05.772914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d4e2a91c60'
+down_revision: Union[str, Sequence[str], None] = '8e3f61c0d2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('crop_lists', sa.Column('recommendation_claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('crop_lists', 'recommendation_claimed_at')
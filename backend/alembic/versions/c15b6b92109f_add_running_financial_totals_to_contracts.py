@@ -0,0 +1,46 @@
+"""add running escrow/release totals to contracts
+
+Revision ID: c15b6b92109f
+Revises: ad5d790fad8f
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c15b6b92109f'
+down_revision: Union[str, Sequence[str], None] = 'ad5d790fad8f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contracts', sa.Column('escrow_total', sa.Numeric(12, 2), server_default='0', nullable=False))
+    op.add_column('contracts', sa.Column('released_total', sa.Numeric(12, 2), server_default='0', nullable=False))
+
+    # Backfill the totals from the existing transaction ledger.
+    op.execute("""
+        UPDATE contracts AS c
+        SET escrow_total = t.escrowed,
+            released_total = t.released
+        FROM (
+            SELECT contract_id,
+                   COALESCE(SUM(amount) FILTER (WHERE type = 'escrow'), 0) AS escrowed,
+                   COALESCE(SUM(amount) FILTER (WHERE type = 'release'), 0) AS released
+            FROM transactions
+            WHERE contract_id IS NOT NULL
+            GROUP BY contract_id
+        ) AS t
+        WHERE c.id = t.contract_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('contracts', 'released_total')
+    op.drop_column('contracts', 'escrow_total')
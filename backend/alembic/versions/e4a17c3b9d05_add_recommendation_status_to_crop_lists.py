@@ -0,0 +1,30 @@
+"""add recommendation_status to crop_lists
+
+Revision ID: e4a17c3b9d05
+Revises: 7d2f90c4e1ab
+Create Date: 2026-10-18 15:22:51.306447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a17c3b9d05'
+down_revision: Union[str, Sequence[str], None] = '7d2f90c4e1ab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('crop_lists', sa.Column('recommendation_status', sa.String(), server_default='pending', nullable=False))
+    # Listings created before the background worker already carry their recommendation.
+    op.execute("UPDATE crop_lists SET recommendation_status = 'ready' WHERE recommended_template_name IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('crop_lists', 'recommendation_status')
@@ -1,10 +1,27 @@
+import os
 from passlib.context import CryptContext # type: ignore
 
+from helpers.bounded_executor import BoundedExecutor
+
 pwd_cxt = CryptContext(schemes=["bcrypt"], deprecated = "auto")
 
+# bcrypt releases the GIL while hashing, so a small dedicated thread pool is enough
+# to keep login bursts off the threadpool that serves the DB routes.
+hash_executor = BoundedExecutor(
+    "password-hash",
+    max_workers=int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_pending=int(os.getenv("HASH_MAX_PENDING", "64")),
+)
+
 class Hash():
     def bcrypt(password : str):
         return pwd_cxt.hash(password)
-    
+
     def verify (plain_pass: str, hashed_pass: str):
         return pwd_cxt.verify(plain_pass, hashed_pass)
+
+    async def bcrypt_async(password: str):
+        return await hash_executor.run(pwd_cxt.hash, password)
+
+    async def verify_async(plain_pass: str, hashed_pass: str):
+        return await hash_executor.run(pwd_cxt.verify, plain_pass, hashed_pass)
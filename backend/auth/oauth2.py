@@ -1,17 +1,83 @@
 #auth/oauth2.py
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi import Depends, FastAPI, HTTPException, status
+from sqlalchemy.orm import Session, selectinload
+import os
 
 from auth import token
+from database.postgresConn import get_db, SessionLocal
+from models.all_model import User as UserModel, CropList as CropListModel
+from schemas.all_schema import CurrentUser, UserResponse
+from helpers.ttl_cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-def get_current_user(data: str = Depends(oauth2_scheme)):
-    # print("Raw token received:", data) 
-    credentials_exception = HTTPException(
+# Short-lived cache of resolved users, keyed by ("id", user_id) or ("email", email).
+# Entries are detached snapshots (Pydantic models), never live ORM rows.
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_MAXSIZE", "2048")),
+    ttl=float(os.getenv("USER_CACHE_TTL_SECONDS", "30")),
+)
+
+def evict_cached_user(user_id: int, email: str | None = None):
+    """Drops cached snapshots for a user. Call after any write that changes what /me returns."""
+    user_cache.pop(("id", user_id))
+    if email:
+        user_cache.pop(("email", email))
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    return token.verify_token(data, credentials_exception)
+def get_current_user(data: str = Depends(oauth2_scheme)) -> CurrentUser:
+    """Resolves the caller from the verified JWT claims, without touching the database."""
+    # print("Raw token received:", data) 
+    credentials_exception = _credentials_exception()
+
+    token_data = token.verify_token(data, credentials_exception)
+    if token_data.user_id is not None and token_data.role:
+        return CurrentUser(id=token_data.user_id, email=token_data.username, role=token_data.role)
+
+    # Tokens issued before identity claims were added only carry 'sub'; resolve those from the DB (cached).
+    principal = user_cache.get(("email", token_data.username))
+    if principal is None:
+        with SessionLocal() as db:
+            user = db.query(UserModel).filter(UserModel.email == token_data.username).first()
+            if not user:
+                raise credentials_exception
+            principal = CurrentUser(id=user.id, email=user.email, role=user.role.value)
+        user_cache.set(("email", token_data.username), principal)
+    return principal
+
+def get_current_user_model(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> UserModel:
+    """Loads the full User row, for the few routes that need more than id and role."""
+    user = db.get(UserModel, current_user.id)
+    if not user:
+        raise _credentials_exception()
+    return user
+
+def get_current_user_snapshot(current_user: CurrentUser = Depends(get_current_user)) -> UserResponse:
+    """
+    Read-only profile of the current user, served from the user cache.
+    Only a miss opens a session, so dashboard polling of /me stays off the users table.
+    """
+    snapshot = user_cache.get(("id", current_user.id))
+    if snapshot is None:
+        with SessionLocal() as db:
+            user = (
+                db.query(UserModel)
+                .options(selectinload(UserModel.lists).selectinload(CropListModel.farmer))
+                .filter(UserModel.id == current_user.id)
+                .first()
+            )
+            if not user:
+                raise _credentials_exception()
+            snapshot = UserResponse.model_validate(user)
+        user_cache.set(("id", current_user.id), snapshot)
+    return snapshot
@@ -23,6 +23,13 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_user_access_token(user, expires_delta: timedelta | None = None):
+    """Issues a token carrying the identity claims that get_current_user reads, so routes need no user lookup."""
+    return create_access_token(
+        data={"sub": user.email, "user_id": user.id, "role": user.role.value},
+        expires_delta=expires_delta
+    )
+
 def verify_token(token: str, credential_exception):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -30,7 +37,7 @@ def verify_token(token: str, credential_exception):
         username = payload.get("sub")
         if username is None:
             raise credential_exception
-        token_data = TokenData(username=username) 
+        token_data = TokenData(username=username, user_id=payload.get("user_id"), role=payload.get("role"))
     except JWTError as e:
         print("JWT error:", e)
         raise credential_exception
@@ -0,0 +1,118 @@
+# benchmarks/batching_throughput_benchmark.py
+"""
+Throughput of the disease-model micro-batcher (images/sec) for different max
+batch sizes on CPU. For each batch size, many concurrent clients submit the
+same upload through a MicroBatcher. The benchmark reports images/sec, latency
+and the batch sizes that actually formed.
+
+By default the model is a synthetic stand-in: a two-layer dense network over
+the preprocessed image. Its forward pass, like a CNN's, gets cheaper per image
+as the batch grows. Pass --model cotton or --model tomato to use a real
+model (needs TensorFlow).
+
+    python -m benchmarks.batching_throughput_benchmark --batch-sizes 1,2,4,8,16,32 --clients 32
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from benchmarks.inference_concurrency_benchmark import _sample_jpeg
+from helpers.bounded_executor import BoundedExecutor
+from services.disease_model_base import DiseaseModel
+from services.micro_batcher import MicroBatcher
+
+
+class SyntheticDiseaseModel(DiseaseModel):
+    _labels = [f"class {i}" for i in range(10)]
+
+    def __init__(self, hidden: int = 2048):
+        rng = np.random.default_rng(0)
+        self._w1 = (rng.standard_normal((224 * 224 * 3 // 16, hidden)) / 100).astype(np.float32)
+        self._w2 = rng.standard_normal((hidden, len(self._labels))).astype(np.float32)
+        super().__init__("synthetic", "synthetic")
+
+    def _load_model(self):
+        pass
+
+    def predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        features = batch.reshape(len(batch), -1)[:, ::16]
+        logits = np.tanh(features @ self._w1) @ self._w2
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+def _load(name: str | None, hidden: int):
+    if name:
+        from services.model_registry import model_registry
+        return model_registry.load(name)
+    return SyntheticDiseaseModel(hidden)
+
+
+async def run_batch_size(model, batch_size: int, args, image: bytes) -> tuple[float, dict]:
+    executor = BoundedExecutor("bench-preprocess", max_workers=args.workers, max_pending=args.clients * 2)
+    batcher = MicroBatcher("bench", model, executor, max_batch_size=batch_size,
+                           max_wait_ms=args.max_wait_ms, max_queue=args.clients * 2)
+    latencies = []
+    remaining = args.images
+
+    async def client():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            await batcher.predict(image)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.clients)))
+    elapsed = time.perf_counter() - started
+    stats = batcher.stats()
+    await batcher.stop()
+    executor.shutdown()
+
+    latencies.sort()
+    return len(latencies) / elapsed, {
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "avg_batch": stats["avg_batch_size"],
+        "forward_ms": stats["avg_forward_ms"],
+    }
+
+
+async def run(args):
+    model = _load(args.model, args.hidden)
+    image = _sample_jpeg(args.image_size)
+    # Unbatched baseline: one predict_disease call after another, as before batching
+    model.predict_disease(image)
+    started = time.perf_counter()
+    for _ in range(min(args.images, 100)):
+        model.predict_disease(image)
+    baseline = min(args.images, 100) / (time.perf_counter() - started)
+    print(f"unbatched sequential: {baseline:8.1f} images/s")
+
+    print(f"{'max batch':>9} {'images/s':>9} {'avg batch':>9} {'forward ms':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for batch_size in args.batch_sizes:
+        throughput, s = await run_batch_size(model, batch_size, args, image)
+        print(f"{batch_size:>9} {throughput:>9.1f} {s['avg_batch']:>9.2f} {s['forward_ms']:>10.2f} "
+              f"{s['p50_ms']:>8.1f} {s['p99_ms']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=lambda v: [int(x) for x in v.split(",")], default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--clients", type=int, default=32, help="concurrent uploaders")
+    parser.add_argument("--images", type=int, default=1000, help="images per batch size")
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="preprocessing threads")
+    parser.add_argument("--image-size", type=int, default=256, help="side of the uploaded JPEG")
+    parser.add_argument("--hidden", type=int, default=2048, help="hidden width of the synthetic model")
+    parser.add_argument("--model", choices=["cotton", "tomato"], help="use a real model instead of the synthetic one")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
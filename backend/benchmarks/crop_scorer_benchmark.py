@@ -0,0 +1,96 @@
+# benchmarks/crop_scorer_benchmark.py
+"""
+Compares the per-crop Python scorer (score_crop_rule_based over every crop,
+then a full sort) with the vectorized CropCatalogue (one NumPy pass plus
+argpartition top-k) on catalogues of synthetic crop varieties. Before timing,
+it checks that both give the same scores and the same top-k.
+
+    python -m benchmarks.crop_scorer_benchmark --sizes 5 100 1000 10000 --queries 200
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from services.crop_recommender import CROP_DATA, score_crop_rule_based
+from services.crop_scorer import CropCatalogue
+
+KEYS = ("nitrogen", "phosphorus", "potassium", "pH", "temperature", "rainfall", "water_available_liters", "area_hectares")
+
+
+def _variety(base: dict, n: int, rng: random.Random) -> dict:
+    def jitter(value):
+        if isinstance(value, list):
+            low, high = sorted(jitter(v) for v in value)
+            return [low, high]
+        return round(value * rng.uniform(0.7, 1.3), 2)
+
+    ideal = {key: jitter(value) for key, value in base["ideal"].items()}
+    ideal["min_temp"], ideal["max_temp"] = sorted((ideal["min_temp"], ideal["max_temp"]))
+    # Some varieties lack data, which must score 0 for that parameter
+    if rng.random() < 0.05:
+        ideal.pop(rng.choice(list(ideal)))
+    return {"name": f"{base['name']} #{n}", "ideal": ideal, "notes": base.get("notes", "")}
+
+
+def _catalogue(size: int, rng: random.Random) -> list[dict]:
+    return [_variety(CROP_DATA[i % len(CROP_DATA)], i, rng) for i in range(size)]
+
+
+def _params(rng: random.Random) -> dict:
+    params = {
+        "nitrogen": rng.uniform(0, 250), "phosphorus": rng.uniform(0, 100), "potassium": rng.uniform(0, 200),
+        "pH": rng.uniform(4.5, 9), "temperature": rng.uniform(0, 45), "rainfall": rng.uniform(0, 3000),
+        "water_available_liters": rng.uniform(0, 40000), "area_hectares": rng.choice([None, 0.5, 1, 4]),
+    }
+    for key in rng.sample(KEYS, rng.randint(0, 2)):
+        params[key] = None
+    return params
+
+
+def _legacy_top_k(crops: list[dict], params: dict, k: int) -> list[tuple[str, float]]:
+    scored = [(crop["name"], round(score_crop_rule_based(crop, params), 3)) for crop in crops]
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:k]
+
+
+def _time(fn, queries) -> float:
+    started = time.perf_counter()
+    for params in queries:
+        fn(params)
+    return (time.perf_counter() - started) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    for size in args.sizes:
+        crops = _catalogue(size, rng)
+        queries = [_params(rng) for _ in range(args.queries)]
+        compile_started = time.perf_counter()
+        catalogue = CropCatalogue(crops)
+        compile_ms = (time.perf_counter() - compile_started) * 1000
+
+        max_diff, mismatches = 0.0, 0
+        for params in queries[:50]:
+            expected = np.array([score_crop_rule_based(crop, params) for crop in crops])
+            max_diff = max(max_diff, float(np.abs(catalogue.scores(params) - expected).max()))
+            fast = [(crops[i]["name"], score) for i, score in catalogue.top_k(params, args.top_k)]
+            mismatches += fast != _legacy_top_k(crops, params, args.top_k)
+
+        legacy = _time(lambda p: _legacy_top_k(crops, p, args.top_k), queries)
+        vectorized = _time(lambda p: catalogue.top_k(p, args.top_k), queries)
+        print(f"{size:>6} crops  legacy {legacy * 1000:8.3f} ms  vectorized {vectorized * 1000:7.3f} ms  "
+              f"x{legacy / vectorized:6.1f}  compile {compile_ms:6.1f} ms  "
+              f"max |diff| {max_diff:.1e}  top-{args.top_k} mismatches {mismatches}/50")
+
+
+if __name__ == "__main__":
+    main()
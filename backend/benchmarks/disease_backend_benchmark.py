@@ -0,0 +1,92 @@
+# benchmarks/disease_backend_benchmark.py
+"""
+Latency, memory and throughput of each disease-model backend (keras, tflite,
+tflite-int8). Each backend runs in its own process so the RSS numbers are
+not mixed up. The benchmark reports load time, RSS after loading and after
+inference, single-image latency (p50/p99) and batched throughput.
+
+    python -m benchmarks.disease_backend_benchmark --model tomato --backends keras,tflite,tflite-int8
+"""
+
+import argparse
+import multiprocessing
+import resource
+import time
+
+from benchmarks.disease_backend_validation import load_sample_images
+from services.image_preprocessing import to_float_batch
+
+
+def _rss_mb() -> float:
+    # Linux reports ru_maxrss in KiB; this is the peak, which is what sizing cares about
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(model_name: str, backend: str, args, results):
+    from services.model_registry import model_registry
+
+    baseline_rss = _rss_mb()
+    started = time.perf_counter()
+    model = model_registry.model_class(model_name)(backend=backend)
+    load_seconds = time.perf_counter() - started
+    loaded_rss = _rss_mb()
+
+    images = [data for _, data in load_sample_images(args.images, args.samples)]
+    arrays = [model.preprocess(data) for data in images]
+    single = [to_float_batch([array]) for array in arrays]
+    batch = to_float_batch((arrays * (args.batch_size // len(arrays) + 1))[:args.batch_size])
+
+    for x in single[:5]:
+        model.predict_batch(x)
+    latencies = []
+    for x in single:
+        t = time.perf_counter()
+        model.predict_batch(x)
+        latencies.append(time.perf_counter() - t)
+    latencies.sort()
+
+    model.predict_batch(batch)
+    t = time.perf_counter()
+    for _ in range(args.batch_rounds):
+        model.predict_batch(batch)
+    throughput = args.batch_rounds * args.batch_size / (time.perf_counter() - t)
+
+    results.put({
+        "backend": backend,
+        "load_s": load_seconds,
+        "rss_loaded_mb": loaded_rss - baseline_rss,
+        "rss_peak_mb": _rss_mb(),
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000,
+        "images_per_s": throughput,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", choices=["cotton", "tomato"], required=True)
+    parser.add_argument("--backends", default="keras,tflite,tflite-int8")
+    parser.add_argument("--images", help="directory of sample leaf photos")
+    parser.add_argument("--samples", type=int, default=50, help="images for the single-image latency run")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--batch-rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    # A fresh interpreter per backend, so one backend's allocations do not count against the next
+    context = multiprocessing.get_context("spawn")
+    print(f"{'backend':>12} {'load s':>7} {'+RSS MB':>8} {'peak MB':>8} {'p50 ms':>7} {'p99 ms':>7} {'images/s':>9}")
+    for backend in args.backends.split(","):
+        results = context.Queue()
+        process = context.Process(target=_measure, args=(args.model, backend, args, results))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            print(f"{backend:>12} failed (exit code {process.exitcode})")
+            continue
+        r = results.get()
+        print(f"{r['backend']:>12} {r['load_s']:>7.2f} {r['rss_loaded_mb']:>8.0f} {r['rss_peak_mb']:>8.0f} "
+              f"{r['p50_ms']:>7.2f} {r['p99_ms']:>7.2f} {r['images_per_s']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/disease_backend_validation.py
+"""
+Checks that an optimized disease-model backend (TFLite, TFLite int8) agrees
+with the original Keras model. Every sample image is run through both. The
+harness reports top-1 agreement and the largest score difference, lists the
+images that disagree, and exits non-zero when agreement is below
+--min-agreement. Run it on real leaf photos before switching
+DISEASE_MODEL_BACKEND in production.
+
+    python -m benchmarks.disease_backend_validation --model cotton --backend tflite-int8 --images ./leaf_photos
+"""
+
+import argparse
+import glob
+import io
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+from services.image_preprocessing import to_float_batch
+from services.inference_backends import BACKENDS
+from services.model_registry import model_registry
+
+
+def load_sample_images(directory: str | None, count: int) -> list[tuple[str, bytes]]:
+    """Up to `count` JPEG/PNG files from a directory, or random images when none is given."""
+    if directory:
+        paths = sorted(
+            path for pattern in ("*.jpg", "*.jpeg", "*.png", "*.JPG", "*.JPEG", "*.PNG")
+            for path in glob.glob(os.path.join(directory, "**", pattern), recursive=True)
+        )[:count]
+        if not paths:
+            sys.exit(f"No images found under {directory}")
+        images = []
+        for path in paths:
+            with open(path, "rb") as f:
+                images.append((os.path.relpath(path, directory), f.read()))
+        return images
+
+    print("No --images directory given: using random images, which says little about real accuracy.")
+    rng = np.random.default_rng(0)
+    images = []
+    for i in range(count):
+        pixels = rng.integers(0, 256, (320, 320, 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format="JPEG", quality=90)
+        images.append((f"random-{i}.jpg", buffer.getvalue()))
+    return images
+
+
+def compare(reference, candidate, images: list[tuple[str, bytes]], batch_size: int) -> dict:
+    agree = 0
+    max_diff = 0.0
+    disagreements = []
+    for start in range(0, len(images), batch_size):
+        chunk = images[start:start + batch_size]
+        batch = to_float_batch([reference.preprocess(data) for _, data in chunk])
+        expected = reference.predict_batch(batch)
+        actual = candidate.predict_batch(batch)
+        max_diff = max(max_diff, float(np.abs(expected - actual).max()))
+        for (name, _), exp_row, act_row in zip(chunk, expected, actual):
+            if int(np.argmax(exp_row)) == int(np.argmax(act_row)):
+                agree += 1
+            else:
+                disagreements.append((name, int(np.argmax(exp_row)), int(np.argmax(act_row))))
+    return {"agreement": agree / len(images), "max_abs_diff": max_diff, "disagreements": disagreements}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", choices=["cotton", "tomato"], required=True)
+    parser.add_argument("--backend", choices=[b for b in BACKENDS if b != "keras"], default="tflite-int8")
+    parser.add_argument("--images", help="directory of sample leaf photos (searched recursively)")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--min-agreement", type=float, default=0.98)
+    args = parser.parse_args()
+
+    model_class = model_registry.model_class(args.model)
+    reference = model_class(backend="keras")
+    candidate = model_class(backend=args.backend)
+    images = load_sample_images(args.images, args.samples)
+
+    result = compare(reference, candidate, images, args.batch_size)
+    labels = reference._labels
+    print(f"{args.model}: {args.backend} vs keras on {len(images)} images")
+    print(f"  top-1 agreement {result['agreement']:.2%}, max |score difference| {result['max_abs_diff']:.4f}")
+    for name, expected, actual in result["disagreements"][:20]:
+        print(f"  {name}: keras {labels[expected]!r}, {args.backend} {labels[actual]!r}")
+    if result["agreement"] < args.min_agreement:
+        sys.exit(f"Agreement {result['agreement']:.2%} is below the required {args.min_agreement:.2%}")
+
+
+if __name__ == "__main__":
+    main()
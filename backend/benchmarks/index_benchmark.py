@@ -0,0 +1,237 @@
+# benchmarks/index_benchmark.py
+"""
+Seeds a throwaway Postgres schema with a large synthetic dataset and reports the
+plan and latency of the app's hot filters without, then with, the composite and
+partial indexes declared in models/all_model.py.
+
+    python -m benchmarks.index_benchmark --scale 1.0 --runs 7
+
+Needs DATABASE_URL to point at Postgres. Everything lives in its own schema,
+which is dropped at the end, so it can be pointed at a dev database.
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+from database.postgresConn import engine, Base
+from models import all_model  # noqa: F401  (registers the tables on Base)
+
+SCHEMA = "index_benchmark"
+
+# The indexes under test, as declared on the models
+BENCHMARKED_INDEXES = [
+    "ix_contracts_buyer_id_status",
+    "ix_contracts_farmer_id_status",
+    "ix_contracts_listing_id_status",
+    "ix_transactions_contract_id_created_at",
+    "ix_transactions_wallet_id_created_at",
+    "ix_milestones_contract_id_created_at",
+    "ix_negotiation_messages_contract_id_created_at",
+    "ix_crop_lists_farmer_id",
+    "ix_crop_lists_status",
+    "ix_crop_lists_active_created_at",
+]
+
+# Mirrors the filters the routers issue; ids are picked inside the seeded ranges.
+QUERIES = {
+    "buyer ongoing contracts": (
+        "SELECT * FROM contracts WHERE buyer_id = :buyer_id AND status = 'ongoing'"
+    ),
+    "farmer pending proposals": (
+        "SELECT * FROM contracts WHERE farmer_id = :farmer_id AND status = 'pending_farmer_approval'"
+    ),
+    "listing pending proposals": (
+        "SELECT * FROM contracts WHERE listing_id = :listing_id AND status = 'pending_farmer_approval'"
+    ),
+    "contract ledger": (
+        "SELECT * FROM transactions WHERE contract_id = :contract_id ORDER BY created_at"
+    ),
+    "wallet history": (
+        "SELECT * FROM transactions WHERE wallet_id = :wallet_id ORDER BY created_at DESC"
+    ),
+    "contract milestones": (
+        "SELECT * FROM milestones WHERE contract_id = :contract_id ORDER BY created_at"
+    ),
+    "negotiation history": (
+        "SELECT * FROM negotiation_messages WHERE contract_id = :contract_id ORDER BY created_at"
+    ),
+    "farmer listings": (
+        "SELECT * FROM crop_lists WHERE farmer_id = :farmer_id"
+    ),
+    "active listings page": (
+        "SELECT * FROM crop_lists WHERE status = 'active' ORDER BY created_at DESC LIMIT 50"
+    ),
+}
+
+CONTRACT_STATUSES = [status.value for status in all_model.ContractStatus]
+
+
+def _sizes(scale: float) -> dict:
+    return {
+        "users": int(20_000 * scale),
+        "listings": int(50_000 * scale),
+        "contracts": int(200_000 * scale),
+        "transactions": int(500_000 * scale),
+        "milestones": int(300_000 * scale),
+        "messages": int(300_000 * scale),
+    }
+
+
+def _benchmarked_indexes():
+    wanted = set(BENCHMARKED_INDEXES)
+    return [
+        index
+        for table in Base.metadata.sorted_tables
+        for index in table.indexes
+        if index.name in wanted
+    ]
+
+
+def _seed(conn, sizes: dict):
+    """Bulk-loads synthetic rows with generate_series; buyers take the lower half of user ids."""
+    half = sizes["users"] // 2
+    statuses = "ARRAY[" + ",".join(f"'{s}'" for s in CONTRACT_STATUSES) + "]"
+    conn.execute(text("SELECT setseed(0.42)"))
+    conn.execute(text("""
+        INSERT INTO users (id, email, hashed_password, full_name, role, created_at)
+        SELECT g, 'user' || g || '@bench.local', 'x', 'User ' || g,
+               (CASE WHEN g <= :half THEN 'buyer' ELSE 'farmer' END)::userrole,
+               now() - (random() * interval '365 days')
+        FROM generate_series(1, :n) AS g
+    """), {"n": sizes["users"], "half": half})
+    conn.execute(text("""
+        INSERT INTO wallets (id, user_id, balance)
+        SELECT g, g, 0 FROM generate_series(1, :n) AS g
+    """), {"n": sizes["users"]})
+    conn.execute(text("""
+        INSERT INTO crop_lists (id, farmer_id, crop_type, quantity, unit, expected_price_per_unit,
+                                harvest_date, location, soil_type, status, created_at)
+        SELECT g, :half + 1 + floor(random() * (:users - :half))::int,
+               (ARRAY['wheat','rice','cotton','tomato','maize'])[1 + floor(random() * 5)::int],
+               100, 'kg', 20, current_date + 30, 'Pune', 'loamy',
+               CASE WHEN random() < 0.2 THEN 'active' ELSE 'sold' END,
+               now() - (random() * interval '365 days')
+        FROM generate_series(1, :n) AS g
+    """), {"n": sizes["listings"], "users": sizes["users"], "half": half})
+    conn.execute(text(f"""
+        INSERT INTO contracts (id, listing_id, buyer_id, farmer_id, quantity_proposed,
+                               price_per_unit_agreed, status, payment_terms, last_offer_by, created_at)
+        SELECT g, l.id, 1 + floor(random() * :half)::int, l.farmer_id, 10, 20,
+               ({statuses})[1 + floor(random() * {len(CONTRACT_STATUSES)})::int]::contractstatus,
+               'final', 'buyer', now() - (random() * interval '365 days')
+        FROM generate_series(1, :n) AS g
+        JOIN crop_lists AS l ON l.id = 1 + (g % :listings)
+    """), {"n": sizes["contracts"], "half": half, "listings": sizes["listings"]})
+    conn.execute(text("""
+        INSERT INTO transactions (wallet_id, contract_id, amount, type, created_at)
+        SELECT 1 + floor(random() * :users)::int, 1 + floor(random() * :contracts)::int, 50,
+               (ARRAY['deposit','escrow','release'])[1 + floor(random() * 3)::int],
+               now() - (random() * interval '365 days')
+        FROM generate_series(1, :n) AS g
+    """), {"n": sizes["transactions"], "users": sizes["users"], "contracts": sizes["contracts"]})
+    conn.execute(text("""
+        INSERT INTO milestones (contract_id, name, amount, is_complete, payment_released, created_at)
+        SELECT 1 + floor(random() * :contracts)::int, 'Milestone ' || g, 50, false, false,
+               now() - (random() * interval '365 days')
+        FROM generate_series(1, :n) AS g
+    """), {"n": sizes["milestones"], "contracts": sizes["contracts"]})
+    conn.execute(text("""
+        INSERT INTO negotiation_messages (contract_id, sender_id, message, proposed_price, created_at)
+        SELECT 1 + floor(random() * :contracts)::int, 1 + floor(random() * :users)::int,
+               'I propose a new price.', 20, now() - (random() * interval '365 days')
+        FROM generate_series(1, :n) AS g
+    """), {"n": sizes["messages"], "contracts": sizes["contracts"], "users": sizes["users"]})
+
+
+def _explain(conn, sql: str, params: dict, runs: int) -> dict:
+    """Runs EXPLAIN ANALYZE `runs` times and keeps the median execution time and the plan shape."""
+    timings = []
+    plan = None
+    for _ in range(runs):
+        row = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar_one()
+        result = row[0] if isinstance(row, list) else json.loads(row)[0]
+        timings.append(result["Execution Time"])
+        plan = result["Plan"]
+    return {"median_ms": statistics.median(timings), "plan": _describe_plan(plan)}
+
+
+def _describe_plan(node: dict) -> str:
+    """Flattens the plan tree into 'Node Type (index)' steps, outermost first."""
+    steps = []
+    while node:
+        label = node["Node Type"]
+        if node.get("Index Name"):
+            label += f" ({node['Index Name']})"
+        steps.append(label)
+        children = node.get("Plans") or []
+        node = children[0] if children else None
+    return " > ".join(steps)
+
+
+def _measure(conn, params: dict, runs: int) -> dict:
+    conn.execute(text("ANALYZE"))
+    return {name: _explain(conn, sql, params, runs) for name, sql in QUERIES.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the default row counts")
+    parser.add_argument("--runs", type=int, default=7, help="EXPLAIN ANALYZE repetitions per query")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("index_benchmark needs DATABASE_URL to point at PostgreSQL.")
+
+    sizes = _sizes(args.scale)
+    half = sizes["users"] // 2
+    params = {
+        "buyer_id": max(1, half // 2),
+        "farmer_id": half + max(1, half // 2),
+        "listing_id": max(1, sizes["listings"] // 2),
+        "contract_id": max(1, sizes["contracts"] // 2),
+        "wallet_id": max(1, sizes["users"] // 2),
+    }
+    indexes = _benchmarked_indexes()
+
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET search_path TO {SCHEMA}"))
+        try:
+            Base.metadata.create_all(conn)
+            for index in indexes:
+                conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+            started = time.perf_counter()
+            _seed(conn, sizes)
+            print(f"Seeded {sizes} in {time.perf_counter() - started:.1f}s")
+
+            before = _measure(conn, params, args.runs)
+
+            started = time.perf_counter()
+            for index in indexes:
+                conn.execute(CreateIndex(index))
+            print(f"Built {len(indexes)} indexes in {time.perf_counter() - started:.1f}s\n")
+
+            after = _measure(conn, params, args.runs)
+        finally:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+    print(f"{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in QUERIES:
+        b, a = before[name]["median_ms"], after[name]["median_ms"]
+        speedup = b / a if a else float("inf")
+        print(f"{name:<28}{b:>12.3f}{a:>12.3f}{speedup:>9.1f}x")
+    print()
+    for name in QUERIES:
+        print(f"{name}\n  before: {before[name]['plan']}\n  after:  {after[name]['plan']}")
+
+
+if __name__ == "__main__":
+    main()
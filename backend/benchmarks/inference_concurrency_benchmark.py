@@ -0,0 +1,160 @@
+# benchmarks/inference_concurrency_benchmark.py
+"""
+Shows how disease predictions affect everything else on the event loop. A
+small FastAPI app gets a steady stream of prediction uploads plus a chat-like
+stream of light async requests. It runs twice: once with predictions called
+inline in the async handler (the old behaviour), and once with them on the
+inference executor. The benchmark reports chat latency, event-loop lag and
+prediction throughput.
+
+By default the prediction is a synthetic CPU-bound stand-in (JPEG decode,
+resize, normalize, matrix multiply), so no TensorFlow install is needed.
+Pass --model cotton or --model tomato to use a real model.
+
+    python -m benchmarks.inference_concurrency_benchmark --seconds 5 --predictors 4
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import time
+
+import httpx
+import numpy as np
+from fastapi import FastAPI, File, UploadFile
+from PIL import Image
+
+from helpers.bounded_executor import BoundedExecutor, ExecutorSaturated
+
+
+def _sample_jpeg(size: int = 1024) -> bytes:
+    pixels = np.random.default_rng(0).integers(0, 256, (size, size, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _synthetic_predictor(work: int):
+    rng = np.random.default_rng(1)
+    projection = rng.standard_normal((224 * 3, work)).astype(np.float32)
+    hidden = (rng.standard_normal((work, work)) / np.sqrt(work)).astype(np.float32)
+
+    def predict_disease(image_bytes: bytes) -> dict:
+        image = Image.open(io.BytesIO(image_bytes)).convert("RGB").resize((224, 224))
+        array = np.asarray(image, dtype=np.float32) / 255.0
+        activations = np.tanh(array.reshape(224, -1) @ projection)
+        for _ in range(4):
+            activations = np.tanh(activations @ hidden)
+        return {"disease": "synthetic", "confidence": float(np.abs(activations).mean())}
+
+    return predict_disease
+
+
+def _real_predictor(name: str):
+    from services.model_registry import model_registry
+    return model_registry.load(name).predict_disease
+
+
+def build_app(predict, executor: BoundedExecutor | None) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/predict")
+    async def predict_route(file: UploadFile = File(...)):
+        image_bytes = await file.read()
+        if executor is None:
+            return predict(image_bytes)
+        try:
+            return await executor.run(predict, image_bytes)
+        except ExecutorSaturated:
+            return {"error": "saturated"}
+
+    @app.post("/chat")
+    async def chat_route(message: dict):
+        # Stands in for a chat message: tiny payload, pure async work
+        await asyncio.sleep(0)
+        return {"echo": message.get("text", "")}
+
+    return app
+
+
+async def _loop_lag(stop: asyncio.Event, interval: float, samples: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - started - interval)
+
+
+async def run_mode(label: str, predict, executor, args, image: bytes):
+    app = build_app(predict, executor)
+    transport = httpx.ASGITransport(app=app)
+    stop = asyncio.Event()
+    chat_latencies, lag, predictions = [], [], []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def predictor():
+            while not stop.is_set():
+                started = time.perf_counter()
+                await client.post("/predict", files={"file": ("leaf.jpg", image, "image/jpeg")})
+                predictions.append(time.perf_counter() - started)
+                # The in-process transport may never suspend; let the other clients in
+                await asyncio.sleep(0)
+
+        async def chatter():
+            while not stop.is_set():
+                started = time.perf_counter()
+                await client.post("/chat", json={"text": "Is the harvest on schedule?"})
+                chat_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(args.chat_interval_ms / 1000)
+
+        tasks = [asyncio.create_task(predictor()) for _ in range(args.predictors)]
+        tasks += [asyncio.create_task(chatter()) for _ in range(args.chatters)]
+        tasks.append(asyncio.create_task(_loop_lag(stop, 0.01, lag)))
+        await asyncio.sleep(args.seconds)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    chat_latencies.sort()
+    lag.sort()
+    p = lambda values, q: values[min(len(values) - 1, int(len(values) * q))] * 1000 if values else 0.0
+    print(f"[{label}]")
+    print(f"  predictions  {len(predictions) / args.seconds:7.1f}/s, p50 {p(sorted(predictions), 0.5):7.1f} ms")
+    print(f"  chat         {len(chat_latencies):5d} requests, p50 {p(chat_latencies, 0.5):7.1f} ms, "
+          f"p99 {p(chat_latencies, 0.99):7.1f} ms, max {p(chat_latencies, 1):7.1f} ms")
+    print(f"  loop lag     p50 {p(lag, 0.5):7.1f} ms, p99 {p(lag, 0.99):7.1f} ms, "
+          f"mean {statistics.fmean(lag) * 1000 if lag else 0.0:7.1f} ms")
+    if executor is not None:
+        stats = executor.stats()
+        print(f"  executor     workers {stats['max_workers']}, avg wait {stats['avg_wait_ms']} ms, "
+              f"avg run {stats['avg_run_ms']} ms, rejected {stats['rejected']}")
+
+
+async def run(args):
+    predict = _real_predictor(args.model) if args.model else _synthetic_predictor(args.work)
+    image = _sample_jpeg()
+    # Warm up (model load, BLAS init) outside the measured window
+    predict(image)
+
+    await run_mode("inline", predict, None, args, image)
+    executor = BoundedExecutor("inference-bench", max_workers=args.workers, max_pending=args.predictors * 2)
+    try:
+        await run_mode(f"executor x{args.workers}", predict, executor, args, image)
+    finally:
+        executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--predictors", type=int, default=4, help="concurrent upload clients")
+    parser.add_argument("--chatters", type=int, default=8, help="concurrent chat clients")
+    parser.add_argument("--chat-interval-ms", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--work", type=int, default=1024, help="size of the synthetic model's matrix")
+    parser.add_argument("--model", choices=["cotton", "tomato"], help="use a real model instead of the synthetic one")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
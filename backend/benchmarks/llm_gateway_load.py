@@ -0,0 +1,87 @@
+# benchmarks/llm_gateway_load.py
+"""
+Load-tests the LLM gateway against the network-free FakeBackend: fires many
+concurrent calls and reports throughput, latency and how the concurrency cap,
+retries and response cache behaved.
+
+    python -m benchmarks.llm_gateway_load --calls 500 --latency-ms 200 --unique 100
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from services.llm_gateway import FakeBackend, LLMGateway
+
+
+class FlakyFakeBackend(FakeBackend):
+    """FakeBackend that fails a fraction of calls, to exercise the retry path."""
+    def __init__(self, latency_ms: float, failure_rate: float):
+        super().__init__(latency_ms=latency_ms)
+        self.failure_rate = failure_rate
+        self.peak_in_flight = 0
+        self._in_flight = 0
+
+    async def generate(self, model, contents, timeout, purpose):
+        self._in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+        try:
+            if random.random() < self.failure_rate:
+                await asyncio.sleep(self.latency_ms / 2000)
+                raise RuntimeError("simulated upstream error")
+            return await super().generate(model, contents, timeout, purpose)
+        finally:
+            self._in_flight -= 1
+
+
+async def run(args):
+    backend = FlakyFakeBackend(latency_ms=args.latency_ms, failure_rate=args.failure_rate)
+    gateway = LLMGateway(
+        backend=backend,
+        max_concurrency=args.concurrency,
+        timeout=10,
+        max_attempts=3,
+        retry_base_delay=0.05,
+        cache_maxsize=4096,
+        cache_ttl=300,
+    )
+    prompts = [f"Summarize contract {random.randrange(args.unique)}" for _ in range(args.calls)]
+
+    latencies = []
+
+    async def one(prompt):
+        started = time.perf_counter()
+        try:
+            await gateway.generate(prompt, purpose="contract_summary")
+        except Exception:
+            pass
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in prompts))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    stats = gateway.stats()
+    purpose = stats["purposes"]["contract_summary"]
+    print(f"{args.calls} calls ({args.unique} distinct prompts) in {elapsed:.2f}s -> {args.calls / elapsed:.1f} calls/s")
+    print(f"latency p50 {statistics.median(latencies) * 1000:.1f} ms, p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+    print(f"peak upstream concurrency {backend.peak_in_flight} (cap {args.concurrency})")
+    print(f"upstream calls {purpose['calls']}, cache hits {purpose['cache_hits']}, coalesced {purpose['coalesced']}, "
+          f"retries {purpose['retries']}, errors {purpose['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--unique", type=int, default=100, help="distinct prompts; repeats hit the cache")
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/preprocessing_benchmark.py
+"""
+Compares the old disease-model preprocessing (full decode, resize, float64
+divide, expand_dims) with services.image_preprocessing (JPEG draft decode,
+reduce-then-resize, uint8 scaled into a reused float32 buffer) on phone-camera
+sized photos. The benchmark reports CPU time per image, a per-stage breakdown
+and peak RSS. Each pipeline runs in its own process so the peaks are
+comparable.
+
+    python -m benchmarks.preprocessing_benchmark --width 4032 --height 3024 --images 30
+"""
+
+import argparse
+import io
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+
+def _phone_photo(width: int, height: int, seed: int) -> bytes:
+    # Smooth gradients plus sensor-like noise compress like a real photo (a few MB at q=92)
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([
+        128 + 100 * np.sin(x / (width / 3) + seed),
+        128 + 100 * np.cos(y / (height / 4)),
+        128 + 60 * np.sin((x + y) / (width / 5)),
+    ], axis=-1)
+    pixels = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def _legacy(image_bytes: bytes) -> np.ndarray:
+    image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    image = image.resize((224, 224))
+    img_array = np.array(image) / 255.0
+    return np.expand_dims(img_array, axis=0)
+
+
+def _current_rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _run(pipeline: str, photos: list[bytes], results):
+    from services.image_preprocessing import BatchBuffer, decode_for_model, preprocessing_stats
+
+    buffer = BatchBuffer(1)
+    # ru_maxrss would include the photos themselves, so sample the live RSS instead
+    baseline_rss = peak_rss = _current_rss_mb()
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak_rss
+        while not done.is_set():
+            peak_rss = max(peak_rss, _current_rss_mb())
+            time.sleep(0.001)
+
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    for photo in photos:
+        if pipeline == "legacy":
+            _legacy(photo)
+        else:
+            buffer.fill([decode_for_model(photo)])
+    cpu = (time.process_time() - cpu_started) / len(photos)
+    wall = (time.perf_counter() - wall_started) / len(photos)
+    done.set()
+    sampler.join()
+    stages = preprocessing_stats.snapshot()["stages"] if pipeline == "fast" else {}
+    results.put({"pipeline": pipeline, "cpu_ms": cpu * 1000, "wall_ms": wall * 1000,
+                 "rss_growth_mb": peak_rss - baseline_rss, "stages": stages})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--images", type=int, default=20)
+    args = parser.parse_args()
+
+    photos = [_phone_photo(args.width, args.height, seed) for seed in range(3)]
+    photos = (photos * (args.images // len(photos) + 1))[:args.images]
+    print(f"{args.images} photos of {args.width}x{args.height}, ~{np.mean([len(p) for p in photos]) / 1e6:.1f} MB each")
+
+    context = multiprocessing.get_context("spawn")
+    for pipeline in ("legacy", "fast"):
+        results = context.Queue()
+        process = context.Process(target=_run, args=(pipeline, photos, results))
+        process.start()
+        r = results.get()
+        process.join()
+        print(f"[{pipeline}] cpu {r['cpu_ms']:.1f} ms/image, wall {r['wall_ms']:.1f} ms/image, "
+              f"peak RSS growth {r['rss_growth_mb']:.0f} MB")
+        for stage, s in r["stages"].items():
+            if s["count"]:
+                print(f"    {stage:<10} avg {s['avg_ms']:7.3f} ms  max {s['max_ms']:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# benchmarks/search_benchmark.py
+"""
+Compares the old ILIKE listing filter with the ranked full-text/trigram search
+on a synthetic marketplace: first without the search indexes, then with them.
+
+    python -m benchmarks.search_benchmark --listings 200000 --runs 7
+
+Needs DATABASE_URL to point at Postgres with pg_trgm available. Runs in its own
+schema, which is dropped at the end.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from datetime import date
+
+from sqlalchemy import select, text
+
+from database.postgresConn import engine, Base
+from models.all_model import CropList as CropListModel
+from helpers.listing_search import SEARCH_INDEX_DDL, ListingSearchFilters, build_search_query
+from benchmarks.index_benchmark import _describe_plan
+
+SCHEMA = "search_benchmark"
+
+CROPS = ["wheat", "rice", "cotton", "tomato", "maize", "soybean", "sugarcane", "onion", "potato", "groundnut"]
+PRACTICES = ["organic", "conventional", "natural farming", "integrated"]
+LOCATIONS = ["Pune", "Nashik", "Nagpur", "Indore", "Ludhiana", "Guntur", "Rajkot", "Belgaum"]
+SOILS = ["black", "red", "alluvial", "laterite", "sandy"]
+
+# (label, free text, filters); misspellings exercise the trigram fallback
+CASES = [
+    ("exact crop", "tomato", ListingSearchFilters()),
+    ("misspelt crop", "tomatto", ListingSearchFilters()),
+    ("crop + practice", "organic wheat", ListingSearchFilters()),
+    ("location + filters", "nashik", ListingSearchFilters(
+        min_price=20, max_price=60, harvest_from=date(2026, 1, 1), harvest_to=date(2026, 6, 30), soil_type="black",
+    )),
+]
+
+
+def _ilike_baseline(term: str):
+    """The pre-search listing filter: substring match on crop type OR location, unranked."""
+    pattern = f"%{term}%"
+    return (
+        select(CropListModel)
+        .where(CropListModel.status == 'active')
+        .where(CropListModel.crop_type.ilike(pattern) | CropListModel.location.ilike(pattern))
+    )
+
+
+def _explain(conn, statement, runs: int) -> dict:
+    """EXPLAIN ANALYZE on the statement exactly as the app would send it, bind parameters included."""
+    compiled = statement.compile(dialect=conn.dialect)
+    timings = []
+    plan = None
+    for _ in range(runs):
+        row = conn.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}", compiled.params
+        ).scalar_one()
+        result = row[0] if isinstance(row, list) else json.loads(row)[0]
+        timings.append(result["Execution Time"])
+        plan = result["Plan"]
+    return {"median_ms": statistics.median(timings), "plan": _describe_plan(plan)}
+
+
+def _seed(conn, listings: int):
+    arr = lambda values: "ARRAY[" + ",".join(f"'{v}'" for v in values) + "]"
+    conn.execute(text("SELECT setseed(0.42)"))
+    conn.execute(text("""
+        INSERT INTO users (id, email, hashed_password, full_name, role)
+        SELECT g, 'farmer' || g || '@bench.local', 'x', 'Farmer ' || g, 'farmer'::userrole
+        FROM generate_series(1, 2000) AS g
+    """))
+    conn.execute(text(f"""
+        INSERT INTO crop_lists (farmer_id, crop_type, quantity, unit, expected_price_per_unit, harvest_date,
+                                location, farming_practice, soil_type, status, created_at)
+        SELECT 1 + floor(random() * 2000)::int,
+               initcap(({arr(CROPS)})[1 + floor(random() * {len(CROPS)})::int]),
+               100, 'kg', round((5 + random() * 95)::numeric, 2),
+               date '2026-01-01' + floor(random() * 365)::int,
+               ({arr(LOCATIONS)})[1 + floor(random() * {len(LOCATIONS)})::int] || ', Maharashtra',
+               ({arr(PRACTICES)})[1 + floor(random() * {len(PRACTICES)})::int],
+               ({arr(SOILS)})[1 + floor(random() * {len(SOILS)})::int],
+               CASE WHEN random() < 0.3 THEN 'active' ELSE 'sold' END,
+               now() - (random() * interval '365 days')
+        FROM generate_series(1, :n) AS g
+    """), {"n": listings})
+
+
+def _measure(conn, runs: int) -> dict:
+    conn.execute(text("ANALYZE crop_lists"))
+    results = {}
+    for label, term, filters in CASES:
+        results[(label, "ilike")] = _explain(conn, _ilike_baseline(term), runs)
+        results[(label, "search")] = _explain(conn, build_search_query(term, filters, limit=50), runs)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=int, default=200_000)
+    parser.add_argument("--runs", type=int, default=7, help="EXPLAIN ANALYZE repetitions per query")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("search_benchmark needs DATABASE_URL to point at PostgreSQL.")
+
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        # Install the extension outside the throwaway schema so dropping it leaves pg_trgm alone.
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+        try:
+            Base.metadata.create_all(conn)
+
+            started = time.perf_counter()
+            _seed(conn, args.listings)
+            print(f"Seeded {args.listings} listings in {time.perf_counter() - started:.1f}s")
+
+            before = _measure(conn, args.runs)
+
+            started = time.perf_counter()
+            for ddl in SEARCH_INDEX_DDL:
+                conn.execute(text(ddl))
+            print(f"Built {len(SEARCH_INDEX_DDL)} search indexes in {time.perf_counter() - started:.1f}s\n")
+
+            after = _measure(conn, args.runs)
+        finally:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+    print(f"{'case':<22}{'query':<8}{'no index ms':>13}{'indexed ms':>12}")
+    for key in before:
+        label, kind = key
+        print(f"{label:<22}{kind:<8}{before[key]['median_ms']:>13.3f}{after[key]['median_ms']:>12.3f}")
+    print()
+    for key in after:
+        print(f"{key[0]} / {key[1]}: {after[key]['plan']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# database/pool.py
+
+import os
+import time
+import logging
+import threading
+from sqlalchemy import event
+
+logger = logging.getLogger("database.pool")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def pool_settings_from_env() -> dict:
+    """
+    Reads the connection pool configuration from the environment.
+    The returned dict can be passed straight into create_engine().
+    """
+    return {
+        "pool_size": _env_int("DB_POOL_SIZE", 5),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_float("DB_POOL_TIMEOUT", 30.0),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+        "pool_use_lifo": _env_bool("DB_POOL_USE_LIFO", False),
+    }
+
+
+# A connection held longer than this (in seconds) is logged as a warning on checkin.
+SLOW_HOLD_WARNING_SECONDS = _env_float("DB_SLOW_HOLD_WARNING_SECONDS", 5.0)
+
+
+class PoolMetrics:
+    """
+    Collects live statistics for a SQLAlchemy connection pool by listening
+    to its checkout/checkin events.
+    """
+    def __init__(self, name: str, slow_hold_seconds: float = SLOW_HOLD_WARNING_SECONDS):
+        self.name = name
+        self.slow_hold_seconds = slow_hold_seconds
+        self._lock = threading.Lock()
+        self._pool = None
+        self.connections_opened = 0
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.slow_holds = 0
+        self.invalidations = 0
+        self.max_hold_seconds = 0.0
+        self.total_hold_seconds = 0.0
+        self.checkins = 0
+        self.waits = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def instrument(self, engine):
+        """Attaches the listeners to the engine's pool, and times every checkout to measure pool waits."""
+        self._pool = engine.pool
+        # The pool has no event before a checkout starts, so wrap connect(): sessions
+        # still take a connection only at their first query, and that wait is what is recorded
+        checkout = engine.pool.connect
+
+        def timed_checkout():
+            started = time.monotonic()
+            try:
+                return checkout()
+            finally:
+                self.record_wait(time.monotonic() - started)
+
+        engine.pool.connect = timed_checkout
+        event.listen(engine.pool, "connect", self._on_connect)
+        event.listen(engine.pool, "checkout", self._on_checkout)
+        event.listen(engine.pool, "checkin", self._on_checkin)
+        event.listen(engine.pool, "invalidate", self._on_invalidate)
+        return engine
+
+    # --- Event handlers ---
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connections_opened += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.monotonic()
+        overflow = self._pool.overflow() if hasattr(self._pool, "overflow") else 0
+        with self._lock:
+            self.checkouts += 1
+            if overflow > 0:
+                self.overflow_events += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is None:
+            return
+        held = time.monotonic() - started
+        with self._lock:
+            self.checkins += 1
+            self.total_hold_seconds += held
+            self.max_hold_seconds = max(self.max_hold_seconds, held)
+            if held > self.slow_hold_seconds:
+                self.slow_holds += 1
+        if held > self.slow_hold_seconds:
+            logger.warning(
+                "[%s] connection held for %.2fs (threshold %.2fs). "
+                "A request is keeping its session open too long.",
+                self.name, held, self.slow_hold_seconds
+            )
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def record_wait(self, seconds: float):
+        """Records how long a caller waited to acquire a connection from the pool."""
+        with self._lock:
+            self.waits += 1
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    # --- Reporting ---
+
+    def snapshot(self) -> dict:
+        pool = self._pool
+        with self._lock:
+            data = {
+                "name": self.name,
+                "pool_size": pool.size() if hasattr(pool, "size") else None,
+                "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+                "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+                "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+                "connections_opened": self.connections_opened,
+                "checkouts": self.checkouts,
+                "overflow_events": self.overflow_events,
+                "invalidations": self.invalidations,
+                "slow_holds": self.slow_holds,
+                "slow_hold_threshold_seconds": self.slow_hold_seconds,
+                "avg_hold_ms": round(self.total_hold_seconds / self.checkins * 1000, 2) if self.checkins else 0.0,
+                "max_hold_ms": round(self.max_hold_seconds * 1000, 2),
+                "avg_wait_ms": round(self.total_wait_seconds / self.waits * 1000, 2) if self.waits else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+            }
+        return data
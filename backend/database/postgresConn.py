@@ -1,22 +1,56 @@
 #database/postgresConn.py
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 load_dotenv()  # Load environment variables from .env file
 import os
 
+from database.pool import PoolMetrics, pool_settings_from_env
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=False)
+# Pool size, overflow, pre-ping, recycle and timeout all come from DB_POOL_* env vars.
+engine = create_engine(DATABASE_URL, echo=False, **pool_settings_from_env())
+pool_metrics = PoolMetrics("sync")
+pool_metrics.instrument(engine)
+
+def _to_async_url(url: str) -> str:
+    """Maps the sync DATABASE_URL onto the asyncpg driver."""
+    parsed = make_url(url)
+    if parsed.drivername in ("postgresql", "postgresql+psycopg2", "postgres"):
+        query = dict(parsed.query)
+        # asyncpg takes 'ssl' instead of libpq's 'sslmode'
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+    elif parsed.drivername == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _to_async_url(DATABASE_URL)
+
+# The async engine shares the DB_POOL_* settings but keeps its own pool.
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, **pool_settings_from_env())
+async_pool_metrics = PoolMetrics("async")
+async_pool_metrics.instrument(async_engine.sync_engine)
 
 Base = declarative_base()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: attributes must stay readable after commit, as lazy loads are not allowed in async code.
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 def get_db():
+    # The session checks a connection out at its first query; PoolMetrics times that wait
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,104 @@
+# helpers/bounded_executor.py
+
+import asyncio
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExecutorSaturated(Exception):
+    """Raised when a BoundedExecutor already has max_pending jobs queued or running."""
+    def __init__(self, name: str):
+        super().__init__(f"The '{name}' executor is saturated, please retry shortly.")
+        self.name = name
+
+
+class BoundedExecutor:
+    """
+    A dedicated thread pool for blocking work called from async code.
+    Concurrency is capped by max_workers and the backlog by max_pending, so a
+    burst of one kind of work cannot starve Starlette's shared threadpool.
+    """
+    def __init__(self, name: str, max_workers: int, max_pending: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    async def run(self, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) on the pool and awaits its result."""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturated(self.name)
+            self.pending += 1
+            self.submitted += 1
+        submitted_at = time.monotonic()
+
+        def job():
+            started = time.monotonic()
+            with self._lock:
+                self.in_flight += 1
+                waited = started - submitted_at
+                self.total_wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self.in_flight -= 1
+                    self.total_run_seconds += elapsed
+                    self.max_run_seconds = max(self.max_run_seconds, elapsed)
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        future = self._executor.submit(job)
+        # Release the slot when the job finishes or is cancelled before it starts,
+        # even if the awaiting request has gone away.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future):
+        with self._lock:
+            self.pending -= 1
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self.completed + self.failed + self.in_flight
+            finished = self.completed + self.failed
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "queued": self.pending - self.in_flight,
+                "in_flight": self.in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait_seconds / started * 1000, 2) if started else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+                "avg_run_ms": round(self.total_run_seconds / finished * 1000, 2) if finished else 0.0,
+                "max_run_ms": round(self.max_run_seconds * 1000, 2),
+            }
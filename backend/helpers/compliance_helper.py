@@ -1,28 +1,20 @@
 # helpers/compliance_helper.py
 
-import os
-import google.generativeai as genai
 from sqlalchemy.orm import Session
 from decimal import Decimal
-from models.all_model import Contract as ContractModel, Transaction as TransactionModel, Milestone as MilestoneModel
-
-# Configure the API client
-try:
-    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-    model = genai.GenerativeModel('gemini-2.5-flash-lite')
-except Exception as e:
-    print(f"Error configuring Google AI: {e}")
-    model = None
+from models.all_model import Contract as ContractModel, Milestone as MilestoneModel
+from helpers.financial_helper import get_contract_financials
+from services.llm_gateway import llm_gateway
 
 def _gather_compliance_context(contract: ContractModel, db: Session) -> str:
     """Helper function to collect and format all data about a contract for the LLM."""
 
-    # 1. Get financial details
-    transactions = db.query(TransactionModel).filter(TransactionModel.contract_id == contract.id).all()
-    total_value = Decimal(contract.quantity_proposed) * contract.price_per_unit_agreed
+    # 1. Get financial details (from the contract's running totals)
+    financials = get_contract_financials(contract)
+    total_value = financials["total_value"]
     
-    amount_paid = sum(t.amount for t in transactions if t.type == 'release')
-    amount_in_escrow = sum(t.amount for t in transactions if t.type == 'escrow') - amount_paid
+    amount_paid = financials["amount_paid"]
+    amount_in_escrow = financials["escrow_amount"]
     amount_remaining_to_pay = total_value - amount_paid
 
     # 2. Get latest milestone analysis
@@ -46,7 +38,7 @@ def _gather_compliance_context(contract: ContractModel, db: Session) -> str:
 
 def get_compliance_advice(contract: ContractModel, db: Session) -> str:
     """Generates a compliance and action plan for a farmer using an LLM."""
-    if not model:
+    if not llm_gateway.available:
         return "AI Compliance Helper is currently unavailable."
 
     # First, gather all the up-to-date information
@@ -64,8 +56,7 @@ def get_compliance_advice(contract: ContractModel, db: Session) -> str:
     {context}
     """
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return llm_gateway.generate_blocking(prompt, purpose="compliance_advice").strip()
     except Exception as e:
         print(f"Error calling LLM for compliance advice: {e}")
         return "Could not generate compliance advice due to an error."
\ No newline at end of file
@@ -1,23 +1,15 @@
 # helpers/contract_helper.py
 
-import os
-import google.generativeai as genai
+from decimal import Decimal
 from models.all_model import Contract as ContractModel
-
-# Configure the API client (shares configuration with recommendation_engine)
-try:
-    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-    model = genai.GenerativeModel('gemini-2.5-flash-lite')
-except Exception as e:
-    print(f"Error configuring Google AI: {e}")
-    model = None
+from services.llm_gateway import llm_gateway
 
 def generate_contract_summary(contract: ContractModel) -> str:
     """
     Uses an LLM to generate a simple, easy-to-understand summary
     of a contract for a farmer.
     """
-    if not model:
+    if not llm_gateway.available:
         return "AI summarizer is currently unavailable."
 
     # Gather all the necessary details from the contract object and its relationships
@@ -25,7 +17,7 @@ def generate_contract_summary(contract: ContractModel) -> str:
         "Crop": contract.listing.crop_type,
         "Quantity": f"{contract.quantity_proposed} {contract.listing.unit}",
         "Agreed Price": f"{contract.price_per_unit_agreed} INR per {contract.listing.unit}",
-        "Total Value": f"{contract.quantity_proposed * contract.price_per_unit_agreed:.2f} INR",
+        "Total Value": f"{Decimal(str(contract.quantity_proposed)) * contract.price_per_unit_agreed:.2f} INR",
         "Buyer": contract.buyer.full_name,
         "Farmer": contract.farmer.full_name
     }
@@ -46,8 +38,7 @@ def generate_contract_summary(contract: ContractModel) -> str:
     """
 
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return llm_gateway.generate_blocking(prompt, purpose="contract_summary").strip()
     except Exception as e:
         print(f"Error calling LLM for contract summary: {e}")
         return "Could not generate summary due to an error."
\ No newline at end of file
@@ -0,0 +1,87 @@
+# helpers/crop_recommendation_cache.py
+
+import hashlib
+import json
+import math
+import os
+from typing import Any, Dict
+
+from helpers.disk_cache import DiskCache
+from helpers.tiered_cache import TieredCache
+
+# Bucket widths at scale 1.0, about the resolution of a soil test or weather reading
+ABSOLUTE_BUCKETS = {
+    "nitrogen": 10.0,      # kg/ha
+    "phosphorus": 5.0,     # kg/ha
+    "potassium": 10.0,     # kg/ha
+    "pH": 0.2,
+    "temperature": 1.0,    # C
+    "humidity": 5.0,       # %
+    "rainfall": 50.0,      # mm/year
+    "latitude": 0.1,       # ~11 km
+    "longitude": 0.1,
+}
+# Water and area span orders of magnitude, so they are bucketed in relative (10%) steps
+RELATIVE_BUCKETS = {
+    "water_available_liters": 0.1,
+    "area_hectares": 0.1,
+}
+# Multiplies every bucket width: 2 merges twice as many profiles, 0 caches exact values only
+BUCKET_SCALE = float(os.getenv("CROP_RECOMMENDATION_CACHE_BUCKET_SCALE", "1.0"))
+
+
+def _normalize(value) -> str | None:
+    text = " ".join(str(value).lower().split()) if value is not None else ""
+    return text or None
+
+
+def _absolute(value: float, step: float) -> float:
+    return round(round(value / step) * step, 6)
+
+
+def _relative(value: float, step: float) -> float:
+    if value <= 0:
+        return value
+    base = 1.0 + step
+    snapped = base ** round(math.log(value, base))
+    # Three significant figures keeps the prompt readable
+    return round(snapped, 2 - int(math.floor(math.log10(snapped))))
+
+
+def quantize_params(params: Dict[str, Any], scale: float = BUCKET_SCALE) -> Dict[str, Any]:
+    """
+    The prompt inputs with each number snapped to its bucket, and location and
+    notes normalized. Farms in the same buckets get the same dict, so the
+    prompt built from it (and its cache key) is shared.
+    """
+    quantized = {}
+    for key, step in ABSOLUTE_BUCKETS.items():
+        value = params.get(key)
+        quantized[key] = _absolute(value, step * scale) if value is not None and scale > 0 else value
+    for key, step in RELATIVE_BUCKETS.items():
+        value = params.get(key)
+        quantized[key] = _relative(value, step * scale) if value is not None and scale > 0 else value
+    quantized["location"] = _normalize(params.get("location"))
+    quantized["notes"] = _normalize(params.get("notes"))
+    return quantized
+
+
+def cache_key(quantized: Dict[str, Any], version: str) -> str:
+    """`version` should change whenever the prompt or model changes."""
+    features = {**quantized, "version": version}
+    return hashlib.sha256(json.dumps(features, sort_keys=True).encode()).hexdigest()
+
+
+_cache_dir = os.getenv("CROP_RECOMMENDATION_CACHE_DIR")
+_ttl = float(os.getenv("CROP_RECOMMENDATION_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+# Gemini crop recommendations by bucketed farm profile; the disk tier is on when a directory is set
+crop_recommendation_cache = TieredCache(
+    memory_maxsize=int(os.getenv("CROP_RECOMMENDATION_CACHE_MAXSIZE", "1024")),
+    ttl=_ttl,
+    disk=DiskCache(
+        _cache_dir,
+        max_bytes=int(os.getenv("CROP_RECOMMENDATION_CACHE_DISK_MAX_MB", "64")) * 1024 * 1024,
+        ttl=_ttl,
+    ) if _cache_dir else None,
+)
@@ -0,0 +1,130 @@
+# helpers/disk_cache.py
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any
+
+
+class DiskCache:
+    """
+    A size-bounded cache of JSON values stored as files under `directory`,
+    shared by every worker process on the host and kept across restarts.
+
+    Entries expire `ttl` seconds after they were written. A hit refreshes the
+    file's mtime, so pruning (every `prune_every` writes, whenever the total goes
+    over `max_bytes`) drops the least recently used files first. Writes go
+    through a temp file and os.replace, so readers never see a partial entry.
+    Errors are counted and treated as misses: the cache is never a reason for
+    a request to fail.
+    """
+    def __init__(self, directory: str, max_bytes: int, ttl: float, prune_every: int = 200):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.pruned = 0
+        self.errors = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Any:
+        path = self._path(key)
+        try:
+            if os.stat(path).st_mtime + self.ttl < time.time():
+                os.unlink(path)
+                value = None
+            else:
+                with open(path) as f:
+                    value = json.load(f)
+                os.utime(path)
+        except FileNotFoundError:
+            value = None
+        except (OSError, ValueError):
+            with self._lock:
+                self.errors += 1
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(value, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, TypeError, ValueError):
+            with self._lock:
+                self.errors += 1
+            return
+        with self._lock:
+            self.stores += 1
+            due = self.stores % self.prune_every == 0
+        if due:
+            self.prune()
+
+    def prune(self):
+        entries, total = [], 0
+        now = time.time()
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                # Expired entries and temp files left behind by a crash go first
+                if stat.st_mtime + self.ttl < now or (name.startswith(".tmp-") and stat.st_mtime + 60 < now):
+                    self._unlink(path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        if total > self.max_bytes:
+            entries.sort()
+            # Evict down to 90% so the next few writes do not trigger another pass
+            for _, size, path in entries:
+                if total <= self.max_bytes * 0.9:
+                    break
+                self._unlink(path)
+                total -= size
+
+    def _unlink(self, path: str):
+        try:
+            os.unlink(path)
+            with self._lock:
+                self.pruned += 1
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "directory": self.directory,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "pruned": self.pruned,
+                "errors": self.errors,
+            }
@@ -1,32 +1,24 @@
-from sqlalchemy.orm import Session
 from decimal import Decimal
-from sqlalchemy import func, case
-from models.all_model import Contract as ContractModel, Transaction as TransactionModel
-
-def get_contract_financials(contract: ContractModel, db: Session) -> dict:
-    """Calculates the financial summary for a given contract with safe Decimal handling."""
+from models.all_model import Contract as ContractModel
 
+def _build_financials(contract: ContractModel, escrowed_amount, released_amount) -> dict:
     # Ensure everything is Decimal
     total_value = Decimal(str(contract.quantity_proposed)) * Decimal(str(contract.price_per_unit_agreed))
 
-    # Let DB handle aggregation
-    result = (
-        db.query(
-            func.coalesce(func.sum(case((TransactionModel.type == 'escrow', TransactionModel.amount))), 0),
-            func.coalesce(func.sum(case((TransactionModel.type == 'release', TransactionModel.amount))), 0),
-        )
-        .filter(TransactionModel.contract_id == contract.id)
-        .first()
-    )
-
-    escrowed_amount, released_amount = result
-
     # Force Decimal consistency
-    escrowed_amount = Decimal(str(escrowed_amount))
-    released_amount = Decimal(str(released_amount))
+    escrowed_amount = Decimal(str(escrowed_amount or 0))
+    released_amount = Decimal(str(released_amount or 0))
 
     return {
         "total_value": total_value,
         "escrow_amount": escrowed_amount - released_amount,  # i.e. balance still in escrow
         "amount_paid": released_amount
     }
+
+def get_contract_financials(contract: ContractModel) -> dict:
+    """
+    Financial summary for a contract, read from the running totals kept on the
+    contract row (see the Transaction listeners in models/all_model.py).
+    Needs no query, so dashboards cost the same regardless of contract count.
+    """
+    return _build_financials(contract, contract.escrow_total, contract.released_total)
@@ -0,0 +1,82 @@
+# helpers/listing_search.py
+
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import func, literal, literal_column, or_, select
+from sqlalchemy.orm import joinedload
+
+from models.all_model import CropList as CropListModel
+
+# Index DDL the search relies on; the migration creates the same indexes in production.
+SEARCH_INDEX_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_crop_lists_search_vector ON crop_lists USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_crop_lists_crop_type_trgm ON crop_lists USING gin (crop_type gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_crop_lists_location_trgm ON crop_lists USING gin (location gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_crop_lists_farming_practice_trgm ON crop_lists USING gin (farming_practice gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_crop_lists_soil_type_lower ON crop_lists (lower(soil_type))",
+]
+
+# Crop type matters most, then practice, then location, mirroring the tsvector weights.
+FUZZY_WEIGHTS = {"crop_type": 1.0, "farming_practice": 0.6, "location": 0.4}
+
+
+@dataclass
+class ListingSearchFilters:
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+    harvest_from: Optional[date] = None
+    harvest_to: Optional[date] = None
+    soil_type: Optional[str] = None
+
+
+def build_search_query(q: Optional[str], filters: ListingSearchFilters, limit: int, offset: int = 0):
+    """
+    Ranked search over active listings. Selects (CropList, rank).
+
+    Full-text matches come from the weighted search_vector. Typos and partial
+    words fall back to pg_trgm word similarity on crop type, farming practice
+    and location. Both paths are served by GIN indexes.
+    """
+    query = (
+        select(CropListModel)
+        .options(joinedload(CropListModel.farmer))
+        .where(CropListModel.status == 'active')
+    )
+
+    if filters.min_price is not None:
+        query = query.where(CropListModel.expected_price_per_unit >= filters.min_price)
+    if filters.max_price is not None:
+        query = query.where(CropListModel.expected_price_per_unit <= filters.max_price)
+    if filters.harvest_from is not None:
+        query = query.where(CropListModel.harvest_date >= filters.harvest_from)
+    if filters.harvest_to is not None:
+        query = query.where(CropListModel.harvest_date <= filters.harvest_to)
+    if filters.soil_type:
+        # soil_type is stored as entered ("Black", "Alluvial"); match case-insensitively via the lower() index
+        query = query.where(func.lower(CropListModel.soil_type) == filters.soil_type.strip().lower())
+
+    q = (q or "").strip()
+    if not q:
+        rank = literal(0.0).label("rank")
+        return query.add_columns(rank).order_by(CropListModel.created_at.desc(), CropListModel.id.desc()).limit(limit).offset(offset)
+
+    # A regconfig literal (not a bind parameter) keeps the expression IMMUTABLE, as in the generated column.
+    ts_query = func.websearch_to_tsquery(literal_column("'simple'::regconfig"), q)
+    fuzzy_columns = {name: getattr(CropListModel, name) for name in FUZZY_WEIGHTS}
+
+    query = query.where(or_(
+        CropListModel.search_vector.op("@@")(ts_query),
+        # `<%` is word_similarity above pg_trgm.word_similarity_threshold, and can use the trigram indexes
+        *(literal(q).op("<%")(column) for column in fuzzy_columns.values()),
+    ))
+
+    fuzzy_score = func.greatest(*(
+        func.word_similarity(q, func.coalesce(column, "")) * FUZZY_WEIGHTS[name]
+        for name, column in fuzzy_columns.items()
+    ))
+    rank = (func.ts_rank_cd(CropListModel.search_vector, ts_query) + fuzzy_score).label("rank")
+
+    return query.add_columns(rank).order_by(rank.desc(), CropListModel.id.desc()).limit(limit).offset(offset)
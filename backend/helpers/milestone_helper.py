@@ -1,18 +1,9 @@
 # helpers/milestone_helper.py
 
-import os
-import google.generativeai as genai
-from PIL import Image
-import io
-import requests # Import the requests library
+from services.http_client import http_clients
+from services.llm_gateway import llm_gateway
 
-# ... (API configuration remains the same)
-try:
-    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-    model = genai.GenerativeModel('gemini-pro-vision')
-except Exception as e:
-    print(f"Error configuring Google AI: {e}")
-    model = None
+VISION_MODEL_NAME = 'gemini-pro-vision'
 
 # FIX: The function now accepts a URL string instead of raw bytes
 def analyze_milestone_image(image_url: str) -> str:
@@ -20,17 +11,19 @@ def analyze_milestone_image(image_url: str) -> str:
     Downloads an image from a public URL and uses the Gemini Pro Vision
     model to analyze it.
     """
-    if not model:
+    if not llm_gateway.available:
         return "AI image analysis is currently unavailable."
 
     try:
-        # 1. Download the image from the URL
-        response = requests.get(image_url, stream=True)
+        # 1. Download the image from the URL (this runs on a worker thread, so the sync client)
+        response = http_clients.sync_client("milestone-images", timeout=30).get(image_url, follow_redirects=True)
         response.raise_for_status() # Raise an exception for bad status codes
         
-        # 2. Prepare the image for the API from the downloaded content
-        image_bytes = response.content
-        img = Image.open(io.BytesIO(image_bytes))
+        # 2. Pass the raw bytes as an inline image part; the gateway's cache keys on them too
+        image_part = {
+            "mime_type": response.headers.get("Content-Type", "image/jpeg").split(";")[0],
+            "data": response.content,
+        }
         
         prompt = """
         You are an agricultural expert. Analyze this image of a crop. In 2-3 concise sentences, describe the following:
@@ -39,8 +32,9 @@ def analyze_milestone_image(image_url: str) -> str:
         """
         
         # 3. Call the LLM with the prompt and the downloaded image
-        response = model.generate_content([prompt, img])
-        return response.text.strip()
+        return llm_gateway.generate_blocking(
+            [prompt, image_part], purpose="milestone_image", model=VISION_MODEL_NAME
+        ).strip()
         
     except Exception as e:
         print(f"Error downloading or analyzing image from URL: {e}")
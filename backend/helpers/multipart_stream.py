@@ -0,0 +1,159 @@
+# helpers/multipart_stream.py
+
+import asyncio
+import tempfile
+import zipfile
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request, status
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from services.image_preprocessing import ImageRejected
+
+# Zip parts are spooled to disk past this size
+_SPOOL_BYTES = 1024 * 1024
+
+
+class _PartEvents:
+    """Collects MultipartParser callbacks into a list the async side drains after each chunk."""
+    def __init__(self):
+        self.events: list[tuple] = []
+        self._field = b""
+        self._value = b""
+        self._headers: dict[bytes, bytes] = {}
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": lambda data, start, end: self._append("_field", data[start:end]),
+            "on_header_value": lambda data, start, end: self._append("_value", data[start:end]),
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": lambda: self.events.append(("headers", self._headers)),
+            "on_part_data": lambda data, start, end: self.events.append(("data", bytes(data[start:end]))),
+            "on_part_end": lambda: self.events.append(("end",)),
+        }
+
+    def _append(self, attr: str, chunk: bytes):
+        setattr(self, attr, getattr(self, attr) + chunk)
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field = b""
+        self._value = b""
+
+
+class _Part:
+    def __init__(self, filename: str, is_zip: bool, max_bytes: int):
+        self.filename = filename
+        self.is_zip = is_zip
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.too_large = False
+        self.buffer = tempfile.SpooledTemporaryFile(max_size=_SPOOL_BYTES) if is_zip else bytearray()
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            # Keep draining the stream, but stop holding the bytes
+            self.too_large = True
+            return
+        if self.is_zip:
+            self.buffer.write(chunk)
+        else:
+            self.buffer += chunk
+
+
+def _read_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, max_bytes: int) -> bytes:
+    with archive.open(info) as member:
+        return member.read(max_bytes + 1)
+
+
+async def _zip_members(part: _Part, max_image_bytes: int):
+    too_large = f"Image is larger than {max_image_bytes // (1024 * 1024)} MB."
+    part.buffer.seek(0)
+    try:
+        archive = zipfile.ZipFile(part.buffer)
+    except zipfile.BadZipFile:
+        yield part.filename, ImageRejected("The upload is not a valid zip archive.", 415)
+        return
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir() or info.filename.startswith("__MACOSX/"):
+                continue
+            name = f"{part.filename}/{info.filename}"
+            # The declared size is checked first, so a zip bomb is never inflated
+            if info.file_size > max_image_bytes:
+                yield name, ImageRejected(too_large, 413)
+                continue
+            # Inflating is CPU work; keep it off the event loop
+            data = await asyncio.to_thread(_read_member, archive, info, max_image_bytes)
+            yield name, data if len(data) <= max_image_bytes else ImageRejected(too_large, 413)
+
+
+async def _single(name: str, payload):
+    yield name, payload
+
+
+async def iter_uploaded_images(
+    request: Request, max_image_bytes: int, max_zip_bytes: int, max_files: int,
+) -> AsyncIterator[tuple[str, bytes | ImageRejected]]:
+    """
+    Parses a multipart/form-data body as it arrives and yields (filename, bytes)
+    for each uploaded image as soon as its part is complete, so callers can
+    start work on the first photos while later ones are still uploading. Only
+    the part being received is held in memory. Zip parts are spooled to a temp
+    file and yield their members once complete. An oversized image yields an
+    ImageRejected in place of its bytes, and the rest of the batch goes on.
+    More than `max_files` images is a 413.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Expected a multipart/form-data upload.")
+
+    collector = _PartEvents()
+    parser = MultipartParser(params[b"boundary"], collector.callbacks())
+    part: _Part | None = None
+    count = 0
+
+    async for chunk in request.stream():
+        parser.write(chunk)
+        events, collector.events = collector.events, []
+        for event in events:
+            if event[0] == "headers":
+                _, options = parse_options_header(event[1].get(b"content-disposition", b""))
+                filename = options.get(b"filename")
+                if filename is None:
+                    # A plain form field, not a file
+                    part = None
+                    continue
+                filename = filename.decode("utf-8", "replace")
+                part_type = event[1].get(b"content-type", b"").lower()
+                is_zip = part_type in (b"application/zip", b"application/x-zip-compressed") or filename.lower().endswith(".zip")
+                part = _Part(filename, is_zip, max_zip_bytes if is_zip else max_image_bytes)
+            elif event[0] == "data" and part is not None:
+                part.write(event[1])
+            elif event[0] == "end" and part is not None:
+                finished, part = part, None
+                if finished.too_large:
+                    items = _single(finished.filename, ImageRejected(
+                        f"Upload is larger than {finished.max_bytes // (1024 * 1024)} MB.", 413))
+                elif finished.is_zip:
+                    items = _zip_members(finished, max_image_bytes)
+                else:
+                    items = _single(finished.filename, bytes(finished.buffer))
+                try:
+                    async for name, payload in items:
+                        count += 1
+                        if count > max_files:
+                            raise HTTPException(
+                                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                detail=f"At most {max_files} images per batch.",
+                            )
+                        yield name, payload
+                finally:
+                    if finished.is_zip:
+                        finished.buffer.close()
+    parser.finalize()
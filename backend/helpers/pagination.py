@@ -0,0 +1,70 @@
+# helpers/pagination.py
+
+import base64
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+MAX_PAGE_SIZE = int(os.getenv("PAGE_SIZE_MAX", "200"))
+
+# Clients read the cursor for the next page from this header; it is absent on the last page.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class PageParams:
+    limit: int
+    cursor: Optional[tuple[datetime, int]]
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
+
+
+def page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Value of the X-Next-Cursor header from the previous page"),
+) -> PageParams:
+    """Shared `limit`/`cursor` query parameters for keyset-paginated list endpoints."""
+    return PageParams(limit=limit, cursor=decode_cursor(cursor) if cursor else None)
+
+
+def paginate(query, model, page: PageParams, descending: bool = True):
+    """
+    Applies keyset pagination on (created_at, id) to a select() or a legacy Query.
+    Fetches one extra row so finish_page can tell whether another page exists.
+    """
+    key = tuple_(model.created_at, model.id)
+    if page.cursor:
+        query = query.filter(key < page.cursor if descending else key > page.cursor)
+    if descending:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at.asc(), model.id.asc())
+    return query.limit(page.limit + 1)
+
+
+def finish_page(rows, page: PageParams, response: Response) -> list:
+    """Trims the look-ahead row and sets the next cursor header when there is more to read."""
+    rows = list(rows)
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return rows
@@ -1,25 +1,20 @@
 # helpers/proposal_analyzer.py
 
-import os
 import json
 from decimal import Decimal
-import google.generativeai as genai
 from typing import List
 from models.all_model import CropList as CropListModel, Contract as ContractModel
+from services.llm_gateway import llm_gateway
 
-# Configure the API client
-try:
-    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-    model = genai.GenerativeModel('gemini-2.5-flash-lite')
-except Exception as e:
-    print(f"Error configuring Google AI: {e}")
-    model = None
+def _parse_analysis(text: str) -> dict:
+    json_response = text.strip().replace('`', '').replace('json', '')
+    return json.loads(json_response)
 
 def analyze_proposals(listing: CropListModel, proposals: List[ContractModel]) -> dict:
     """
     Uses an LLM to analyze a list of contract proposals and recommend the best one for the farmer.
     """
-    if not model:
+    if not llm_gateway.available:
         return {"error": "AI analyzer is currently unavailable."}
 
     # Format the farmer's original listing details as a baseline
@@ -61,10 +56,8 @@ def analyze_proposals(listing: CropListModel, proposals: List[ContractModel]) ->
     """
 
     try:
-        response = model.generate_content(prompt)
-        json_response = response.text.strip().replace('`', '').replace('json', '')
-        analysis_data = json.loads(json_response)
-        return analysis_data
+        # Runs on the app's event loop through the shared gateway (limits, retries, cache)
+        return llm_gateway.generate_blocking(prompt, purpose="proposal_analysis", parse=_parse_analysis)
     except Exception as e:
         print(f"Error calling LLM for proposal analysis: {e}")
         return {"error": "Could not analyze proposals due to an error."}
\ No newline at end of file
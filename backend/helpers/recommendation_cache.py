@@ -0,0 +1,169 @@
+# helpers/recommendation_cache.py
+
+import bisect
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from database.postgresConn import SessionLocal
+from models.all_model import TemplateRecommendationCache
+from helpers.ttl_cache import TTLCache
+
+# Upper bounds (INR) of the deal-value brackets; listings in the same bracket share a recommendation.
+VALUE_BRACKETS = [
+    Decimal(b) for b in os.getenv("RECOMMENDATION_VALUE_BRACKETS", "10000,50000,100000,500000,1000000").split(",")
+]
+
+
+def _normalize(value) -> str:
+    return " ".join(str(value or "").lower().split()) or "unspecified"
+
+
+def value_bracket(total_value: Decimal) -> int:
+    return bisect.bisect_right(VALUE_BRACKETS, total_value)
+
+
+def listing_features(listing, total_value: Decimal, version: str) -> dict:
+    """
+    The inputs that decide the recommended template, normalized so near-identical
+    listings map to the same fingerprint. `version` should change whenever the
+    prompt, templates or model change.
+    """
+    return {
+        "crop_type": _normalize(listing.crop_type),
+        "farming_practice": _normalize(listing.farming_practice),
+        "soil_type": _normalize(listing.soil_type),
+        "unit": _normalize(listing.unit),
+        "value_bracket": value_bracket(total_value),
+        "version": version,
+    }
+
+
+def fingerprint(features: dict) -> str:
+    return hashlib.sha256(json.dumps(features, sort_keys=True).encode()).hexdigest()
+
+
+class RecommendationCache:
+    """
+    Two-tier cache of LLM template recommendations keyed by listing fingerprint.
+    An in-process TTLCache answers repeat lookups without a query. The
+    template_recommendation_cache table survives restarts and is shared by workers.
+    Rows expire after `ttl` seconds. Every `prune_every` stores, expired rows are
+    deleted and the least recently used rows beyond `maxsize` are evicted.
+    """
+    def __init__(self, maxsize: int, ttl: float, memory_maxsize: int, memory_ttl: float, prune_every: int = 100):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self.memory = TTLCache(maxsize=memory_maxsize, ttl=memory_ttl)
+        self._lock = threading.Lock()
+        self.db_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+        self.pruned = 0
+
+    def get(self, key: str) -> dict | None:
+        cached = self.memory.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        now = datetime.now(timezone.utc)
+        try:
+            with SessionLocal() as db:
+                row = db.execute(
+                    select(TemplateRecommendationCache.template_name, TemplateRecommendationCache.reason)
+                    .where(TemplateRecommendationCache.fingerprint == key, TemplateRecommendationCache.expires_at > now)
+                ).first()
+                if row:
+                    db.execute(
+                        update(TemplateRecommendationCache)
+                        .where(TemplateRecommendationCache.fingerprint == key)
+                        .values(hit_count=TemplateRecommendationCache.hit_count + 1, last_used_at=now)
+                    )
+                    db.commit()
+        except SQLAlchemyError as e:
+            # The cache must never take recommendations down with it
+            print(f"Recommendation cache lookup failed: {e}")
+            with self._lock:
+                self.errors += 1
+            return None
+
+        with self._lock:
+            if row:
+                self.db_hits += 1
+            else:
+                self.misses += 1
+        if not row:
+            return None
+        data = {"template_name": row.template_name, "reason": row.reason}
+        self.memory.set(key, data)
+        return dict(data)
+
+    def set(self, key: str, data: dict, features: dict):
+        now = datetime.now(timezone.utc)
+        self.memory.set(key, dict(data))
+        try:
+            with SessionLocal() as db:
+                db.merge(TemplateRecommendationCache(
+                    fingerprint=key,
+                    features=json.dumps(features, sort_keys=True),
+                    template_name=data["template_name"],
+                    reason=data.get("reason"),
+                    last_used_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl),
+                ))
+                db.commit()
+                with self._lock:
+                    self.stores += 1
+                    due = self.stores % self.prune_every == 0
+                if due:
+                    self._prune(db, now)
+        except SQLAlchemyError as e:
+            print(f"Recommendation cache store failed: {e}")
+            with self._lock:
+                self.errors += 1
+
+    def _prune(self, db, now: datetime):
+        table = TemplateRecommendationCache
+        removed = db.execute(delete(table).where(table.expires_at <= now)).rowcount
+        overflow = db.execute(select(func.count()).select_from(table)).scalar_one() - self.maxsize
+        if overflow > 0:
+            oldest = select(table.fingerprint).order_by(table.last_used_at.asc()).limit(overflow)
+            removed += db.execute(delete(table).where(table.fingerprint.in_(oldest))).rowcount
+        db.commit()
+        with self._lock:
+            self.pruned += removed
+
+    def stats(self) -> dict:
+        memory = self.memory.stats()
+        with self._lock:
+            hits = memory["hits"] + self.db_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": memory["hits"],
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "pruned": self.pruned,
+                "errors": self.errors,
+                "memory": memory,
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+            }
+
+
+recommendation_cache = RecommendationCache(
+    maxsize=int(os.getenv("RECOMMENDATION_CACHE_MAXSIZE", "5000")),
+    ttl=float(os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+    memory_maxsize=int(os.getenv("RECOMMENDATION_CACHE_MEMORY_MAXSIZE", "1024")),
+    memory_ttl=float(os.getenv("RECOMMENDATION_CACHE_MEMORY_TTL_SECONDS", "600")),
+)
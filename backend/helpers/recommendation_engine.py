@@ -1,18 +1,17 @@
 # helpers/recommendation_engine.py
 
-import os
+import asyncio
 import json
-import google.generativeai as genai
+import hashlib
 from models.all_model import CropList as CropListModel
 from decimal import Decimal
+from helpers.recommendation_cache import recommendation_cache, listing_features, fingerprint
+from services.llm_gateway import llm_gateway
+
+MODEL_NAME = 'gemini-2.5-flash-lite'
+# Bump when the prompt wording changes, so cached recommendations are not reused
+PROMPT_VERSION = "1"
 
-# Configure the API client
-try:
-    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-    model = genai.GenerativeModel('gemini-2.5-flash-lite')
-except Exception as e:
-    print(f"Error configuring Google AI: {e}")
-    model = None
 # FIX: Load the template context from the external text file
 try:
     with open('helpers/contract_templates.txt', 'r') as f:
@@ -22,18 +21,57 @@ except FileNotFoundError:
     template_context = "Basic contract templates are available."
 
 
-def get_template_recommendation_with_llm(listing: CropListModel) -> dict:
+# Part of every cache fingerprint: editing the templates, prompt or model invalidates old entries
+CACHE_VERSION = hashlib.sha256(f"{MODEL_NAME}|{PROMPT_VERSION}|{template_context}".encode()).hexdigest()[:16]
+
+NO_MODEL_RECOMMENDATION = {
+    "template_name": "Simple Supply Contract",
+    "reason": "AI engine not available. Defaulting to the simplest template."
+}
+
+FALLBACK_RECOMMENDATION = {
+    "template_name": "Simple Supply Contract",
+    "reason": "Could not get an intelligent recommendation. Defaulting to a basic template is a safe option."
+}
+
+
+async def get_template_recommendation_with_llm(listing: CropListModel) -> dict:
     """
     Uses a Generative LLM to provide an intelligent contract template recommendation.
     """
-    if not model:
-        return {
-            "template_name": "Simple Supply Contract",
-            "reason": "AI engine not available. Defaulting to the simplest template."
-        }
+    try:
+        return await request_template_recommendation(listing)
+    except Exception as e:
+        print(f"Error calling LLM or parsing response: {e}")
+        return dict(FALLBACK_RECOMMENDATION)
+
+
+def _parse_recommendation(text: str) -> dict:
+    json_response = text.strip().replace('`', '').replace('json', '')
+    recommendation_data = json.loads(json_response)
+    if not isinstance(recommendation_data, dict) or not recommendation_data.get("template_name"):
+        raise ValueError(f"Unexpected recommendation payload: {json_response[:200]}")
+    return recommendation_data
+
+
+async def request_template_recommendation(listing: CropListModel) -> dict:
+    """
+    Same as get_template_recommendation_with_llm, but lets LLM and parsing errors
+    propagate so a caller with its own retry policy can decide what to do.
+    """
+    if not llm_gateway.available:
+        return dict(NO_MODEL_RECOMMENDATION)
     
     total_value = Decimal(listing.quantity) * listing.expected_price_per_unit
 
+    # Near-identical listings (same crop, practice, soil, unit and value bracket) reuse the answer
+    features = listing_features(listing, total_value, CACHE_VERSION)
+    cache_key = fingerprint(features)
+    # The cache's table tier is a sync session, so keep it off the event loop
+    cached = await asyncio.to_thread(recommendation_cache.get, cache_key)
+    if cached:
+        return cached
+
     prompt = f"""
     You are an expert advisor for small-scale farmers in India, specializing in contract farming agreements. Your goal is to protect the farmer's interests.
     
@@ -54,14 +92,10 @@ def get_template_recommendation_with_llm(listing: CropListModel) -> dict:
     Your response MUST be a clean JSON object with exactly two keys: "template_name" (the full name of the best template) and "reason" (a brief, simple, one-sentence explanation written directly to the farmer explaining *why* this template is best for them and protects their interests).
     """
 
-    try:
-        response = model.generate_content(prompt)
-        json_response = response.text.strip().replace('`', '').replace('json', '')
-        recommendation_data = json.loads(json_response)
-        return recommendation_data
-    except Exception as e:
-        print(f"Error calling LLM or parsing response: {e}")
-        return {
-            "template_name": "Simple Supply Contract",
-            "reason": "Could not get an intelligent recommendation. Defaulting to a basic template is a safe option."
-        }
\ No newline at end of file
+    recommendation_data = await llm_gateway.generate(
+        prompt, purpose="template_recommendation", model=MODEL_NAME, parse=_parse_recommendation,
+        # Near-identical listings are already deduplicated by the fingerprint cache
+        use_cache=False,
+    )
+    await asyncio.to_thread(recommendation_cache.set, cache_key, recommendation_data, features)
+    return recommendation_data
@@ -0,0 +1,46 @@
+# helpers/tiered_cache.py
+
+import asyncio
+from typing import Optional
+
+from helpers.disk_cache import DiskCache
+from helpers.ttl_cache import TTLCache
+
+
+class TieredCache:
+    """
+    An in-process LRU (with TTL) in front of an optional on-disk tier shared by
+    every worker on the host. Disk hits are promoted to memory. Values are
+    JSON-serializable dicts, and callers get a copy.
+    """
+    def __init__(self, memory_maxsize: int, ttl: float, disk: Optional[DiskCache]):
+        self.memory = TTLCache(maxsize=memory_maxsize, ttl=ttl)
+        self.disk = disk
+
+    def get(self, key: str) -> dict | None:
+        """Blocking when the disk tier is on; call it from a worker thread."""
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return dict(value) if value is not None else None
+
+    async def store(self, key: str, value: dict):
+        self.memory.set(key, dict(value))
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value)
+
+    def stats(self) -> dict:
+        memory = self.memory.stats()
+        disk = self.disk.stats() if self.disk is not None else None
+        hits = memory["hits"] + (disk["hits"] if disk else 0)
+        # Every lookup reaches memory; only memory misses reach the disk
+        lookups = memory["hits"] + memory["misses"]
+        return {
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory": memory,
+            "disk": disk,
+        }
@@ -1,15 +1,23 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from starlette_session import SessionMiddleware
 import os
 from database.postgresConn import engine, Base
 from models import all_model
+from auth.hashing import hash_executor
+from services.recommendation_worker import recommendation_worker
+from services.inference import shutdown_inference
+from services.model_registry import model_registry
+from services.http_client import http_clients
+from helpers.bounded_executor import ExecutorSaturated
+from helpers.pagination import NEXT_CURSOR_HEADER
 
 from contextlib import asynccontextmanager
 from services.scheduler import send_daily_alerts # <-- Make sure this imports the right function
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from router import user_routes, auth_routes, croplist_routes, wallet_routes, contract_routes, signature_routes, milestone_routes, logistics_routes, chat_routes, service_routes, community_routes
+from router import user_routes, auth_routes, croplist_routes, wallet_routes, contract_routes, signature_routes, milestone_routes, logistics_routes, chat_routes, service_routes, community_routes, metrics_routes
 
 all_model.Base.metadata.create_all(bind=engine)
 
@@ -21,9 +29,17 @@ async def lifespan(app: FastAPI):
     # For testing, run every 30 seconds. For production, change back to 'cron'.
     scheduler.add_job(send_daily_alerts, 'interval', seconds=30)
     scheduler.start()
+    await recommendation_worker.start()
+    # Disease models load in the background; the API serves requests meanwhile
+    await model_registry.start()
     yield
     print("Shutting down the application...")
     scheduler.shutdown()
+    await recommendation_worker.stop()
+    hash_executor.shutdown()
+    await model_registry.stop()
+    await shutdown_inference()
+    await http_clients.aclose()
 
 app = FastAPI(
     title="Krishi Connect",
@@ -52,8 +68,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # List endpoints return the next page's cursor in this header
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    # A dedicated pool is full: shed load instead of queueing without bound
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 @app.get("/")
 def root():
     return {"message" : "Welcom to Krishi Connect!"}
@@ -70,4 +93,5 @@ app.include_router(logistics_routes.router)
 app.include_router(chat_routes.router)
 app.include_router(service_routes.router)
 app.include_router(community_routes.router)
+app.include_router(metrics_routes.router)
 # app.include_router(whatsapp_routes.router)
\ No newline at end of file
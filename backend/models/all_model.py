@@ -3,9 +3,11 @@
 import enum
 from sqlalchemy import (
     Column, Integer, String, Float, Date, Enum,
-    ForeignKey, DateTime, Text, Numeric, Boolean
+    ForeignKey, DateTime, Text, Numeric, Boolean, Index, Computed, event, text, update
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred, column_property
+from sqlalchemy import inspect
 from sqlalchemy.sql import func
 from sqlalchemy import Enum as SQLAlchemyEnum
 # IMPORTANT: Import the single, shared Base object from your database file
@@ -25,6 +27,11 @@ class ContractStatus(str, enum.Enum):
     completed = "completed"
     cancelled = "cancelled"
 
+class RecommendationStatus(str, enum.Enum):
+    pending = "pending"
+    ready = "ready"
+    failed = "failed"
+
 # --- MODELS ---
 class User(Base):
     __tablename__ = "users"
@@ -44,6 +51,11 @@ class User(Base):
     forum_posts = relationship("ForumPost", back_populates="author", cascade="all, delete-orphan")
     forum_replies = relationship("ForumReply", back_populates="author", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination order of the user list
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
+
 class CropList(Base):
     __tablename__ = "crop_lists"
     id = Column(Integer, primary_key=True, index=True)
@@ -55,17 +67,39 @@ class CropList(Base):
     harvest_date = Column(Date, nullable=False)
     location = Column(String, nullable=False)
     farming_practice = Column(String, nullable=True)
-    soil_type = Column(String, nullable=False) # Standardized to lowercase
+    soil_type = Column(String, nullable=False) # As entered, e.g. "Black"; search compares lower(soil_type)
     status = Column(String, default="active", nullable=False)
     irrigation_source = Column(String, nullable=True)
     img_url = Column(String, nullable=True) # Standardized name
     recommended_template_name = Column(String, nullable=True)
     recommendation_reason = Column(Text, nullable=True)
+    # Filled in by services/recommendation_worker.py after the listing is created
+    recommendation_status = Column(String, default=RecommendationStatus.pending.value, server_default="pending", nullable=False)
+    # When a worker process claimed the pending recommendation; a stale claim can be taken over
+    recommendation_claimed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Weighted full-text document kept up to date by Postgres; deferred so normal loads skip it.
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple', coalesce(crop_type, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(farming_practice, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(location, '')), 'C')",
+        persisted=True,
+    )))
 
     farmer = relationship("User", back_populates="lists")
     contracts = relationship("Contract", back_populates="listing", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_crop_lists_farmer_id", "farmer_id"),
+        Index("ix_crop_lists_status", "status"),
+        # The marketplace only ever browses active listings, newest first
+        Index(
+            "ix_crop_lists_active_created_at", "created_at",
+            postgresql_where=text("status = 'active'"), sqlite_where=text("status = 'active'"),
+        ),
+        # The GIN indexes behind listing search need pg_trgm, so only the migration creates them.
+    )
+
 class Contract(Base):
     __tablename__ = "contracts"
     id = Column(Integer, primary_key=True, index=True)
@@ -82,6 +116,9 @@ class Contract(Base):
 
     summary = Column(Text, nullable=True)
     last_offer_by = Column(String, nullable=False, default='buyer')
+    # Running totals of escrow/release transactions, maintained on insert (see below)
+    escrow_total = Column(Numeric(12, 2), default=0, server_default="0", nullable=False)
+    released_total = Column(Numeric(12, 2), default=0, server_default="0", nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     listing = relationship("CropList", back_populates="contracts")
@@ -93,6 +130,15 @@ class Contract(Base):
     shipments = relationship("Shipment", back_populates="contract", cascade="all, delete-orphan")
     negotiation_messages = relationship("NegotiationMessage", back_populates="contract", cascade="all, delete-orphan")
 
+    # Dashboards filter each party's contracts by status; proposals filter a listing's by status
+    __table_args__ = (
+        Index("ix_contracts_buyer_id_status", "buyer_id", "status"),
+        Index("ix_contracts_farmer_id_status", "farmer_id", "status"),
+        Index("ix_contracts_listing_id_status", "listing_id", "status"),
+        # A buyer's contracts in keyset pagination order (/my-contracts)
+        Index("ix_contracts_buyer_id_created_at_id", "buyer_id", "created_at", "id"),
+    )
+
 class Milestone(Base):
     __tablename__ = "milestones"
     id = Column(Integer, primary_key=True, index=True)
@@ -109,6 +155,10 @@ class Milestone(Base):
     contract = relationship("Contract", back_populates="milestones")
     shipment = relationship("Shipment", back_populates="milestone", uselist=False, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_milestones_contract_id_created_at", "contract_id", "created_at"),
+    )
+
 class Wallet(Base):
     __tablename__ = "wallets"
     id = Column(Integer, primary_key=True, index=True)
@@ -122,14 +172,58 @@ class Transaction(Base):
     __tablename__ = "transactions"
     id = Column(Integer, primary_key=True, index=True)
     wallet_id = Column(Integer, ForeignKey("wallets.id"), nullable=False)
-    contract_id = Column(Integer, ForeignKey("contracts.id"), nullable=True)
-    amount = Column(Numeric(12, 2), nullable=False)
-    type = Column(String, nullable=False)
+    # active_history loads the old value before a change, for the contract total listeners below
+    contract_id = column_property(Column(Integer, ForeignKey("contracts.id"), nullable=True), active_history=True)
+    amount = column_property(Column(Numeric(12, 2), nullable=False), active_history=True)
+    type = column_property(Column(String, nullable=False), active_history=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     wallet = relationship("Wallet", back_populates="transactions")
     contract = relationship("Contract", back_populates="transactions")
 
+    __table_args__ = (
+        Index("ix_transactions_contract_id_created_at", "contract_id", "created_at"),
+        Index("ix_transactions_wallet_id_created_at", "wallet_id", "created_at"),
+    )
+
+_CONTRACT_TOTAL_COLUMNS = {"escrow": "escrow_total", "release": "released_total"}
+
+def _bump_contract_total(connection, contract_id, transaction_type, amount):
+    column_name = _CONTRACT_TOTAL_COLUMNS.get(transaction_type)
+    if contract_id is None or column_name is None or not amount:
+        return
+    contracts = Contract.__table__
+    connection.execute(
+        update(contracts)
+        .where(contracts.c.id == contract_id)
+        .values({column_name: contracts.c[column_name] + amount})
+    )
+
+def _old_value(target, attribute):
+    history = inspect(target).attrs[attribute].history
+    return history.deleted[0] if history.deleted else getattr(target, attribute)
+
+# The contract running totals follow every ORM insert, update and delete of a
+# transaction, on the same connection, so they commit or roll back together.
+# Bulk query.update()/delete() on transactions bypasses these listeners and must not be used.
+
+@event.listens_for(Transaction, "after_insert")
+def _apply_transaction_to_contract_totals(mapper, connection, target):
+    _bump_contract_total(connection, target.contract_id, target.type, target.amount)
+
+@event.listens_for(Transaction, "after_update")
+def _reapply_transaction_to_contract_totals(mapper, connection, target):
+    old = [_old_value(target, name) for name in ("contract_id", "type", "amount")]
+    new = [target.contract_id, target.type, target.amount]
+    if old == new:
+        return
+    _bump_contract_total(connection, old[0], old[1], -old[2])
+    _bump_contract_total(connection, *new)
+
+@event.listens_for(Transaction, "after_delete")
+def _remove_transaction_from_contract_totals(mapper, connection, target):
+    _bump_contract_total(connection, _old_value(target, "contract_id"), _old_value(target, "type"), -_old_value(target, "amount"))
+
 class AIAdvice(Base):
     __tablename__ = "ai_advisories"
     id = Column(Integer, primary_key=True, index=True)
@@ -172,6 +266,10 @@ class NegotiationMessage(Base):
     sender = relationship("User")
     contract = relationship("Contract", back_populates="negotiation_messages") # Add back_populates to Contract model
 
+    __table_args__ = (
+        Index("ix_negotiation_messages_contract_id_created_at", "contract_id", "created_at"),
+    )
+
 # Community and other Services
 
 class ForumPost(Base):
@@ -190,6 +288,11 @@ class ForumPost(Base):
     author = relationship("User", back_populates="forum_posts")
     replies = relationship("ForumReply", back_populates="post", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination order of the forum feed
+        Index("ix_forum_posts_created_at_id", "created_at", "id"),
+    )
+
 class ForumReply(Base):
     __tablename__ = "forum_replies"
     id = Column(Integer, primary_key=True, index=True)
@@ -204,3 +307,22 @@ class ForumReply(Base):
     post = relationship("ForumPost", back_populates="replies")
     author = relationship("User", back_populates="forum_replies")
 
+
+# Caches
+
+class TemplateRecommendationCache(Base):
+    __tablename__ = "template_recommendation_cache"
+    # sha256 of the normalized listing features, see helpers/recommendation_cache.py
+    fingerprint = Column(String(64), primary_key=True)
+    features = Column(Text, nullable=False)
+    template_name = Column(String, nullable=False)
+    reason = Column(Text, nullable=True)
+    hit_count = Column(Integer, default=0, server_default="0", nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_template_recommendation_cache_last_used_at", "last_used_at"),
+        Index("ix_template_recommendation_cache_expires_at", "expires_at"),
+    )
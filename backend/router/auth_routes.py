@@ -3,14 +3,16 @@ import os
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from fastapi.responses import HTMLResponse, RedirectResponse 
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from authlib.integrations.starlette_client import OAuth
 # from requests_html import HTMLResponse
 import uuid
 
-from database.postgresConn import get_db
+from database.postgresConn import get_async_db
 # FIX: Import the specific model and schemas needed, with aliases
-from models.all_model import User as UserModel, UserRole
+from models.all_model import User as UserModel, CropList as CropListModel, UserRole
 from schemas.all_schema import TokenWithUser, UserCreate
 from auth import hashing, token
 
@@ -30,19 +32,24 @@ oauth.register(
 )
 
 @router.post("/login", response_model=TokenWithUser)
-def login(
+async def login(
     request: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Use the UserModel for the query
-    user = db.query(UserModel).filter(UserModel.email == request.username).first()
+    # Use the UserModel for the query; the response embeds the user's listings
+    user = (await db.execute(
+        select(UserModel)
+        .options(selectinload(UserModel.lists).selectinload(CropListModel.farmer))
+        .where(UserModel.email == request.username)
+    )).scalar_one_or_none()
 
-    if not user or not hashing.Hash.verify(request.password, user.hashed_password):
+    # bcrypt runs on the dedicated hashing pool, not the shared threadpool
+    if not user or not await hashing.Hash.verify_async(request.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
-    access_token = token.create_access_token(data={"sub": user.email})
+    access_token = token.create_user_access_token(user)
   
     return {
         "access_token": access_token, 
@@ -65,7 +72,7 @@ async def login_via_google(request: Request, role: str = Query("buyer", enum=["f
 
 # --- Update the '/google/callback' endpoint ---
 @router.get("/google/callback", name="auth_google_callback")
-async def auth_google_callback(request: Request, db: Session = Depends(get_db)):
+async def auth_google_callback(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         # Authlib automatically retrieves the 'state' we sent earlier.
         google_token = await oauth.google.authorize_access_token(request)
@@ -82,7 +89,7 @@ async def auth_google_callback(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail=f"Could not validate Google credentials: {e}")
 
     user_email = user_info['email']
-    user = db.query(UserModel).filter(UserModel.email == user_email).first()
+    user = (await db.execute(select(UserModel).where(UserModel.email == user_email))).scalar_one_or_none()
 
     if not user:
         try:
@@ -95,22 +102,19 @@ async def auth_google_callback(request: Request, db: Session = Depends(get_db)):
         new_user = UserModel(
             email=user_email,
             full_name=user_info.get('name'),
-            hashed_password=hashing.Hash.bcrypt(str(uuid.uuid4())),
+            hashed_password=await hashing.Hash.bcrypt_async(str(uuid.uuid4())),
             role=role_enum # <-- Use the role from the state
         )
         
         # 3. Add the new user to the database.
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
         
         user = new_user # Set the 'user' variable to our newly created user
     # --- END OF NEW LOGIC ---
 
     # The rest of the function proceeds as normal, creating a JWT for the (new or existing) user
-    app_jwt = token.create_access_token(
-        data={"sub": user.email, "user_id": user.id, "role": user.role.value}
-    )
+    app_jwt = token.create_user_access_token(user)
 
     # Return the token and user data to the frontend
     return HTMLResponse(f"""
@@ -2,14 +2,17 @@
 import os
 import shutil
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Form, HTTPException, Request, status
-from schemas.all_schema import TokenData, ForumPostSummaryResponse, ReplyCreate, PostDetailResponse # Or wherever your schemas are
+from fastapi import APIRouter, Depends, Form, HTTPException, Request, Response, status
+from schemas.all_schema import CurrentUser, ForumPostSummaryResponse, ReplyCreate, PostDetailResponse # Or wherever your schemas are
 from auth import oauth2
+from helpers.pagination import PageParams, page_params, paginate, finish_page
 
 # Import our database and model files
-from database.postgresConn import get_db
+from database.postgresConn import get_db, get_async_db
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload, selectinload
-from models.all_model import User, ForumPost, ForumReply
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.all_model import ForumPost, ForumReply
 
 # Create a new FastAPI router
 router = APIRouter(
@@ -21,24 +24,26 @@ router = APIRouter(
 
 # 1. Get All Posts (with Search and Category Filter)
 @router.get("/posts", response_model=List[ForumPostSummaryResponse] )
-def get_all_posts(
-    db: Session = Depends(get_db),
+async def get_all_posts(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    page: PageParams = Depends(page_params),
     category: Optional[str] = None,
     q: Optional[str] = None,
-    current_user: TokenData = Depends(oauth2.get_current_user),
+    current_user: CurrentUser = Depends(oauth2.get_current_user),
 ):
     # Use options() with selectinload and joinedload to fetch everything efficiently
-    query = db.query(ForumPost).options(
+    query = select(ForumPost).options(
         selectinload(ForumPost.replies), # Use selectinload for one-to-many relationships
         joinedload(ForumPost.author)     # Use joinedload for many-to-one relationships
     )
 
     if category:
-        query = query.filter(ForumPost.category == category)
+        query = query.where(ForumPost.category == category)
     if q:
-        query = query.filter(ForumPost.title.ilike(f"%{q}%"))
+        query = query.where(ForumPost.title.ilike(f"%{q}%"))
     
-    posts = query.all()
+    posts = finish_page((await db.execute(paginate(query, ForumPost, page))).scalars(), page, response)
     # Now, just add the reply_count attribute and return the SQLAlchemy objects directly!
     for post in posts:
         post.reply_count = len(post.replies)
@@ -48,7 +53,7 @@ def get_all_posts(
 
 # 2. Get a Single Post (with Replies)
 @router.get("/posts/{post_id}" , response_model=PostDetailResponse)
-def get_single_post(post_id: int, db: Session = Depends(get_db), current_user: TokenData = Depends(oauth2.get_current_user),):
+def get_single_post(post_id: int, db: Session = Depends(get_db), current_user: CurrentUser = Depends(oauth2.get_current_user),):
     # post = session.get(ForumPost, post_id)
 
     post = db.query(ForumPost).options(
@@ -72,7 +77,7 @@ async def create_post(
     title: str = Form(...),
     content: str = Form(...),
     category: str = Form(...),
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     print("Auth header:", request.headers.get("authorization"))
     print("Current user:", current_user)
@@ -90,16 +95,11 @@ async def create_post(
     #     except Exception as e:
     #         raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
         
-    # author = session.get(User, user_id)
-    author = db.query(User).filter(User.email == current_user.username).first()
-    if not author:
-        raise HTTPException(status_code=404, detail="Author not found")
-
     new_post = ForumPost(
         title=title, 
         content=content, 
         category=category, 
-        author_id=author.id,
+        author_id=current_user.id,
         image_url=image_url
     )
     db.add(new_post)
@@ -114,15 +114,14 @@ def create_reply(
     post_id: int,
     request: ReplyCreate,
     db: Session = Depends(get_db),
-    current_user: TokenData = Depends(oauth2.get_current_user),
+    current_user: CurrentUser = Depends(oauth2.get_current_user),
 ):
     # post = session.get(ForumPost, post_id)
     post = db.query(ForumPost).filter(ForumPost.id == post_id ).first()
-    author = db.query(User).filter(User.email == current_user.username).first()
-    if not post or not author:
-        raise HTTPException(status_code=404, detail="Post or Author not found")
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
     
-    if post.author_id == author.id:
+    if post.author_id == current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Users cannot reply to their own posts."
@@ -131,7 +130,7 @@ def create_reply(
     new_reply = ForumReply(
         content=request.content,
         post_id=post_id,
-        author_id=author.id
+        author_id=current_user.id
     )
     db.add(new_reply)
     db.commit()
@@ -1,14 +1,15 @@
 # # router/contract_routes.py
 
-from fastapi import APIRouter, Depends, HTTPException, status   
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Response, status   
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, cast, Optional
 from decimal import Decimal
 import json
 
-from database.postgresConn import get_db
+from database.postgresConn import get_db, get_async_db
 from models.all_model import (
-    User as UserModel,
     CropList as CropListModel,
     Contract as ContractModel,
     Transaction as TransactionModel,
@@ -20,11 +21,12 @@ from models.all_model import (
     NegotiationMessage as NegotiationMessageModel
 )
 from schemas.all_schema import (
-    ContractResponse, ContractCreate, ContractAcceptRequest, TokenData, 
+    ContractResponse, ContractCreate, ContractAcceptRequest, CurrentUser, 
     Transaction as TransactionSchema, ContractDashboardResponse, AIAdvice as AIAdviceSchema, ContractOfferUpdate,
     NegotiationMessageSchema
 )
 from auth import oauth2
+from helpers.pagination import PageParams, page_params, paginate, finish_page
 from helpers.compliance_helper import get_compliance_advice
 from helpers.financial_helper import get_contract_financials
 from helpers.websocket_manager import manager
@@ -35,10 +37,9 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=ContractResponse, status_code=status.HTTP_201_CREATED)
-def propose_contract(request: ContractCreate, db: Session = Depends(get_db), current_user: TokenData = Depends(oauth2.get_current_user)):
+def propose_contract(request: ContractCreate, db: Session = Depends(get_db), current_user: CurrentUser = Depends(oauth2.get_current_user)):
     """[BUYER ONLY] Propose a new contract for a crop listing."""
-    buyer = db.query(UserModel).filter(UserModel.email == current_user.username).first()
-    if buyer.role != UserRole.buyer:
+    if current_user.role != UserRole.buyer:
         raise HTTPException(status_code=403, detail="Only buyers can propose contracts.")
 
     listing = db.query(CropListModel).filter(CropListModel.id == request.listing_id).first()
@@ -50,7 +51,7 @@ def propose_contract(request: ContractCreate, db: Session = Depends(get_db), cur
     total_value = Decimal(request.quantity_proposed) * request.price_per_unit_agreed
     
     # 2. Get the buyer's wallet
-    buyer_wallet = db.query(WalletModel).filter(WalletModel.user_id == buyer.id).first()
+    buyer_wallet = db.query(WalletModel).filter(WalletModel.user_id == current_user.id).first()
 
     # 3. Check if the wallet balance is sufficient
     if buyer_wallet is None:
@@ -68,7 +69,7 @@ def propose_contract(request: ContractCreate, db: Session = Depends(get_db), cur
     
     new_contract = ContractModel(
         listing_id=listing.id,
-        buyer_id=buyer.id,
+        buyer_id=current_user.id,
         farmer_id=listing.farmer_id,
         quantity_proposed=request.quantity_proposed,
         price_per_unit_agreed=request.price_per_unit_agreed,
@@ -81,14 +82,13 @@ def propose_contract(request: ContractCreate, db: Session = Depends(get_db), cur
     return new_contract
 
 @router.post("/{contract_id}/accept", response_model=ContractResponse)
-def accept_contract(contract_id: int, request: ContractAcceptRequest, db: Session = Depends(get_db), current_user: TokenData = Depends(oauth2.get_current_user)):
+def accept_contract(contract_id: int, request: ContractAcceptRequest, db: Session = Depends(get_db), current_user: CurrentUser = Depends(oauth2.get_current_user)):
     """[FARMER ONLY] Accept a pending contract, locking buyer's funds in escrow."""
-    farmer = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     contract = db.query(ContractModel).filter(ContractModel.id == contract_id).first()
 
     if not contract:
         raise HTTPException(status_code=404, detail="Contract not found.")
-    if contract.farmer_id != farmer.id:
+    if contract.farmer_id != current_user.id:
         raise HTTPException(status_code=403, detail="You are not authorized to accept this contract.")
     if contract.status != ContractStatus.pending_farmer_approval:
         raise HTTPException(status_code=400, detail="This contract is not pending approval.")
@@ -117,17 +117,16 @@ def accept_contract(contract_id: int, request: ContractAcceptRequest, db: Sessio
     return contract
 
 @router.post("/{contract_id}/complete", response_model=ContractResponse)
-def complete_contract(contract_id: int, db: Session = Depends(get_db), current_user: TokenData = Depends(oauth2.get_current_user)):
+def complete_contract(contract_id: int, db: Session = Depends(get_db), current_user: CurrentUser = Depends(oauth2.get_current_user)):
     """[FARMER ONLY] Marks a contract as complete, releasing the final payment from escrow."""
-    farmer = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     contract = db.query(ContractModel).filter(ContractModel.id == contract_id).first()
 
-    if not contract or contract.farmer_id != farmer.id:
+    if not contract or contract.farmer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to complete this contract.")
     if contract.status != ContractStatus.ongoing:
         raise HTTPException(status_code=400, detail="Contract is not ongoing.")
         
-    financials = get_contract_financials(contract, db)
+    financials = get_contract_financials(contract)
     final_payment = financials["escrow_amount"]
 
     if final_payment > 0:
@@ -144,12 +143,11 @@ def complete_contract(contract_id: int, db: Session = Depends(get_db), current_u
     return contract
 
 @router.post("/{contract_id}/compliance-check", response_model=AIAdviceSchema)
-def get_contract_compliance_advice(contract_id: int, db: Session = Depends(get_db), current_user: TokenData = Depends(oauth2.get_current_user)):
+def get_contract_compliance_advice(contract_id: int, db: Session = Depends(get_db), current_user: CurrentUser = Depends(oauth2.get_current_user)):
     """[FARMER ONLY] Triggers the Compliance Helper to generate advice for a contract."""
-    farmer = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     contract = db.query(ContractModel).filter(ContractModel.id == contract_id).first()
 
-    if not contract or contract.farmer_id != farmer.id:
+    if not contract or contract.farmer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to get advice for this contract.")
         
     advice_text = get_compliance_advice(contract, db)
@@ -161,19 +159,20 @@ def get_contract_compliance_advice(contract_id: int, db: Session = Depends(get_d
 
 @router.get("/my-contracts", response_model=List[ContractResponse])
 def get_my_contracts_as_buyer(
+    response: Response,
     status: Optional[str] = None, # <-- ADD: Optional status query parameter
     db: Session = Depends(get_db), 
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user),
+    page: PageParams = Depends(page_params)
 ):
     """[BUYER ONLY] Gets contracts proposed by the current user, with optional status filtering."""
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
-    if user.role != UserRole.buyer:
+    if current_user.role != UserRole.buyer:
         raise HTTPException(status_code=403, detail="Only buyers can access this resource.")
 
     # Start the base query
     query = db.query(ContractModel).options(
         joinedload(ContractModel.listing).joinedload(CropListModel.farmer)
-    ).filter(ContractModel.buyer_id == user.id)
+    ).filter(ContractModel.buyer_id == current_user.id)
 
     # --- ADD THIS LOGIC ---
     # Conditionally add a filter based on the status parameter
@@ -189,36 +188,36 @@ def get_my_contracts_as_buyer(
     # If no status is provided, it will return all contracts
     # --- END OF LOGIC ---
 
-    contracts = query.order_by(ContractModel.created_at.desc()).all()
+    contracts = paginate(query, ContractModel, page).all()
     
-    return contracts
+    return finish_page(contracts, page, response)
 
 @router.get("/ongoing", response_model=List[ContractDashboardResponse])
-def get_ongoing_contracts(
-    db: Session = Depends(get_db),
-    current_user: TokenData = Depends(oauth2.get_current_user),
+async def get_ongoing_contracts(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(oauth2.get_current_user),
 ):
     """[BUYER & FARMER] Gets all ongoing contracts for the current user."""
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
 
-    contracts = (
-        db.query(ContractModel)
+    # Everything the response model touches must be eager-loaded; lazy loads are not allowed on AsyncSession.
+    result = await db.execute(
+        select(ContractModel)
         .options(
             joinedload(ContractModel.listing).joinedload(CropListModel.farmer),
             joinedload(ContractModel.buyer),
             joinedload(ContractModel.farmer),
-            joinedload(ContractModel.milestones).joinedload(MilestoneModel.shipment),
+            selectinload(ContractModel.milestones).selectinload(MilestoneModel.shipment),
         )
-        .filter(
-            (ContractModel.buyer_id == user.id) | (ContractModel.farmer_id == user.id),
+        .where(
+            (ContractModel.buyer_id == current_user.id) | (ContractModel.farmer_id == current_user.id),
             ContractModel.status == ContractStatus.ongoing,
         )
-        .all()
     )
+    contracts = result.unique().scalars().all()
 
     response = []
     for contract in contracts:
-        financials = get_contract_financials(contract, db)
+        financials = get_contract_financials(contract)
 
         # Attach the calculated values as new attributes to the SA object
         contract.total_value = financials['total_value']
@@ -230,10 +229,9 @@ def get_ongoing_contracts(
     return response
 
 @router.get("/listing/{listing_id}", response_model=List[ContractResponse])
-def get_proposals_for_listing(listing_id: int, db: Session = Depends(get_db), current_user: TokenData = Depends(oauth2.get_current_user)):
+def get_proposals_for_listing(listing_id: int, db: Session = Depends(get_db), current_user: CurrentUser = Depends(oauth2.get_current_user)):
     """[FARMER ONLY] Gets all pending proposals for a specific listing."""
-    farmer = db.query(UserModel).filter(UserModel.email == current_user.username).first()
-    listing = db.query(CropListModel).filter(CropListModel.id == listing_id, CropListModel.farmer_id == farmer.id).first()
+    listing = db.query(CropListModel).filter(CropListModel.id == listing_id, CropListModel.farmer_id == current_user.id).first()
     
     if not listing:
         raise HTTPException(status_code=404, detail=f"Listing not found or you do not own it.")
@@ -248,11 +246,10 @@ def get_proposals_for_listing(listing_id: int, db: Session = Depends(get_db), cu
 # --- ADD THIS ENTIRE FUNCTION TO router/contract_routes.py ---
 #
 @router.get("/completed", response_model=List[ContractDashboardResponse])
-def get_completed_contracts(db: Session = Depends(get_db), current_user: TokenData = Depends(oauth2.get_current_user)):
+def get_completed_contracts(db: Session = Depends(get_db), current_user: CurrentUser = Depends(oauth2.get_current_user)):
     """
     [FARMER & BUYER] Gets all contracts for the user that are marked as 'completed'.
     """
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     
     # This query is almost identical to 'get_ongoing_contracts'...
     contracts = db.query(ContractModel).options(
@@ -261,15 +258,15 @@ def get_completed_contracts(db: Session = Depends(get_db), current_user: TokenDa
         joinedload(ContractModel.farmer),
         joinedload(ContractModel.milestones)
     ).filter(
-        (ContractModel.buyer_id == user.id) | (ContractModel.farmer_id == user.id),
+        (ContractModel.buyer_id == current_user.id) | (ContractModel.farmer_id == current_user.id),
         # ...except for this line, which filters for COMPLETED status
         ContractModel.status == ContractStatus.completed  
     ).all()
     
-    # We still need to process the financials just like the ongoing route
+    # Financials come from the running totals on each contract, no extra queries
     processed_contracts = []
     for contract in contracts:
-        financials = get_contract_financials(contract, db)
+        financials = get_contract_financials(contract)
         
         # Attach the calculated values to the object for Pydantic validation
         contract.total_value = financials['total_value']
@@ -285,14 +282,13 @@ def get_completed_contracts(db: Session = Depends(get_db), current_user: TokenDa
 @router.get("/proposals/pending", response_model=List[ContractResponse])
 def get_all_pending_proposals_for_farmer(
     db: Session = Depends(get_db),
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     """
     [FARMER ONLY] Gets all contract proposals across ALL listings 
     that are pending this farmer's approval.
     """
-    farmer = db.query(UserModel).filter(UserModel.email == current_user.username).first()
-    if farmer.role != UserRole.farmer:
+    if current_user.role != UserRole.farmer:
         raise HTTPException(status_code=403, detail="Only farmers can view their proposals.")
 
     # Find all contracts where the farmer_id matches the current user
@@ -301,7 +297,7 @@ def get_all_pending_proposals_for_farmer(
         joinedload(ContractModel.listing),
         joinedload(ContractModel.buyer)
     ).filter(
-        ContractModel.farmer_id == farmer.id,
+        ContractModel.farmer_id == current_user.id,
         ContractModel.status == ContractStatus.pending_farmer_approval
     ).all()
     
@@ -310,14 +306,13 @@ def get_all_pending_proposals_for_farmer(
 @router.get("/proposals/sent-pending", response_model=List[ContractResponse])
 def get_all_pending_proposals_by_buyer(
     db: Session = Depends(get_db),
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     """
     [BUYER ONLY] Gets all contract proposals sent by the current buyer
     that are still awaiting farmer approval.
     """
-    buyer = db.query(UserModel).filter(UserModel.email == current_user.username).first()
-    if buyer.role != UserRole.buyer:
+    if current_user.role != UserRole.buyer:
         raise HTTPException(status_code=403, detail="Only buyers can view their sent proposals.")
 
     # Find all contracts where the buyer_id matches the current user
@@ -326,7 +321,7 @@ def get_all_pending_proposals_by_buyer(
         joinedload(ContractModel.listing),
         joinedload(ContractModel.farmer)
     ).filter(
-        ContractModel.buyer_id == buyer.id,
+        ContractModel.buyer_id == current_user.id,
         ContractModel.status == ContractStatus.pending_farmer_approval
     ).all()
     
@@ -334,17 +329,16 @@ def get_all_pending_proposals_by_buyer(
 
 # ... (after your other endpoints)
 @router.post("/{contract_id}/reject", response_model=ContractResponse)
-def reject_contract(contract_id: int, db: Session = Depends(get_db), current_user: TokenData = Depends(oauth2.get_current_user)):
+def reject_contract(contract_id: int, db: Session = Depends(get_db), current_user: CurrentUser = Depends(oauth2.get_current_user)):
     """
     [FARMER ONLY] Reject a pending contract proposal.
     """
-    farmer = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     contract = db.query(ContractModel).filter(ContractModel.id == contract_id).first()
 
     if not contract:
         raise HTTPException(status_code=404, detail="Contract not found.")
     
-    if contract.farmer_id != farmer.id:
+    if contract.farmer_id != current_user.id:
         raise HTTPException(status_code=403, detail="You are not authorized to reject this contract.")
     
     if contract.status != ContractStatus.pending_farmer_approval:
@@ -359,16 +353,15 @@ def reject_contract(contract_id: int, db: Session = Depends(get_db), current_use
 def start_negotiation(
     contract_id: int, 
     db: Session = Depends(get_db), 
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     """[FARMER ONLY] Changes a contract status from 'pending' to 'negotiating'."""
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     contract = db.query(ContractModel).filter(ContractModel.id == contract_id).first()
 
     # Authorization checks
     if not contract:
         raise HTTPException(status_code=404, detail="Contract not found.")
-    if contract.farmer_id != user.id:
+    if contract.farmer_id != current_user.id:
         raise HTTPException(status_code=403, detail="You are not authorized to modify this contract.")
     
     # Logic check: Can only start negotiating on a pending contract
@@ -389,14 +382,13 @@ async def update_contract_offer(
     contract_id: int, 
     request: ContractOfferUpdate, # The schema for your request body
     db: Session = Depends(get_db), 
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     """Updates the terms of a contract during negotiation."""
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     contract = db.query(ContractModel).filter(ContractModel.id == contract_id).first()
 
     # Authorization check (this part is correct)
-    if not contract or user.id not in [contract.buyer_id, contract.farmer_id]:
+    if not contract or current_user.id not in [contract.buyer_id, contract.farmer_id]:
         raise HTTPException(status_code=403, detail="Not authorized.")
     
     # --- FIX #2: Allow updates from 'pending' OR 'negotiating' states ---
@@ -409,7 +401,7 @@ async def update_contract_offer(
     # Update the actual contract terms
     contract.price_per_unit_agreed = request.price_per_unit_agreed
     contract.quantity_proposed = request.quantity_proposed
-    contract.last_offer_by = user.role.value # Assumes user.role is an Enum
+    contract.last_offer_by = current_user.role # 'buyer' or 'farmer', straight from the token claims
     contract.status = ContractStatus.negotiating # Always set to 'negotiating' after an offer
     
     db.commit()
@@ -417,7 +409,7 @@ async def update_contract_offer(
     # After saving, broadcast a notification message via the WebSocket
     notification_payload = {
         "type": "system_message",
-        "message": f"A new offer was sent by {user.role.value}: Price ₹{contract.price_per_unit_agreed}, Quantity {contract.quantity_proposed}"
+        "message": f"A new offer was sent by {current_user.role}: Price ₹{contract.price_per_unit_agreed}, Quantity {contract.quantity_proposed}"
     }
     await manager.broadcast(json.dumps(notification_payload), contract.id)
 
@@ -427,11 +419,12 @@ async def update_contract_offer(
 @router.get("/{contract_id}/negotiation-history", response_model=List[NegotiationMessageSchema])
 def get_negotiation_history(
     contract_id: int, 
+    response: Response,
     db: Session = Depends(get_db), 
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user),
+    page: PageParams = Depends(page_params)
 ):
     """Gets the chat history for a specific contract negotiation."""
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     contract = db.query(ContractModel).filter(ContractModel.id == contract_id).first()
 
     # --- THIS IS THE UPDATED VALIDATION LOGIC ---
@@ -443,10 +436,10 @@ def get_negotiation_history(
         )
 
     # Next, check if the current user is part of this contract
-    if user.id not in [contract.buyer_id, contract.farmer_id]:
+    if current_user.id not in [contract.buyer_id, contract.farmer_id]:
         # Provide a detailed error message for easier debugging
         detail_message = (
-            f"Authorization Error: Current user ID '{user.id}' is not authorized for this contract. "
+            f"Authorization Error: Current user ID '{current_user.id}' is not authorized for this contract. "
             f"Allowed IDs are Buyer: '{contract.buyer_id}' and Farmer: '{contract.farmer_id}'."
         )
         raise HTTPException(
@@ -455,30 +448,31 @@ def get_negotiation_history(
         )
     # --- END OF FIX ---
 
+    # Oldest first, so the chat reads top to bottom and later pages continue the thread
     history = db.query(NegotiationMessageModel).filter(
         NegotiationMessageModel.contract_id == contract_id
-    ).order_by(NegotiationMessageModel.created_at.asc()).all()
+    )
+    history = paginate(history, NegotiationMessageModel, page, descending=False).all()
     
-    return history
+    return finish_page(history, page, response)
 
 @router.post("/{contract_id}/accept-offer", response_model=ContractResponse)
 def buyer_accepts_offer(
     contract_id: int, 
     db: Session = Depends(get_db), 
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     """[BUYER ONLY] Accepts a farmer's counter-offer and moves the contract to 'ongoing'."""
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     contract = db.query(ContractModel).options(joinedload(ContractModel.listing)).filter(ContractModel.id == contract_id).first()
 
     # Validation
-    if not contract or contract.buyer_id != user.id:
+    if not contract or contract.buyer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized.")
     if contract.status != ContractStatus.negotiating or contract.last_offer_by != ProposerRole.farmer:
         raise HTTPException(status_code=400, detail="No pending offer from the farmer to accept.")
 
     # --- This is the same Escrow logic as the original 'accept' endpoint ---
-    wallet = db.query(WalletModel).filter(WalletModel.user_id == user.id).first()
+    wallet = db.query(WalletModel).filter(WalletModel.user_id == current_user.id).first()
     total_value = contract.total_value # Use the updated total value
     if not wallet or wallet.balance < total_value:
         raise HTTPException(status_code=400, detail="Insufficient funds to secure the contract.")
@@ -498,13 +492,12 @@ def buyer_accepts_offer(
 def buyer_rejects_offer(
     contract_id: int, 
     db: Session = Depends(get_db), 
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     """[BUYER ONLY] Rejects a farmer's counter-offer."""
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     contract = db.query(ContractModel).filter(ContractModel.id == contract_id).first()
 
-    if not contract or contract.buyer_id != user.id:
+    if not contract or contract.buyer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized.")
 
     contract.status = ContractStatus.rejected
@@ -1,17 +1,23 @@
 # # router/croplist_routes.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from datetime import date
+from decimal import Decimal
 
-from database.postgresConn import get_db
+from database.postgresConn import get_db, get_async_db
 # FIX: Import models and schemas with aliases
-from models.all_model import CropList as CropListModel, User as UserModel, UserRole
+from models.all_model import CropList as CropListModel, UserRole
 from models.all_model import Contract as ContractModel, ContractStatus
-from schemas.all_schema import CropListResponse, CropListCreate, CropListUpdate, TokenData, ProposalAnalysis
+from schemas.all_schema import CropListResponse, CropListCreate, CropListUpdate, CropListSearchResult, CropListRecommendation, CurrentUser, ProposalAnalysis
 from helpers.proposal_analyzer import analyze_proposals
+from helpers.pagination import PageParams, page_params, paginate, finish_page, MAX_PAGE_SIZE, DEFAULT_PAGE_SIZE
+from helpers.listing_search import ListingSearchFilters, build_search_query
 
-from helpers.recommendation_engine import get_template_recommendation_with_llm
+from services.recommendation_worker import recommendation_worker
 from auth import oauth2
 
 router = APIRouter(
@@ -23,27 +29,22 @@ router = APIRouter(
 def create_croplist(
     request: CropListCreate,
     db: Session = Depends(get_db),
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     # ... (your existing user and role check logic)
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
-    if not user or user.role != UserRole.farmer:
+    if current_user.role != UserRole.farmer:
         raise HTTPException(status_code=403, detail="Only farmers can create listings.")
     
-    new_listing = CropListModel(**request.model_dump(), farmer_id=user.id)
+    new_listing = CropListModel(**request.model_dump(), farmer_id=current_user.id)
     db.add(new_listing)
     db.commit()
     db.refresh(new_listing)
+    # The owner's /me profile embeds their listings
+    oauth2.evict_cached_user(current_user.id)
     
-    # Get the AI recommendation
-    recommendation_data = get_template_recommendation_with_llm(new_listing)
-    
-    # FIX: Save the recommendation to the database
-    if recommendation_data:
-        new_listing.recommended_template_name = recommendation_data.get("template_name")
-        new_listing.recommendation_reason = recommendation_data.get("reason")
-        db.commit()
-        db.refresh(new_listing)
+    # The AI recommendation is filled in by the background worker; poll
+    # GET /api/croplists/{id}/recommendation until its status leaves 'pending'.
+    recommendation_worker.enqueue(new_listing.id)
 
     return new_listing
 
@@ -52,57 +53,119 @@ def update_croplist(
     list_id: int,
     request: CropListUpdate,
     db: Session = Depends(get_db),
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     listing_query = db.query(CropListModel).filter(CropListModel.id == list_id)
     listing = listing_query.first()
     if not listing:
         raise HTTPException(status_code=404, detail=f"Listing with ID {list_id} not found.")
 
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
-    if listing.farmer_id != user.id:
+    if listing.farmer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this listing.")
     
     listing_query.update(request.model_dump(exclude_unset=True))
     db.commit()
+    oauth2.evict_cached_user(current_user.id)
     return listing_query.first()
 
 @router.get("/", response_model=List[CropListResponse])
-def get_all_active_croplists(
-    db: Session = Depends(get_db),
-    current_user: TokenData = Depends(oauth2.get_current_user),
+async def get_all_active_croplists(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(oauth2.get_current_user),
+    page: PageParams = Depends(page_params),
     crop_type: Optional[str] = None,
     location: Optional[str] = None
 ):
-    query = db.query(CropListModel).filter(CropListModel.status == 'active')
+    query = select(CropListModel).options(joinedload(CropListModel.farmer)).where(CropListModel.status == 'active')
     if crop_type:
-        query = query.filter(CropListModel.crop_type.ilike(f"%{crop_type}%"))
+        query = query.where(CropListModel.crop_type.ilike(f"%{crop_type}%"))
     if location:
-        query = query.filter(CropListModel.location.ilike(f"%{location}%"))
+        query = query.where(CropListModel.location.ilike(f"%{location}%"))
 
-    listings = query.all()
+    listings = finish_page((await db.execute(paginate(query, CropListModel, page))).scalars(), page, response)
         # FIX: Hide private recommendations from users who are not the owner
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     for listing in listings:
-        if listing.farmer_id != user.id:
+        if listing.farmer_id != current_user.id:
             listing.recommended_template_name = None
             listing.recommendation_reason = None
     
     return listings
 
+# Declared before /{list_id} so "search" is not parsed as a listing id
+@router.get("/search", response_model=List[CropListSearchResult])
+async def search_croplists(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(oauth2.get_current_user),
+    q: Optional[str] = Query(None, description="Free text matched against crop type, farming practice and location"),
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    harvest_from: Optional[date] = None,
+    harvest_to: Optional[date] = None,
+    soil_type: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=10_000),
+):
+    """Ranked, typo-tolerant search over active listings, best matches first."""
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=400, detail="min_price cannot be greater than max_price.")
+    if harvest_from and harvest_to and harvest_from > harvest_to:
+        raise HTTPException(status_code=400, detail="harvest_from cannot be after harvest_to.")
+    filters = ListingSearchFilters(
+        min_price=min_price, max_price=max_price,
+        harvest_from=harvest_from, harvest_to=harvest_to,
+        soil_type=soil_type,
+    )
+    rows = (await db.execute(build_search_query(q, filters, limit, offset))).all()
+
+    results = []
+    for listing, rank in rows:
+        listing.rank = float(rank)
+        if listing.farmer_id != current_user.id:
+            listing.recommended_template_name = None
+            listing.recommendation_reason = None
+        results.append(listing)
+    return results
+
+@router.get("/{list_id}/recommendation", response_model=CropListRecommendation)
+async def get_croplist_recommendation(
+    list_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
+):
+    """[FARMER ONLY] The listing's template recommendation and whether it is still pending."""
+    row = (await db.execute(
+        select(
+            CropListModel.farmer_id,
+            CropListModel.recommendation_status,
+            CropListModel.recommended_template_name,
+            CropListModel.recommendation_reason,
+        ).where(CropListModel.id == list_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail=f"Listing with ID {list_id} not found.")
+    if row.farmer_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to view this recommendation.")
+
+    return CropListRecommendation(
+        listing_id=list_id,
+        status=row.recommendation_status,
+        template_name=row.recommended_template_name,
+        reason=row.recommendation_reason,
+    )
+
 @router.get("/{list_id}", response_model=CropListResponse)
 def get_croplist_by_id(
     list_id: int,
     db: Session = Depends(get_db),
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     listing = db.query(CropListModel).filter(CropListModel.id == list_id).first()
     if not listing:
         raise HTTPException(status_code=404, detail=f"Listing with ID {list_id} not found.")
     # Hide the recommendation if the requester is not the owner
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
 
-    if listing.farmer_id != user.id:
+    if listing.farmer_id != current_user.id:
         listing.recommended_template_name = None
         listing.recommendation_reason = None
         
@@ -114,19 +177,18 @@ def get_croplist_by_id(
 def get_proposal_analysis(
     list_id: int,
     db: Session = Depends(get_db),
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     """
     [FARMER ONLY] Triggers the AI Proposal Analyzer for a specific crop listing.
     """
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     listing = db.query(CropListModel).filter(CropListModel.id == list_id).first()
 
     if not listing:
         raise HTTPException(status_code=404, detail="Crop listing not found.")
 
     # Authorization: Only the farmer who owns the listing can get an analysis.
-    if listing.farmer_id != user.id:
+    if listing.farmer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to analyze proposals for this listing.")
 
     # Fetch all pending proposals for this listing
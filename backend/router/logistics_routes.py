@@ -5,12 +5,11 @@ from sqlalchemy.orm import Session, joinedload
 from models.all_model import (
     Contract as ContractModel, 
     Shipment as ShipmentModel, 
-    User as UserModel,
     Milestone as MilestoneModel
 )
 from database.postgresConn import get_db
 from schemas.all_schema import (
-    TokenData, QuoteRequest, QuoteResponse, Shipment as ShipmentSchema,
+    CurrentUser, QuoteRequest, QuoteResponse, Shipment as ShipmentSchema,
     TrackingResponse, BookingRequest
 )
 from auth import oauth2
@@ -26,13 +25,12 @@ def get_transport_quote_for_milestone(
     milestone_id: int,
     request: QuoteRequest,
     db: Session = Depends(get_db),
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     """[FARMER or BUYER] Gets a simulated logistics quote for a specific milestone."""
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     milestone = db.query(MilestoneModel).options(joinedload(MilestoneModel.contract)).filter(MilestoneModel.id == milestone_id).first()
 
-    if not milestone or user.id not in [milestone.contract.buyer_id, milestone.contract.farmer_id]:
+    if not milestone or current_user.id not in [milestone.contract.buyer_id, milestone.contract.farmer_id]:
         raise HTTPException(status_code=403, detail="Not authorized for this contract's milestones.")
     
     quote = logistics_provider.get_quote(
@@ -47,13 +45,12 @@ def book_transport_for_milestone(
     milestone_id: int,
     request: BookingRequest,
     db: Session = Depends(get_db),
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     """[FARMER or BUYER] Books a simulated shipment for a specific milestone."""
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     milestone = db.query(MilestoneModel).options(joinedload(MilestoneModel.contract)).filter(MilestoneModel.id == milestone_id).first()
     
-    if not milestone or user.id not in [milestone.contract.buyer_id, milestone.contract.farmer_id]:
+    if not milestone or current_user.id not in [milestone.contract.buyer_id, milestone.contract.farmer_id]:
         raise HTTPException(status_code=403, detail="Not authorized for this milestone.")
         
     if milestone.shipment:
@@ -76,14 +73,13 @@ def book_transport_for_milestone(
     return new_shipment
 
 @router.get("/shipment/{shipment_id}/track", response_model=TrackingResponse)
-def track_shipment_status(shipment_id: int, db: Session = Depends(get_db), current_user: TokenData = Depends(oauth2.get_current_user)):
+def track_shipment_status(shipment_id: int, db: Session = Depends(get_db), current_user: CurrentUser = Depends(oauth2.get_current_user)):
     """[FARMER or BUYER] Tracks the status of a specific shipment."""
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     shipment = db.query(ShipmentModel).options(joinedload(ShipmentModel.contract)).filter(ShipmentModel.id == shipment_id).first()
 
     if not shipment:
         raise HTTPException(status_code=404, detail="Shipment not found.")
-    if user.id not in [shipment.contract.buyer_id, shipment.contract.farmer_id]:
+    if current_user.id not in [shipment.contract.buyer_id, shipment.contract.farmer_id]:
         raise HTTPException(status_code=403, detail="Not authorized to track this shipment.")
         
     tracking_info = logistics_provider.track_shipment(shipment)
@@ -97,14 +93,13 @@ def track_shipment_status(shipment_id: int, db: Session = Depends(get_db), curre
     return tracking_info
 
 @router.delete("/shipment/{shipment_id}/cancel")
-def cancel_shipment_booking(shipment_id: int, db: Session = Depends(get_db), current_user: TokenData = Depends(oauth2.get_current_user)):
+def cancel_shipment_booking(shipment_id: int, db: Session = Depends(get_db), current_user: CurrentUser = Depends(oauth2.get_current_user)):
     """[FARMER or BUYER] Cancels a shipment booking if possible."""
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     shipment = db.query(ShipmentModel).options(joinedload(ShipmentModel.contract)).filter(ShipmentModel.id == shipment_id).first()
 
     if not shipment:
         raise HTTPException(status_code=404, detail="Shipment not found.")
-    if user.id not in [shipment.contract.buyer_id, shipment.contract.farmer_id]:
+    if current_user.id not in [shipment.contract.buyer_id, shipment.contract.farmer_id]:
         raise HTTPException(status_code=403, detail="Not authorized to cancel this shipment.")
         
     cancellation_info = logistics_provider.cancel_shipment(shipment)
@@ -0,0 +1,82 @@
+# router/metrics_routes.py
+
+import hmac
+import os
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from database.postgresConn import pool_metrics, async_pool_metrics
+from auth.oauth2 import user_cache
+from auth.hashing import hash_executor
+from services.recommendation_worker import recommendation_worker
+from helpers.recommendation_cache import recommendation_cache
+from helpers.crop_recommendation_cache import crop_recommendation_cache
+from services.llm_gateway import llm_gateway
+from services.inference import inference_stats
+from services.http_client import http_clients
+from services.crop_recommender import recommendation_stats
+
+# Metrics are off unless a token is configured; callers send it as X-Metrics-Token
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+def require_metrics_token(x_metrics_token: str | None = Header(default=None)):
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_metrics_token or not hmac.compare_digest(x_metrics_token, METRICS_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid metrics token.")
+
+
+router = APIRouter(
+    prefix="/api/metrics",
+    tags=["Metrics"],
+    dependencies=[Depends(require_metrics_token)],
+)
+
+@router.get("/db-pool")
+def get_db_pool_metrics():
+    """Live connection pool statistics for sizing the Postgres side."""
+    return {
+        "sync": pool_metrics.snapshot(),
+        "async": async_pool_metrics.snapshot(),
+    }
+
+@router.get("/user-cache")
+def get_user_cache_metrics():
+    """Hit/miss counters for the current-user cache behind /api/users/me."""
+    return user_cache.stats()
+
+@router.get("/password-hashing")
+def get_password_hashing_metrics():
+    """Queue depth, wait and run times of the dedicated bcrypt pool."""
+    return hash_executor.stats()
+
+@router.get("/recommendations")
+def get_recommendation_worker_metrics():
+    """Backlog, retries and failures of the background template recommendation worker."""
+    return recommendation_worker.stats()
+
+@router.get("/recommendation-cache")
+def get_recommendation_cache_metrics():
+    """Hit ratio of the fingerprint cache in front of the template recommendation LLM."""
+    return recommendation_cache.stats()
+
+@router.get("/llm")
+def get_llm_gateway_metrics():
+    """Per-purpose calls, cache hits, retries, tokens and latency of the shared LLM gateway."""
+    return llm_gateway.stats()
+
+@router.get("/inference")
+def get_inference_metrics():
+    """Inference pool queue depth and latency, plus per-model micro-batching stats."""
+    return inference_stats()
+
+@router.get("/crop-recommendations")
+def get_crop_recommendation_metrics():
+    """How often Gemini beat its deadline versus the rule-based answer, late Gemini calls, and the bucketed answer cache."""
+    return {**recommendation_stats.snapshot(), "cache": crop_recommendation_cache.stats()}
+
+@router.get("/http")
+def get_http_client_metrics():
+    """Outbound HTTP: pooled clients, and per-host request counts, errors and latency."""
+    return http_clients.stats()
@@ -7,7 +7,6 @@ from decimal import Decimal
 
 from database.postgresConn import get_db
 from models.all_model import (
-    User as UserModel,
     Contract as ContractModel,
     Milestone as MilestoneModel,
     Transaction as TransactionModel,
@@ -15,7 +14,7 @@ from models.all_model import (
     ContractStatus,
     UserRole
 )
-from schemas.all_schema import Milestone as MilestoneSchema, TokenData, MilestoneCreate, MilestoneUpdateByFarmer
+from schemas.all_schema import Milestone as MilestoneSchema, CurrentUser, MilestoneCreate, MilestoneUpdateByFarmer
 from auth import oauth2
 from helpers.milestone_helper import analyze_milestone_image
 from helpers.financial_helper import get_contract_financials
@@ -26,12 +25,11 @@ router = APIRouter(
 )
 
 @router.post("/contract/{contract_id}", response_model=MilestoneSchema)
-def create_milestone_by_buyer(contract_id: int, request: MilestoneCreate, db: Session = Depends(get_db), current_user: TokenData = Depends(oauth2.get_current_user)):
+def create_milestone_by_buyer(contract_id: int, request: MilestoneCreate, db: Session = Depends(get_db), current_user: CurrentUser = Depends(oauth2.get_current_user)):
     """[BUYER ONLY] Creates the milestone structure for an ongoing contract."""
-    buyer = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     contract = db.query(ContractModel).filter(ContractModel.id == contract_id).first()
 
-    if not contract or contract.buyer_id != buyer.id:
+    if not contract or contract.buyer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only the contract buyer can create milestones.")
 
     new_milestone = MilestoneModel(
@@ -45,14 +43,13 @@ def create_milestone_by_buyer(contract_id: int, request: MilestoneCreate, db: Se
     return new_milestone
 
 @router.put("/{milestone_id}/update", response_model=MilestoneSchema)
-def update_milestone_by_farmer(milestone_id: int, request: MilestoneUpdateByFarmer, db: Session = Depends(get_db), current_user: TokenData = Depends(oauth2.get_current_user)):
+def update_milestone_by_farmer(milestone_id: int, request: MilestoneUpdateByFarmer, db: Session = Depends(get_db), current_user: CurrentUser = Depends(oauth2.get_current_user)):
     """[FARMER ONLY] Farmer submits an update for a milestone and marks it complete."""
-    farmer = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     milestone = db.query(MilestoneModel).options(joinedload(MilestoneModel.contract)).filter(MilestoneModel.id == milestone_id).first()
 
     if not milestone:
         raise HTTPException(status_code=404, detail="Milestone not found")
-    if milestone.contract.farmer_id != farmer.id:
+    if milestone.contract.farmer_id != current_user.id:
         raise HTTPException(status_code=403, detail="You are not the farmer for this contract")
     if milestone.is_complete:
         raise HTTPException(status_code=400, detail="This milestone has already been marked complete")
@@ -75,19 +72,18 @@ def update_milestone_by_farmer(milestone_id: int, request: MilestoneUpdateByFarm
 def release_milestone_payment(
     milestone_id: int, 
     db: Session = Depends(get_db), 
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     """
     [BUYER ONLY] Releases the payment for a completed milestone.
     This version checks if the contract is complete after payment.
     """
-    buyer = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     milestone = db.query(MilestoneModel).options(joinedload(MilestoneModel.contract)).filter(MilestoneModel.id == milestone_id).first()
     
     if not milestone:
         raise HTTPException(status_code=404, detail="Milestone not found.")
     
-    if milestone.contract.buyer_id != buyer.id:
+    if milestone.contract.buyer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only the contract buyer can release payments.")
         
     if not milestone.is_complete:
@@ -96,7 +92,7 @@ def release_milestone_payment(
     if milestone.payment_released:
         raise HTTPException(status_code=400, detail="Payment for this milestone has already been released.")
 
-    financials = get_contract_financials(milestone.contract, db)
+    financials = get_contract_financials(milestone.contract)
     escrow_balance = financials["escrow_amount"]
     milestone_target_amount = milestone.amount
     
@@ -144,12 +140,11 @@ def release_milestone_payment(
     return milestone
 
 @router.get("/contract/{contract_id}", response_model=List[MilestoneSchema])
-def get_milestones_for_contract(contract_id: int, db: Session = Depends(get_db), current_user: TokenData = Depends(oauth2.get_current_user)):
+def get_milestones_for_contract(contract_id: int, db: Session = Depends(get_db), current_user: CurrentUser = Depends(oauth2.get_current_user)):
     """[FARMER & BUYER] Gets all milestones for a specific contract."""
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     contract = db.query(ContractModel).filter(ContractModel.id == contract_id).first()
 
-    if not contract or user.id not in [contract.farmer_id, contract.buyer_id]:
+    if not contract or current_user.id not in [contract.farmer_id, contract.buyer_id]:
         raise HTTPException(status_code=403, detail="Not authorized to view these milestones.")
     
     milestones = db.query(MilestoneModel).filter(MilestoneModel.contract_id == contract_id).order_by(MilestoneModel.created_at.asc()).all()
@@ -161,19 +156,18 @@ def complete_milestone_as_farmer(
     milestone_id: int,
     request: MilestoneUpdateByFarmer,
     db: Session = Depends(get_db),
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     """
     [FARMER ONLY] Farmer submits an update for a milestone and marks it complete.
     """
-    farmer = db.query(UserModel).filter(UserModel.email == current_user.username).first()
     milestone = db.query(MilestoneModel).options(joinedload(MilestoneModel.contract)).filter(MilestoneModel.id == milestone_id).first()
 
     if not milestone:
         raise HTTPException(status_code=404, detail="Milestone not found")
 
     # Security check: Make sure the logged-in user is the farmer for this contract
-    if milestone.contract.farmer_id != farmer.id:
+    if milestone.contract.farmer_id != current_user.id:
         raise HTTPException(status_code=403, detail="You are not the farmer for this contract")
 
     if milestone.is_complete:
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, UploadFile, File, status, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, Request, status, HTTPException
 from fastapi.responses import JSONResponse
-from schemas.all_schema import TokenData, RecommendationRequest, RecommendationResponse
+from schemas.all_schema import CurrentUser, RecommendationRequest, RecommendationResponse, BulkRecommendationRequest
 from auth import oauth2
 from services.weatherAPI import fetch_google_weather_and_advisories
-from services.cotton_model import cotton_disease_model
-from services.tomato_model import tomato_disease_model
-from services.crop_recommender import recommend, fetch_weather_by_coords
+from services.model_registry import model_registry
+from services.model_store import ModelUnavailable
+from services.image_preprocessing import ImageRejected, read_upload
+from services.batch_prediction import BATCH_UPLOAD_OPENAPI, stream_batch_predictions
+from services.crop_recommender import recommend, fetch_weather_by_coords, merge_weather
+from services.bulk_recommendation import stream_bulk_recommendations
+from helpers.bounded_executor import ExecutorSaturated
 import logging
 
 router = APIRouter(
@@ -14,31 +18,78 @@ router = APIRouter(
 )
 
 @router.get("/weather")
-async def get_weather(current_user: TokenData = Depends(oauth2.get_current_user)):
+async def get_weather(current_user: CurrentUser = Depends(oauth2.get_current_user)):
     response = await fetch_google_weather_and_advisories()
     return response
 
+@router.get("/models/ready")
+async def disease_models_ready():
+    """Readiness of the disease models: 200 once all are loaded, 503 while any is loading or failed."""
+    report = model_registry.status()
+    return JSONResponse(content=report, status_code=200 if report["ready"] else 503)
+
 @router.post("/cotton-predict")
 async def predict_cotton(file: UploadFile = File(...)):
     try:
-        image_bytes = await file.read()
-        result = cotton_disease_model.predict_disease(image_bytes)
+        # Oversized uploads are refused while reading, before any decoding
+        image_bytes = await read_upload(file)
+        batcher = await model_registry.batcher("cotton")
+        # Decoding runs on the inference pool; concurrent uploads share one forward pass
+        result = await batcher.predict(image_bytes)
         return JSONResponse(content=result)
+    except ExecutorSaturated:
+        raise
+    except ModelUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "5"})
+    except ImageRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
     
+async def _batch_predict(model_name: str, request: Request):
+    try:
+        batcher = await model_registry.batcher(model_name)
+    except ModelUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "5"})
+    return await stream_batch_predictions(batcher, request)
+
+@router.post("/cotton-predict/batch", openapi_extra=BATCH_UPLOAD_OPENAPI)
+async def predict_cotton_batch(request: Request):
+    """
+    Many photos (files and/or zips) in one upload; one NDJSON result line per image as it completes.
+    Inference starts while the upload is still arriving, but the first line is only sent once the
+    whole upload has been received.
+    """
+    return await _batch_predict("cotton", request)
+
 logger = logging.getLogger("recommendation")
 logging.basicConfig(level=logging.INFO)
 
 @router.post("/tomato-predict")
 async def predict_tomato(file: UploadFile = File(...)):
     try:
-        image_bytes = await file.read()        
-        result = tomato_disease_model.predict_disease(image_bytes)
+        image_bytes = await read_upload(file)
+        batcher = await model_registry.batcher("tomato")
+        result = await batcher.predict(image_bytes)
         return JSONResponse(content=result)
+    except ExecutorSaturated:
+        raise
+    except ModelUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "5"})
+    except ImageRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
+@router.post("/tomato-predict/batch", openapi_extra=BATCH_UPLOAD_OPENAPI)
+async def predict_tomato_batch(request: Request):
+    """
+    Many photos (files and/or zips) in one upload; one NDJSON result line per image as it completes.
+    Inference starts while the upload is still arriving, but the first line is only sent once the
+    whole upload has been received.
+    """
+    return await _batch_predict("tomato", request)
+
 logger = logging.getLogger("recommendation")
 logging.basicConfig(level=logging.INFO)
 
@@ -49,13 +100,7 @@ async def recommend_crops(req: RecommendationRequest):
     # If lat/lon provided, try to fetch current weather and merge
     if params.get("latitude") is not None and params.get("longitude") is not None:
         weather = await fetch_weather_by_coords(params["latitude"], params["longitude"])
-        if weather:
-            if params.get("temperature") is None and weather.get("temperature") is not None:
-                params["temperature"] = weather["temperature"]
-            if params.get("humidity") is None and weather.get("humidity") is not None:
-                params["humidity"] = weather["humidity"]
-            if params.get("rainfall") is None and weather.get("rainfall") is not None:
-                params["rainfall"] = weather["rainfall"]
+        merge_weather(params, weather)
 
     try:
         recs, source = await recommend(params, top_k=5)
@@ -66,3 +111,7 @@ async def recommend_crops(req: RecommendationRequest):
 
     return {"recommendations": recs, "source": source}
 
+@router.post("/recommend-crops/bulk")
+async def recommend_crops_bulk(req: BulkRecommendationRequest):
+    """Rule-based recommendations for many plots; one NDJSON line per plot, in request order."""
+    return await stream_bulk_recommendations(req.plots, top_k=req.top_k)
@@ -1,7 +1,7 @@
 import uuid
 from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, status, Query
 from auth import oauth2 # Your existing oauth2 logic
-from schemas.all_schema import TokenData # Your existing TokenData schema
+from schemas.all_schema import CurrentUser
 from database.supabase_client import supabase
 
 router = APIRouter(
@@ -15,7 +15,7 @@ SIGNATURE_BUCKET = "signatures" # The name of your bucket in Supabase
 async def upload_signature(
     file: UploadFile = File(...),
     role: str = Query(..., enum=["buyer", "farmer"]),
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     if not file.content_type.startswith("image/"):
         raise HTTPException(
@@ -26,9 +26,8 @@ async def upload_signature(
     try:
         contents = await file.read()
         file_extension = file.filename.split('.')[-1]
-        # Use the username (email) from the token to create the path
-        # This assumes your get_current_user returns a TokenData object with a 'username' field
-        user_identifier = current_user.username.split('@')[0] # Example: make path from email
+        # Use the email from the token to create the path
+        user_identifier = current_user.email.split('@')[0] # Example: make path from email
         if role == "farmer":
             folder_name = "farmer signatures"
         else:
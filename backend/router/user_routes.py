@@ -1,14 +1,17 @@
 # router/user_routes.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from database.postgresConn import get_db
+from database.postgresConn import get_db, get_async_db
 # FIX: Import models and schemas with aliases to avoid name collisions
 from models.all_model import User as UserModel, Wallet as WalletModel
-from schemas.all_schema import UserResponse, UserCreate, TokenData
+from schemas.all_schema import UserResponse, UserCreate
 from auth import hashing, oauth2
+from helpers.pagination import PageParams, page_params, paginate, finish_page
 
 router = APIRouter(
     prefix="/api/users",
@@ -16,8 +19,8 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(request: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(UserModel).filter(UserModel.email == request.email).first()
+async def create_user(request: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_user = (await db.execute(select(UserModel.id).where(UserModel.email == request.email))).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -26,30 +29,26 @@ def create_user(request: UserCreate, db: Session = Depends(get_db)):
 
     new_user = UserModel(
         email=request.email,
-        hashed_password=hashing.Hash.bcrypt(request.password),
+        hashed_password=await hashing.Hash.bcrypt_async(request.password),
         full_name=request.full_name,
         role=request.role,
         business_type=request.business_type
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.flush()
 
     new_wallet = WalletModel(user_id=new_user.id, balance=0)
     db.add(new_wallet)
-    db.commit()
+    await db.commit()
+    # Load the server-side defaults and the (empty) listings the response model reads
+    await db.refresh(new_user, attribute_names=["created_at", "lists"])
 
     return new_user
 
 @router.get("/me", response_model=UserResponse)
 def get_current_user_profile(
-    db: Session = Depends(get_db),
-    # FIX: Correctly type hint the dependency return value
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    user: UserResponse = Depends(oauth2.get_current_user_snapshot)
 ):
-    user = db.query(UserModel).filter(UserModel.email == current_user.username).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
     return user
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -63,19 +62,16 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
     return user
 
 @router.get("/", response_model=List[UserResponse])
-def get_all_users(db: Session = Depends(get_db)):
-    users = db.query(UserModel).all()
-    return users
+def get_all_users(response: Response, db: Session = Depends(get_db), page: PageParams = Depends(page_params)):
+    users = paginate(db.query(UserModel), UserModel, page).all()
+    return finish_page(users, page, response)
 
 @router.put("/me", response_model=UserResponse)
 def update_current_user(
     update_data: dict,
     db: Session = Depends(get_db),
-    current_user: TokenData = Depends(oauth2.get_current_user)
+    user_to_update: UserModel = Depends(oauth2.get_current_user_model)
 ):
-    user_to_update = db.query(UserModel).filter(UserModel.email == current_user.username).first()
-    if not user_to_update:
-        raise HTTPException(status_code=404, detail="User not found")
     
     for key, value in update_data.items():
         if key in ["full_name", "business_type"]:
@@ -83,4 +79,6 @@ def update_current_user(
             
     db.commit()
     db.refresh(user_to_update)
+    # Evict so the next GET /me does not serve the pre-update snapshot
+    oauth2.evict_cached_user(user_to_update.id, user_to_update.email)
     return user_to_update
\ No newline at end of file
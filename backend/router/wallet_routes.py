@@ -1,14 +1,17 @@
 # routers/wallet_routes.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from database.postgresConn import get_db
+from database.postgresConn import get_db, get_async_db
 # FIX: Import models and schemas with aliases
-from models.all_model import User as UserModel, Wallet as WalletModel, Transaction as TransactionModel, UserRole
-from schemas.all_schema import Wallet as WalletSchema, TokenData, WalletAddFunds, Transaction as TransactionSchema
+from models.all_model import Wallet as WalletModel, Transaction as TransactionModel, UserRole
+from schemas.all_schema import Wallet as WalletSchema, CurrentUser, WalletAddFunds, Transaction as TransactionSchema
 from auth import oauth2
+from helpers.pagination import PageParams, page_params, paginate, finish_page
 
 router = APIRouter(
     prefix="/api/wallet",
@@ -18,24 +21,23 @@ router = APIRouter(
 @router.get("/me", response_model=WalletSchema)
 def get_user_wallet(
     db: Session = Depends(get_db),
-    current_user_token: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
-    user = db.query(UserModel).filter(UserModel.email == current_user_token.username).first()
-    if not user or not user.wallet:
+    wallet = db.query(WalletModel).filter(WalletModel.user_id == current_user.id).first()
+    if not wallet:
         raise HTTPException(status_code=404, detail="Wallet not found for this user.")
-    return user.wallet
+    return wallet
 
 @router.post("/me/add-funds", response_model=WalletSchema)
 def add_dummy_funds(
     request: WalletAddFunds,
     db: Session = Depends(get_db),
-    current_user_token: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
-    user = db.query(UserModel).filter(UserModel.email == current_user_token.username).first()
-    if user.role != UserRole.buyer:
+    if current_user.role != UserRole.buyer:
         raise HTTPException(status_code=403, detail="Only buyers can add funds.")
     
-    wallet = user.wallet
+    wallet = db.query(WalletModel).filter(WalletModel.user_id == current_user.id).first()
     if not wallet:
         raise HTTPException(status_code=404, detail="Wallet not found.")
 
@@ -51,34 +53,20 @@ def add_dummy_funds(
     db.refresh(wallet)
     return wallet
 
-@router.get("/me/transactions", response_model=List[TransactionSchema])
-def get_transaction_history(
-    db: Session = Depends(get_db),
-    current_user_token: TokenData = Depends(oauth2.get_current_user)
-):
-    user = db.query(UserModel).filter(UserModel.email == current_user_token.username).first()
-    if not user or not user.wallet:
-        raise HTTPException(status_code=404, detail="Wallet not found.")
-        
-    transactions = db.query(TransactionModel).filter(TransactionModel.wallet_id == user.wallet.id).order_by(TransactionModel.created_at.desc()).all()
-    return transactions
-
 @router.post("/me/withdraw", response_model=WalletSchema)
 def withdraw_funds(
     request: WalletAddFunds, # We can reuse the same schema for the amount
     db: Session = Depends(get_db),
-    current_user_token: TokenData = Depends(oauth2.get_current_user)
+    current_user: CurrentUser = Depends(oauth2.get_current_user)
 ):
     """
     [FARMER ONLY] Withdraws funds from the farmer's wallet.
     """
-    user = db.query(UserModel).filter(UserModel.email == current_user_token.username).first()
-    
     # Authorization: Check if the user is a farmer
-    if user.role != UserRole.farmer:
+    if current_user.role != UserRole.farmer:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only farmers can withdraw funds.")
     
-    wallet = user.wallet
+    wallet = db.query(WalletModel).filter(WalletModel.user_id == current_user.id).first()
     if not wallet:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Wallet not found.")
 
@@ -105,13 +93,18 @@ def withdraw_funds(
     return wallet
 
 @router.get("/me/transactions", response_model=List[TransactionSchema])
-def get_transaction_history(
-    db: Session = Depends(get_db),
-    current_user_token: TokenData = Depends(oauth2.get_current_user)
+async def get_transaction_history(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(oauth2.get_current_user),
+    page: PageParams = Depends(page_params)
 ):
-    user = db.query(UserModel).filter(UserModel.email == current_user_token.username).first()
-    if not user or not user.wallet:
+    wallet = (await db.execute(
+        select(WalletModel).where(WalletModel.user_id == current_user.id)
+    )).scalar_one_or_none()
+    if not wallet:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Wallet not found.")
         
-    transactions = db.query(TransactionModel).filter(TransactionModel.wallet_id == user.wallet.id).order_by(TransactionModel.created_at.desc()).all()
-    return transactions
\ No newline at end of file
+    query = select(TransactionModel).where(TransactionModel.wallet_id == wallet.id)
+    transactions = (await db.execute(paginate(query, TransactionModel, page))).scalars()
+    return finish_page(transactions, page, response)
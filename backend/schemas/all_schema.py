@@ -63,8 +63,18 @@ class CropListResponse(CropListBase):
     farmer: User
     recommended_template_name: Optional[str] = None
     recommendation_reason: Optional[str] = None
+    recommendation_status: Optional[str] = None
     model_config = ConfigDict(from_attributes=True)
 
+class CropListRecommendation(BaseModel):
+    listing_id: int
+    status: str
+    template_name: Optional[str] = None
+    reason: Optional[str] = None
+
+class CropListSearchResult(CropListResponse):
+    rank: float
+
 class CropListUpdate(BaseModel):
     crop_type: Optional[str] = None
     quantity: Optional[float] = None
@@ -220,6 +230,14 @@ class Token(BaseModel):
     
 class TokenData(BaseModel):
     username: Optional[str] = None
+    user_id: Optional[int] = None
+    role: Optional[str] = None
+
+# The authenticated principal handed to routes by oauth2.get_current_user
+class CurrentUser(BaseModel):
+    id: int
+    email: str
+    role: str
 
 # This will be your new response model for the login route
 class TokenWithUser(BaseModel):
@@ -277,6 +295,13 @@ class RecommendationRequest(BaseModel):
     area_hectares: Optional[float] = None
     notes: Optional[str] = None
 
+class BulkRecommendationPlot(RecommendationRequest):
+    plot_id: Optional[str] = None
+
+class BulkRecommendationRequest(BaseModel):
+    plots: List[BulkRecommendationPlot] = Field(..., min_length=1)
+    top_k: int = Field(5, ge=1, le=50)
+
 class CropRecommendation(BaseModel):
     name: str
     suitability_score: float
@@ -0,0 +1,114 @@
+# services/batch_prediction.py
+
+import asyncio
+import json
+import os
+import time
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from helpers.bounded_executor import ExecutorSaturated
+from helpers.multipart_stream import iter_uploaded_images
+from services.image_preprocessing import ImageRejected, MAX_UPLOAD_BYTES
+from services.micro_batcher import MicroBatcher
+
+BATCH_MAX_FILES = int(os.getenv("INFERENCE_BATCH_MAX_FILES", "100"))
+BATCH_MAX_ZIP_BYTES = int(os.getenv("INFERENCE_BATCH_MAX_ZIP_BYTES", str(200 * 1024 * 1024)))
+# Images of one batch request in flight at once; the rest wait (and the upload with them)
+BATCH_CONCURRENCY = int(os.getenv("INFERENCE_BATCH_CONCURRENCY", "16"))
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# The route reads the raw body, so describe the form for the API docs by hand
+BATCH_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "files": {
+                            "type": "array",
+                            "items": {"type": "string", "format": "binary"},
+                            "description": "Leaf photos, and/or zip archives of photos",
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+async def _predict_one(batcher: MicroBatcher, index: int, filename: str, payload) -> dict:
+    line = {"index": index, "filename": filename}
+    try:
+        if isinstance(payload, ImageRejected):
+            raise payload
+        return {**line, **(await batcher.predict(payload))}
+    except ImageRejected as e:
+        return {**line, "error": str(e), "status": e.status_code}
+    except ExecutorSaturated as e:
+        return {**line, "error": str(e), "status": 503}
+    except Exception as e:
+        return {**line, "error": str(e), "status": 500}
+
+
+async def stream_batch_predictions(batcher: MicroBatcher, request: Request) -> StreamingResponse:
+    """
+    Runs every image of a multipart upload through the model's micro-batcher
+    and streams one NDJSON line per image, in completion order, then a summary line.
+
+    Predictions start as soon as each file has arrived, so inference overlaps
+    the rest of the upload. Results are not streamed during the upload,
+    though: the body is fully read before the response starts. Starlette's
+    StreamingResponse listens for a disconnect on the request channel (on
+    servers older than ASGI spec 2.4), and reading the body at the same time
+    would race it for messages. Many HTTP clients also read no response until
+    they have sent the whole request. The first line (and a 413 for an
+    oversized upload) therefore arrives only after the last byte is in.
+    """
+    started = time.monotonic()
+    slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+    tasks: list[asyncio.Task] = []
+
+    async def run(index: int, filename: str, payload) -> dict:
+        try:
+            return await _predict_one(batcher, index, filename, payload)
+        finally:
+            slots.release()
+
+    try:
+        index = 0
+        async for filename, payload in iter_uploaded_images(
+            request, max_image_bytes=MAX_UPLOAD_BYTES, max_zip_bytes=BATCH_MAX_ZIP_BYTES, max_files=BATCH_MAX_FILES,
+        ):
+            await slots.acquire()
+            tasks.append(asyncio.create_task(run(index, filename, payload)))
+            index += 1
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    async def lines():
+        failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                line = await next_done
+                failed += "error" in line
+                yield json.dumps(line) + "\n"
+            yield json.dumps({"summary": {
+                "images": len(tasks),
+                "succeeded": len(tasks) - failed,
+                "failed": failed,
+                "seconds": round(time.monotonic() - started, 3),
+            }}) + "\n"
+        finally:
+            # The client went away: stop the predictions nobody will read
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
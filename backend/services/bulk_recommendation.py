@@ -0,0 +1,87 @@
+# services/bulk_recommendation.py
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from services.batch_prediction import NDJSON_MEDIA_TYPE
+from services.crop_recommender import fetch_weather_by_coords, merge_weather, recommend_rule_based_many
+
+BULK_MAX_PLOTS = int(os.getenv("RECOMMEND_BULK_MAX_PLOTS", "2000"))
+# Plots are scored and streamed this many at a time
+BULK_CHUNK_PLOTS = int(os.getenv("RECOMMEND_BULK_CHUNK_PLOTS", "256"))
+# Plots within the same grid cell (0.1 degrees is ~11 km) share one weather lookup
+WEATHER_GRID_DEGREES = float(os.getenv("RECOMMEND_WEATHER_GRID_DEGREES", "0.1"))
+WEATHER_CONCURRENCY = int(os.getenv("RECOMMEND_WEATHER_CONCURRENCY", "8"))
+
+_CLIMATE_KEYS = ("temperature", "humidity", "rainfall")
+
+
+def _weather_cell(params: Dict[str, Any]):
+    """Grid cell of a plot that needs weather, or None when it has no coordinates or needs none."""
+    if params.get("latitude") is None or params.get("longitude") is None:
+        return None
+    if all(params.get(key) is not None for key in _CLIMATE_KEYS):
+        return None
+    return (round(params["latitude"] / WEATHER_GRID_DEGREES), round(params["longitude"] / WEATHER_GRID_DEGREES))
+
+
+async def _cell_weather(cell, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    # Looked up at the cell centre, so every plot in the cell gets the same answer
+    async with semaphore:
+        return await fetch_weather_by_coords(round(cell[0] * WEATHER_GRID_DEGREES, 4), round(cell[1] * WEATHER_GRID_DEGREES, 4))
+
+
+async def stream_bulk_recommendations(plots: List, top_k: int) -> StreamingResponse:
+    """
+    Rule-based recommendations for many plots, one NDJSON line per plot in
+    request order, then a summary line. Weather is fetched once per grid cell
+    of WEATHER_GRID_DEGREES (all cells concurrently, up to WEATHER_CONCURRENCY
+    at a time). Plots are scored BULK_CHUNK_PLOTS at a time as one plots x
+    crops matrix, and each chunk is streamed as soon as its weather is in.
+    """
+    if len(plots) > BULK_MAX_PLOTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {BULK_MAX_PLOTS} plots per request.",
+        )
+    started = time.monotonic()
+    params_list = [plot.dict(by_alias=True) for plot in plots]
+    cells = [_weather_cell(params) for params in params_list]
+
+    async def lines():
+        # Started once the response is streaming, so no lookup is left running if it never is
+        semaphore = asyncio.Semaphore(WEATHER_CONCURRENCY)
+        lookups = {cell: asyncio.create_task(_cell_weather(cell, semaphore)) for cell in dict.fromkeys(cells) if cell is not None}
+        try:
+            for start in range(0, len(params_list), BULK_CHUNK_PLOTS):
+                chunk = params_list[start:start + BULK_CHUNK_PLOTS]
+                for params, cell in zip(chunk, cells[start:start + BULK_CHUNK_PLOTS]):
+                    if cell is not None:
+                        merge_weather(params, await lookups[cell])
+                # Large chunks take a while to score; keep the event loop free
+                results = await asyncio.to_thread(recommend_rule_based_many, chunk, top_k)
+                for offset, (params, recommendations) in enumerate(zip(chunk, results)):
+                    line = {
+                        "index": start + offset,
+                        "plot_id": params.get("plot_id"),
+                        "recommendations": recommendations,
+                        "source": "rule-based",
+                    }
+                    yield json.dumps(line) + "\n"
+            yield json.dumps({"summary": {
+                "plots": len(params_list),
+                "weather_lookups": len(lookups),
+                "seconds": round(time.monotonic() - started, 3),
+            }}) + "\n"
+        finally:
+            # The client may disconnect mid-stream
+            for task in lookups.values():
+                task.cancel()
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
@@ -1,16 +1,17 @@
 # backend/recommendation/crop_recommender.py
 import os
 import json
-from typing import Dict, Any, List, Optional, Tuple
+import hashlib
+from typing import Dict, Any, List, Optional, Set, Tuple
 from pathlib import Path
 import asyncio
-import httpx
+import threading
+import time
 
-# Gemini / Google Generative AI client
-try:
-    import google.generativeai as genai
-except Exception:
-    genai = None
+from services.llm_gateway import llm_gateway
+from services.http_client import http_clients
+from services.crop_scorer import CropCatalogue, top_k_rows
+from helpers.crop_recommendation_cache import cache_key, crop_recommendation_cache, quantize_params
 
 # ---- config ----
 BASE_DIR = Path(__file__).parent
@@ -19,21 +20,12 @@ DATA_PATH = BASE_DIR / "crop_data.json"
 
 PROMPT_TEMPLATE_PATH = BASE_DIR / "crop_prompt_template.py"
 
-GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
 GEMINI_MODEL_NAME = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash-lite")
 OPENWEATHER_API_KEY = os.environ.get("OPENWEATHER_API_KEY")
-
-# Initialize the Gemini client only once when the application starts
-GEMINI_CLIENT = None
-if genai and GOOGLE_API_KEY:
-    try:
-        genai.configure(api_key=GOOGLE_API_KEY)
-        GEMINI_CLIENT = genai.GenerativeModel(GEMINI_MODEL_NAME)
-        print(f"Successfully configured Gemini client with model: {GEMINI_MODEL_NAME}")
-    except Exception as e:
-        print(f"Failed to configure Gemini client: {e}")
-else:
-    print("Google AI library not found or GOOGLE_API_KEY not set. Gemini features will be disabled.")
+# How long a request waits for Gemini before answering with the rule-based engine
+GEMINI_DEADLINE_SECONDS = float(os.environ.get("RECOMMEND_GEMINI_DEADLINE_SECONDS", "2.5"))
+# Let Gemini calls that miss the deadline finish, so their answer is cached
+CACHE_LATE_GEMINI = os.environ.get("RECOMMEND_CACHE_LATE_GEMINI", "1").lower() in ("1", "true", "yes")
 
 # ---- load crop data ----
 def load_crop_data() -> List[Dict[str, Any]]:
@@ -43,8 +35,11 @@ def load_crop_data() -> List[Dict[str, Any]]:
     return []
 
 CROP_DATA = load_crop_data()
+# Compiled once; scores every crop in one NumPy pass
+CROP_CATALOGUE = CropCatalogue(CROP_DATA)
 
 # ---- helper rule-based scorer ----
+# Scores one crop; the reference for CROP_CATALOGUE, which recommend_rule_based uses
 def score_crop_rule_based(crop: Dict[str, Any], params: Dict[str, Any]) -> float:
     ideal = crop.get("ideal", {})
     score = 0.0
@@ -126,18 +121,22 @@ def score_crop_rule_based(crop: Dict[str, Any], params: Dict[str, Any]) -> float
         return 0.0
     return max(0.0, min(1.0, score / total))
 
+def _rule_based_recommendation(index: int, score: float) -> Dict[str, Any]:
+    crop = CROP_DATA[index]
+    return {
+        "name": crop["name"],
+        "suitability_score": score,
+        "reason": f"Matches soil and climate parameters. {crop.get('notes', '')}"
+    }
+
 def recommend_rule_based(params: Dict[str, Any], top_k: int = 5) -> List[Dict[str, Any]]:
     """Generates top-k crop recommendations using the rule-based engine."""
-    scored_crops = [
-        {
-            "name": crop["name"],
-            "suitability_score": round(score_crop_rule_based(crop, params), 3),
-            "reason": f"Matches soil and climate parameters. {crop.get('notes', '')}"
-        }
-        for crop in CROP_DATA
-    ]
-    scored_crops.sort(key=lambda x: x["suitability_score"], reverse=True)
-    return scored_crops[:top_k]
+    return [_rule_based_recommendation(i, score) for i, score in CROP_CATALOGUE.top_k(params, top_k)]
+
+def recommend_rule_based_many(params_list: List[Dict[str, Any]], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+    """recommend_rule_based for many plots, scoring the whole plots x crops matrix at once."""
+    scores = CROP_CATALOGUE.score_matrix(params_list)
+    return [[_rule_based_recommendation(i, score) for i, score in top_k_rows(row, top_k)] for row in scores]
 
 
 # --- Helper Services ---
@@ -148,45 +147,62 @@ async def fetch_weather_by_coords(lat: float, lon: float) -> Dict[str, Any]:
         return {}
     url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={OPENWEATHER_API_KEY}&units=metric"
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.get(url)
-            r.raise_for_status()
-            data = r.json()
-            return {
-                "temperature": data.get("main", {}).get("temp"),
-                "humidity": data.get("main", {}).get("humidity"),
-            }
+        r = await http_clients.async_client("openweather", timeout=10).get(url)
+        r.raise_for_status()
+        data = r.json()
+        return {
+            "temperature": data.get("main", {}).get("temp"),
+            "humidity": data.get("main", {}).get("humidity"),
+        }
     except Exception as e:
         print(f"Weather fetch failed: {e}")
         return {}
 
 
+def merge_weather(params: Dict[str, Any], weather: Dict[str, Any]) -> None:
+    """Fills climate parameters the caller left empty from a weather lookup."""
+    for key in ("temperature", "humidity", "rainfall"):
+        if params.get(key) is None and weather.get(key) is not None:
+            params[key] = weather[key]
+
+
 # --- Gemini-Based Recommendation Engine (Updated to be fully async) ---
 
+def _parse_recommendations(content: str) -> Dict[str, Any]:
+    # Clean the response to ensure it's valid JSON
+    cleaned_content = content.strip().lstrip("```json").rstrip("```")
+    return json.loads(cleaned_content)
+
 async def recommend_with_gemini(params: Dict[str, Any], top_k: int = 5) -> Optional[List[Dict[str, Any]]]:
-    """Generates crop recommendations using the Gemini model asynchronously."""
-    if not GEMINI_CLIENT:
+    """
+    Generates crop recommendations using the Gemini model asynchronously.
+    Inputs are snapped to agronomic buckets first; farms in the same buckets
+    share one prompt and one cached answer.
+    """
+    if not llm_gateway.available:
         return None
 
     # Dynamically import the prompt template to avoid circular dependencies if needed
     from services.crop_prompt_template import PROMPT_JSON_TEMPLATE
-    
-    prompt = PROMPT_JSON_TEMPLATE.format(**params)
+
+    quantized = quantize_params(params)
+    version = f"{GEMINI_MODEL_NAME}:{hashlib.sha256(PROMPT_JSON_TEMPLATE.encode()).hexdigest()[:12]}"
+    key = cache_key(quantized, version)
+    cached = await asyncio.to_thread(crop_recommendation_cache.get, key)
+    if cached is not None:
+        return cached["recommendations"][:top_k]
+
+    prompt = PROMPT_JSON_TEMPLATE.format(**quantized)
 
     try:
-        # --- KEY CHANGE: Use the native asynchronous method ---
-        response = await GEMINI_CLIENT.generate_content_async(prompt)
-        content = response.text
-        # ---------------------------------------------------
-        
-        if not content:
-            return None
-            
-        # Clean the response to ensure it's valid JSON
-        cleaned_content = content.strip().lstrip("```json").rstrip("```")
-        data = json.loads(cleaned_content)
+        # The shared gateway limits concurrency, retries, and caches identical prompts
+        data = await llm_gateway.generate(
+            prompt, purpose="crop_recommendation", model=GEMINI_MODEL_NAME, parse=_parse_recommendations
+        )
         
         recommendations = data.get("recommendations", [])
+        if recommendations:
+            await crop_recommendation_cache.store(key, {"recommendations": recommendations})
         return recommendations[:top_k]
 
     except Exception as e:
@@ -196,18 +212,93 @@ async def recommend_with_gemini(params: Dict[str, Any], top_k: int = 5) -> Optio
 
 # --- Main Orchestrator Function ---
 
+class _RecommendationStats:
+    """How often each engine's answer was returned, and what became of Gemini calls that missed the deadline."""
+    OUTCOMES = (
+        "gemini",                    # Gemini answered within the deadline
+        "rule_based_deadline",       # Gemini was still running at the deadline
+        "rule_based_gemini_failed",  # Gemini failed or returned nothing within the deadline
+        "rule_based_gemini_disabled",
+        "late_gemini_cached",        # a late Gemini answer arrived and is cached for the next identical query
+        "late_gemini_failed",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(self.OUTCOMES, 0)
+        self.gemini_win_seconds = 0.0
+
+    def record(self, outcome: str, seconds: float = 0.0):
+        with self._lock:
+            self.counts[outcome] += 1
+            if outcome == "gemini":
+                self.gemini_win_seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            served = sum(self.counts[o] for o in self.OUTCOMES if not o.startswith("late_"))
+            wins = self.counts["gemini"]
+            return {
+                "deadline_seconds": GEMINI_DEADLINE_SECONDS,
+                "cache_late_gemini": CACHE_LATE_GEMINI,
+                **self.counts,
+                "gemini_win_ratio": round(wins / served, 4) if served else 0.0,
+                "avg_gemini_win_ms": round(self.gemini_win_seconds / wins * 1000, 2) if wins else 0.0,
+            }
+
+
+recommendation_stats = _RecommendationStats()
+# Gemini calls still running after their request was answered
+_late_gemini_calls: Set[asyncio.Task] = set()
+
+
+def _record_late_gemini(task: asyncio.Task):
+    _late_gemini_calls.discard(task)
+    if task.cancelled():
+        return
+    # recommend_with_gemini caches what it gets, so a late success serves the next query in the same buckets
+    ok = task.exception() is None and bool(task.result())
+    recommendation_stats.record("late_gemini_cached" if ok else "late_gemini_failed")
+
+
 async def recommend(params: Dict[str, Any], top_k: int = 5) -> Tuple[List[Dict[str, Any]], str]:
     """
-    Main recommendation function. Tries Gemini first, then falls back to the rule-based engine.
+    Main recommendation function, hedged against a slow LLM. The rule-based
+    answer is ready first; Gemini then has GEMINI_DEADLINE_SECONDS to return a
+    better one. If it misses the deadline the rule-based answer is returned,
+    and Gemini is either left to finish so its answer is cached for the next
+    identical query (RECOMMEND_CACHE_LATE_GEMINI) or cancelled.
     """
-    # Try to get a recommendation from Gemini
-    gemini_recommendations = await recommend_with_gemini(params, top_k=top_k)
+    rule_based_recommendations = recommend_rule_based(params, top_k=top_k)
+    if not llm_gateway.available:
+        recommendation_stats.record("rule_based_gemini_disabled")
+        return rule_based_recommendations, "rule-based"
+
+    started = time.monotonic()
+    gemini_call = asyncio.create_task(recommend_with_gemini(params, top_k=top_k))
+    try:
+        gemini_recommendations = await asyncio.wait_for(asyncio.shield(gemini_call), GEMINI_DEADLINE_SECONDS)
+    except asyncio.TimeoutError:
+        if CACHE_LATE_GEMINI:
+            _late_gemini_calls.add(gemini_call)
+            gemini_call.add_done_callback(_record_late_gemini)
+        else:
+            gemini_call.cancel()
+        print(f"Gemini missed the {GEMINI_DEADLINE_SECONDS}s deadline. Returning rule-based recommendations.")
+        recommendation_stats.record("rule_based_deadline")
+        return rule_based_recommendations, "rule-based"
+    except asyncio.CancelledError:
+        gemini_call.cancel()
+        raise
+    except Exception as e:
+        print(f"Gemini recommendation failed: {e}")
+        gemini_recommendations = None
 
     if gemini_recommendations:
         print("Returning recommendations from Gemini.")
+        recommendation_stats.record("gemini", time.monotonic() - started)
         return gemini_recommendations, "gemini"
 
-    # If Gemini fails or is disabled, use the reliable rule-based fallback
-    print("Gemini failed or is disabled. Falling back to rule-based engine.")
-    rule_based_recommendations = recommend_rule_based(params, top_k=top_k)
-    return rule_based_recommendations, "rule-based"
\ No newline at end of file
+    print("Gemini failed or returned nothing. Returning rule-based recommendations.")
+    recommendation_stats.record("rule_based_gemini_failed")
+    return rule_based_recommendations, "rule-based"
@@ -0,0 +1,112 @@
+# services/crop_scorer.py
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+_NUTRIENTS = ("nitrogen", "phosphorus", "potassium")
+# N, P, K, pH, temperature, rainfall, water: a missing parameter scores 0 but still counts
+_TERMS = 7
+
+
+def _number(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+def _bounds(rng) -> Tuple[float, float]:
+    if isinstance(rng, (list, tuple)) and len(rng) == 2 and None not in rng:
+        return float(rng[0]), float(rng[1])
+    return np.nan, np.nan
+
+
+def _range_credit(val, low, high, dist):
+    """1 inside [low, high], else 1 - dist floored at 0; 0 when the value or the range is missing."""
+    credit = np.where((low <= val) & (val <= high), 1.0, np.maximum(0.0, 1.0 - np.minimum(dist, 1.0)))
+    return np.where(np.isnan(val) | np.isnan(low) | np.isnan(high), 0.0, credit)
+
+
+class CropCatalogue:
+    """
+    The crop catalogue compiled into NumPy arrays, one entry per crop, so a
+    farm's parameters are scored against every crop in one vectorized pass.
+    Scores match crop_recommender.score_crop_rule_based; missing values are
+    NaN and score 0 for that parameter. Parameters are scored as (m, 1)
+    columns against (n,) crop rows, giving an (m, n) matrix.
+    """
+    def __init__(self, crops: List[Dict[str, Any]]):
+        self.crops = crops
+        ideals = [crop.get("ideal", {}) for crop in crops]
+        nutrients = np.array([[_bounds(ideal.get(key)) for ideal in ideals] for key in _NUTRIENTS]).reshape(len(_NUTRIENTS), len(crops), 2)
+        self.nutrient_low = nutrients[..., 0]
+        self.nutrient_high = nutrients[..., 1]
+        ph = np.array([_bounds(ideal.get("pH")) for ideal in ideals]).reshape(len(crops), 2)
+        self.ph_low, self.ph_high = ph[:, 0], ph[:, 1]
+        self.min_temp = np.array([_number(ideal.get("min_temp")) for ideal in ideals])
+        self.max_temp = np.array([_number(ideal.get("max_temp")) for ideal in ideals])
+        rain = np.array([_bounds(ideal.get("rainfall")) for ideal in ideals]).reshape(len(crops), 2)
+        self.rain_low, self.rain_high = rain[:, 0], rain[:, 1]
+        self.water_required = np.array([_number(ideal.get("water_required_per_hectare")) for ideal in ideals])
+
+    def __len__(self) -> int:
+        return len(self.crops)
+
+    @staticmethod
+    def _columns(params_list: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        def column(values):
+            return np.array(values, dtype=np.float64).reshape(-1, 1)
+
+        columns = {key: column([_number(p.get(key)) for p in params_list])
+                   for key in (*_NUTRIENTS, "pH", "temperature", "rainfall", "water_available_liters")}
+        columns["area_hectares"] = column([p.get("area_hectares") or 1.0 for p in params_list])
+        return columns
+
+    def score_matrix(self, params_list: List[Dict[str, Any]]) -> np.ndarray:
+        """Scores in [0, 1], shape (len(params_list), len(self))."""
+        p = self._columns(params_list)
+        score = np.zeros((len(params_list), len(self)))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for i, key in enumerate(_NUTRIENTS):
+                val, low, high = p[key], self.nutrient_low[i], self.nutrient_high[i]
+                dist = np.where(val < low, (low - val) / (low + 1e-6), (val - high) / (high + 1e-6))
+                score += _range_credit(val, low, high, dist)
+
+            val, low, high = p["pH"], self.ph_low, self.ph_high
+            dist = np.minimum(np.abs(val - low), np.abs(val - high)) / np.maximum(np.abs(high - low), 0.1)
+            score += _range_credit(val, low, high, dist)
+
+            val, low, high = p["temperature"], self.min_temp, self.max_temp
+            dist = np.minimum(np.abs(val - low), np.abs(val - high)) / (np.abs(high - low) + 1e-6)
+            score += _range_credit(val, low, high, dist)
+
+            val, low, high = p["rainfall"], self.rain_low, self.rain_high
+            dist = np.minimum(np.abs(val - low), np.abs(val - high)) / np.maximum(np.abs(high - low), 1)
+            score += _range_credit(val, low, high, dist)
+
+            per_ha = p["water_available_liters"] / np.maximum(p["area_hectares"], 1e-6)
+            req = self.water_required
+            water = np.where(per_ha >= req, 1.0, per_ha / req)
+            score += np.where(np.isnan(per_ha) | np.isnan(req), 0.0, water)
+        return np.clip(score / _TERMS, 0.0, 1.0)
+
+    def scores(self, params: Dict[str, Any]) -> np.ndarray:
+        return self.score_matrix([params])[0]
+
+    def top_k(self, params: Dict[str, Any], k: int) -> List[Tuple[int, float]]:
+        """(crop index, score rounded to 3 places) for the best k crops, ties in catalogue order."""
+        return top_k_rows(self.scores(params), k)
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    """Best k of one row of scores, ordered like a stable sort on the rounded score."""
+    rounded = np.round(scores, 3)
+    k = min(k, len(rounded))
+    if k <= 0:
+        return []
+    if k < len(rounded):
+        # argpartition finds the k-th best score; ties on it go to the earliest crops
+        kth = rounded[np.argpartition(-rounded, k - 1)[:k]].min()
+        picked = np.concatenate((np.flatnonzero(rounded > kth), np.flatnonzero(rounded == kth)))[:k]
+    else:
+        picked = np.arange(len(rounded))
+    picked = picked[np.lexsort((picked, -rounded[picked]))]
+    return [(int(i), float(rounded[i])) for i in picked]
@@ -0,0 +1,62 @@
+# services/disease_model_base.py
+
+import os
+
+import numpy as np
+
+from services.image_preprocessing import INPUT_SIZE, PREPROCESS_VERSION, decode_for_model, to_float_batch
+from services.inference_backends import load_backend
+from services.model_store import model_store
+
+# keras, tflite or tflite-int8 (see services/inference_backends.py)
+DISEASE_MODEL_BACKEND = os.getenv("DISEASE_MODEL_BACKEND", "keras").lower()
+
+
+class DiseaseModel:
+    """
+    Shared loading, preprocessing and prediction for the Keras leaf-disease
+    classifiers. Subclasses only set the labels and the Hugging Face location.
+
+    Prediction is split into preprocess -> predict_batch -> format_prediction so
+    the micro-batcher can run one forward pass for many uploads.
+    """
+    _labels: list[str] = []
+    _model = None
+
+    def __init__(self, repo_id: str, filename: str, sha256: str | None = None, backend: str | None = None):
+        self.repo_id = repo_id
+        self.filename = filename
+        # Optional pinned checksum of the model file
+        self.sha256 = sha256
+        self.backend = backend or DISEASE_MODEL_BACKEND
+        # Identifies what produced a prediction (weights, backend, preprocessing); set once loaded
+        self.version: str | None = None
+        self._load_model()
+
+    def _load_model(self):
+        if self._model is None:
+            # Served from the persistent model cache; only a cold cache downloads
+            path = model_store.fetch(self.repo_id, self.filename, self.sha256)
+            self._model = load_backend(self.backend, path)
+            self.version = f"{model_store.checksum(path)[:16]}-{self.backend}-p{PREPROCESS_VERSION}"
+
+    def preprocess(self, image_bytes: bytes) -> np.ndarray:
+        """Decodes an upload into a (224, 224, 3) uint8 array; scaling happens per batch."""
+        return decode_for_model(image_bytes, INPUT_SIZE)
+
+    def predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        """One forward pass over a (N, 224, 224, 3) float32 batch in [0, 1]; returns (N, num_labels) scores."""
+        return self._model.predict_batch(batch)
+
+    def format_prediction(self, preds: np.ndarray) -> dict:
+        top_idx = int(np.argmax(preds))
+        return {
+            "disease": self._labels[top_idx],
+            "confidence": float(preds[top_idx]),
+            "all_predictions": preds.tolist()
+        }
+
+    def predict_disease(self, image_bytes: bytes) -> dict:
+        """Unbatched prediction for a single image, for scripts and one-off calls."""
+        batch = to_float_batch([self.preprocess(image_bytes)])
+        return self.format_prediction(self.predict_batch(batch)[0])
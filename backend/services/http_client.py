@@ -0,0 +1,163 @@
+# services/http_client.py
+
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+# Per client, and every upstream gets its own client, so these are per-host limits
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "1").lower() in ("1", "true", "yes")
+
+
+def _http2_available() -> bool:
+    # httpx speaks HTTP/2 only with the h2 package (httpx[http2])
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class _RequestStats:
+    """Per client and host: request count, error responses and time to response headers."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: dict[tuple[str, str], dict] = {}
+
+    def started(self, request: httpx.Request):
+        request.extensions["started_at"] = time.monotonic()
+
+    def finished(self, name: str, response: httpx.Response):
+        started = response.request.extensions.get("started_at")
+        seconds = time.monotonic() - started if started is not None else 0.0
+        with self._lock:
+            s = self._hosts.setdefault((name, response.request.url.host), {
+                "requests": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0, "http_versions": {},
+            })
+            s["requests"] += 1
+            s["errors"] += response.status_code >= 400
+            s["total_seconds"] += seconds
+            s["max_seconds"] = max(s["max_seconds"], seconds)
+            s["http_versions"][response.http_version] = s["http_versions"].get(response.http_version, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                f"{name} {host}": {
+                    "requests": s["requests"],
+                    "errors": s["errors"],
+                    "avg_ms": round(s["total_seconds"] / s["requests"] * 1000, 2) if s["requests"] else 0.0,
+                    "max_ms": round(s["max_seconds"] * 1000, 2),
+                    "http_versions": dict(s["http_versions"]),
+                }
+                for (name, host), s in self._hosts.items()
+            }
+
+
+class HTTPClientRegistry:
+    """
+    Pooled httpx clients for all outbound HTTP, one per upstream by name, so
+    connections (and TLS sessions) are kept alive and reused across requests.
+    Async clients are for code on the event loop; sync clients are for code
+    already on a worker thread (sync routes, model downloads). Each client has
+    its own connection limits and timeouts, uses HTTP/2 where the server and
+    the h2 package allow, and records per-host timings. The app's lifespan
+    closes them all at shutdown.
+    """
+    def __init__(self, timeout: float, connect_timeout: float, max_connections: int,
+                 max_keepalive: int, keepalive_expiry: float, http2: bool):
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and _http2_available()
+        self._lock = threading.Lock()
+        self._async: dict[str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+        self._sync: dict[str, httpx.Client] = {}
+        self.request_stats = _RequestStats()
+
+    def _options(self, timeout: Optional[float], max_connections: Optional[int]) -> dict:
+        return {
+            "timeout": httpx.Timeout(timeout or self.timeout, connect=self.connect_timeout),
+            "limits": httpx.Limits(
+                max_connections=max_connections or self.max_connections,
+                max_keepalive_connections=min(self.max_keepalive, max_connections or self.max_connections),
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            "http2": self.http2,
+        }
+
+    def async_client(self, name: str, timeout: Optional[float] = None,
+                     max_connections: Optional[int] = None) -> httpx.AsyncClient:
+        """The shared AsyncClient for `name`; the options apply when it is first created."""
+        loop = asyncio.get_running_loop()
+        entry = self._async.get(name)
+        # A client's connections belong to the loop that opened them (tests and scripts run their own)
+        if entry is None or entry[0] is not loop or entry[1].is_closed:
+            stats = self.request_stats
+
+            async def on_request(request):
+                stats.started(request)
+
+            async def on_response(response):
+                stats.finished(name, response)
+
+            client = httpx.AsyncClient(
+                **self._options(timeout, max_connections),
+                event_hooks={"request": [on_request], "response": [on_response]},
+            )
+            self._async[name] = entry = (loop, client)
+        return entry[1]
+
+    def sync_client(self, name: str, timeout: Optional[float] = None,
+                    max_connections: Optional[int] = None) -> httpx.Client:
+        """The shared, thread-safe Client for `name`; the options apply when it is first created."""
+        with self._lock:
+            client = self._sync.get(name)
+            if client is None or client.is_closed:
+                stats = self.request_stats
+                client = self._sync[name] = httpx.Client(
+                    **self._options(timeout, max_connections),
+                    event_hooks={
+                        "request": [stats.started],
+                        "response": [lambda response: stats.finished(name, response)],
+                    },
+                )
+            return client
+
+    async def aclose(self):
+        async_clients, self._async = self._async, {}
+        for _, client in async_clients.values():
+            await client.aclose()
+        with self._lock:
+            sync_clients, self._sync = self._sync, {}
+        for client in sync_clients.values():
+            client.close()
+
+    def stats(self) -> dict:
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "async_clients": sorted(self._async),
+            "sync_clients": sorted(self._sync),
+            "hosts": self.request_stats.snapshot(),
+        }
+
+
+http_clients = HTTPClientRegistry(
+    timeout=HTTP_TIMEOUT_SECONDS,
+    connect_timeout=HTTP_CONNECT_TIMEOUT_SECONDS,
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive=HTTP_MAX_KEEPALIVE,
+    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    http2=HTTP_HTTP2,
+)
@@ -0,0 +1,156 @@
+# services/image_preprocessing.py
+
+import io
+import os
+import threading
+import time
+from typing import Sequence
+
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+
+INPUT_SIZE = (224, 224)
+# Bump when decoding or resizing changes, so cached predictions are not reused
+PREPROCESS_VERSION = "1"
+
+MAX_UPLOAD_BYTES = int(os.getenv("INFERENCE_MAX_UPLOAD_BYTES", str(15 * 1024 * 1024)))
+# Checked from the image header, before any pixel is decoded
+MAX_IMAGE_PIXELS = int(os.getenv("INFERENCE_MAX_IMAGE_PIXELS", str(50_000_000)))
+
+_READ_CHUNK = 1024 * 1024
+
+
+class ImageRejected(Exception):
+    """An upload that cannot be classified; status_code is the HTTP status to answer with."""
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class _StageStats:
+    """Per-stage call counts and timings of the preprocessing pipeline, for /api/metrics/inference."""
+    STAGES = ("read", "decode", "resize", "to_array", "normalize")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {stage: [0, 0.0, 0.0] for stage in self.STAGES}
+        self.bytes_in = 0
+        self.too_large = 0
+        self.invalid = 0
+
+    def record(self, stage: str, seconds: float, nbytes: int = 0):
+        with self._lock:
+            self.bytes_in += nbytes
+            entry = self._stages[stage]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def reject(self, status_code: int):
+        with self._lock:
+            if status_code == 413:
+                self.too_large += 1
+            else:
+                self.invalid += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "bytes_in": self.bytes_in,
+                "rejected_too_large": self.too_large,
+                "rejected_invalid": self.invalid,
+                "max_upload_bytes": MAX_UPLOAD_BYTES,
+                "max_image_pixels": MAX_IMAGE_PIXELS,
+                "stages": {
+                    stage: {
+                        "count": count,
+                        "avg_ms": round(total / count * 1000, 3) if count else 0.0,
+                        "max_ms": round(peak * 1000, 3),
+                    }
+                    for stage, (count, total, peak) in self._stages.items()
+                },
+            }
+
+
+preprocessing_stats = _StageStats()
+
+
+def _reject(message: str, status_code: int) -> ImageRejected:
+    preprocessing_stats.reject(status_code)
+    return ImageRejected(message, status_code)
+
+
+async def read_upload(file, max_bytes: int = MAX_UPLOAD_BYTES) -> bytes:
+    """Reads an UploadFile, failing with 413 as soon as it is known to exceed max_bytes."""
+    started = time.perf_counter()
+    if file.size is not None and file.size > max_bytes:
+        raise _reject(f"Image is larger than {max_bytes // (1024 * 1024)} MB.", 413)
+    chunks, total = [], 0
+    while chunk := await file.read(_READ_CHUNK):
+        total += len(chunk)
+        if total > max_bytes:
+            raise _reject(f"Image is larger than {max_bytes // (1024 * 1024)} MB.", 413)
+        chunks.append(chunk)
+    preprocessing_stats.record("read", time.perf_counter() - started, nbytes=total)
+    return b"".join(chunks)
+
+
+def decode_for_model(image_bytes: bytes, size: tuple[int, int] = INPUT_SIZE) -> np.ndarray:
+    """
+    Decodes an upload straight to a (height, width, 3) uint8 array at the model's
+    input size. JPEGs are decoded in draft mode (DCT scaling to 1/2, 1/4 or 1/8,
+    never below `size`), so a 12 MP phone photo is never fully decompressed.
+    Other formats are shrunk with Pillow's reduce() before the final resample.
+    """
+    started = time.perf_counter()
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+    except (UnidentifiedImageError, OSError):
+        raise _reject("The upload is not a readable image.", 415)
+    if image.width * image.height > MAX_IMAGE_PIXELS:
+        raise _reject(f"Image has more than {MAX_IMAGE_PIXELS} pixels.", 413)
+    try:
+        image.draft("RGB", size)
+        image = image.convert("RGB")
+    except (OSError, ValueError, Image.DecompressionBombError):
+        raise _reject("The upload is not a readable image.", 415)
+    decoded = time.perf_counter()
+    preprocessing_stats.record("decode", decoded - started)
+
+    if image.size != size:
+        image = image.resize(size, Image.Resampling.BICUBIC, reducing_gap=3.0)
+    resized = time.perf_counter()
+    preprocessing_stats.record("resize", resized - decoded)
+
+    array = np.asarray(image, dtype=np.uint8)
+    preprocessing_stats.record("to_array", time.perf_counter() - resized)
+    return array
+
+
+def to_float_batch(images: Sequence[np.ndarray], out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Scales uint8 images to float32 in [0, 1] as one (N, H, W, 3) batch, writing
+    straight into `out` when given (no stacked uint8 copy, no float64 temporary).
+    """
+    started = time.perf_counter()
+    if out is None:
+        out = np.empty((len(images), *images[0].shape), dtype=np.float32)
+    scale = np.float32(255)
+    for i, image in enumerate(images):
+        np.divide(image, scale, out=out[i])
+    preprocessing_stats.record("normalize", time.perf_counter() - started)
+    return out
+
+
+class BatchBuffer:
+    """
+    A reusable float32 input tensor for one batching thread. fill() returns a
+    view of the first N rows, so steady-state batches allocate nothing.
+    """
+    def __init__(self, max_batch: int, size: tuple[int, int] = INPUT_SIZE):
+        self._buffer = np.empty((max_batch, size[1], size[0], 3), dtype=np.float32)
+
+    def fill(self, images: Sequence[np.ndarray]) -> np.ndarray:
+        if len(images) > len(self._buffer):
+            self._buffer = np.empty((len(images), *self._buffer.shape[1:]), dtype=np.float32)
+        return to_float_batch(images, out=self._buffer[:len(images)])
@@ -0,0 +1,52 @@
+# services/inference.py
+
+import os
+
+from helpers.bounded_executor import BoundedExecutor
+from services.micro_batcher import MicroBatcher
+from services.image_preprocessing import preprocessing_stats
+from services.prediction_cache import prediction_cache
+
+# Keras predict and PIL decode/resize are blocking and release the GIL for most of
+# their work, so a thread pool sized to the cores keeps them off the event loop
+# without loading a model copy per process.
+inference_executor = BoundedExecutor(
+    "inference",
+    max_workers=int(os.getenv("INFERENCE_WORKERS", str(os.cpu_count() or 1))),
+    max_pending=int(os.getenv("INFERENCE_MAX_PENDING", "32")),
+)
+
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "16"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "64"))
+
+# One micro-batcher per disease model, by name
+inference_batchers: dict[str, MicroBatcher] = {}
+
+
+def inference_batcher(name: str, model) -> MicroBatcher:
+    """Creates (once) the micro-batcher for a model, configured from the environment."""
+    if name not in inference_batchers:
+        inference_batchers[name] = MicroBatcher(
+            name, model, inference_executor,
+            max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+            max_wait_ms=INFERENCE_MAX_WAIT_MS,
+            max_queue=INFERENCE_MAX_QUEUE,
+            cache=prediction_cache,
+        )
+    return inference_batchers[name]
+
+
+def inference_stats() -> dict:
+    return {
+        "executor": inference_executor.stats(),
+        "batchers": {name: batcher.stats() for name, batcher in inference_batchers.items()},
+        "preprocessing": preprocessing_stats.snapshot(),
+        "prediction_cache": prediction_cache.stats(),
+    }
+
+
+async def shutdown_inference():
+    for batcher in inference_batchers.values():
+        await batcher.stop()
+    inference_executor.shutdown()
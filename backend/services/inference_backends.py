@@ -0,0 +1,100 @@
+# services/inference_backends.py
+
+import os
+import threading
+
+import numpy as np
+
+from services.model_store import model_store
+
+# keras: the original model through tf.keras
+# tflite: the model converted to TFLite (float32)
+# tflite-int8: TFLite with dynamic-range quantization (int8 weights, float activations)
+BACKENDS = ("keras", "tflite", "tflite-int8")
+
+TFLITE_NUM_THREADS = int(os.getenv("TFLITE_NUM_THREADS", str(os.cpu_count() or 1)))
+
+
+class KerasBackend:
+    name = "keras"
+
+    def __init__(self, path: str):
+        from tensorflow.keras.models import load_model
+        self.model = load_model(path)
+
+    def predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        # predict_on_batch skips predict()'s per-call dataset and callback setup
+        return np.asarray(self.model.predict_on_batch(batch))
+
+
+def _interpreter_class():
+    # The standalone runtime is a few MB; fall back to the one bundled with TensorFlow
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteBackend:
+    """
+    Runs a .tflite export. Batches are padded up to the next power of two, so
+    micro-batches of varying size only resize the interpreter's tensors when
+    they cross a bucket. The interpreter is not thread-safe, so invocations are
+    serialized.
+    """
+    def __init__(self, path: str, name: str, num_threads: int):
+        self.name = name
+        self.interpreter = _interpreter_class()(model_path=path, num_threads=num_threads)
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._lock = threading.Lock()
+        self._batch_size = 0
+        self._resize(1)
+
+    def _resize(self, batch_size: int):
+        shape = [batch_size, *(int(dim) for dim in self._input["shape"][1:])]
+        self.interpreter.resize_tensor_input(self._input["index"], shape)
+        self.interpreter.allocate_tensors()
+        self._batch_size = batch_size
+        self._padded = np.zeros(shape, dtype=self._input["dtype"])
+
+    def predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        count = len(batch)
+        bucket = 1 << (count - 1).bit_length()
+        with self._lock:
+            if bucket != self._batch_size:
+                self._resize(bucket)
+            # Rows past `count` hold stale data; their outputs are dropped
+            self._padded[:count] = batch
+            self.interpreter.set_tensor(self._input["index"], self._padded)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output["index"])[:count].copy()
+
+
+def export_tflite(keras_path: str, out_path: str, quantize: bool):
+    """Converts a Keras model file to TFLite, optionally with dynamic-range int8 quantization."""
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(keras_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize:
+        # Weights stored as int8, activations stay float: no calibration data needed
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    with open(out_path, "wb") as f:
+        f.write(converter.convert())
+
+
+def load_backend(backend: str, model_path: str):
+    """Loads a cached Keras model file with the given backend, exporting it first if needed."""
+    if backend == "keras":
+        return KerasBackend(model_path)
+    if backend in ("tflite", "tflite-int8"):
+        quantize = backend == "tflite-int8"
+        tflite_path = model_store.derived(
+            model_path, ".int8.tflite" if quantize else ".tflite",
+            lambda source, target: export_tflite(source, target, quantize),
+        )
+        return TFLiteBackend(tflite_path, backend, TFLITE_NUM_THREADS)
+    raise ValueError(f"Unknown disease model backend {backend!r}; expected one of {', '.join(BACKENDS)}")
@@ -0,0 +1,318 @@
+# services/llm_gateway.py
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import anyio
+import anyio.from_thread
+
+from helpers.ttl_cache import TTLCache
+
+DEFAULT_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-lite")
+
+
+class LLMUnavailable(Exception):
+    """Raised when the LLM cannot produce a (parseable) answer, after retries where they apply."""
+
+
+class GeminiBackend:
+    """Talks to Google Gemini through google.generativeai's native async API."""
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str]):
+        self._genai = None
+        self._models = {}
+        if not api_key:
+            print("GOOGLE_API_KEY not set. Gemini features will be disabled.")
+            return
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            self._genai = genai
+        except Exception as e:
+            print(f"Error configuring Google AI: {e}")
+
+    @property
+    def available(self) -> bool:
+        return self._genai is not None
+
+    async def generate(self, model: str, contents: list, timeout: float, purpose: str) -> tuple[str, int, int]:
+        client = self._models.get(model)
+        if client is None:
+            client = self._models[model] = self._genai.GenerativeModel(model)
+        response = await client.generate_content_async(contents, request_options={"timeout": timeout})
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+        return response.text, prompt_tokens, output_tokens
+
+
+def _fake_proposal_analysis(prompt: str) -> str:
+    ids = re.findall(r"Proposal ID: (\d+)", prompt)
+    return json.dumps({
+        "best_proposal_id": int(ids[0]) if ids else 0,
+        "reason": "This proposal offers the best total value. Its payment terms are fair to you.",
+    })
+
+
+# Canned answers in the shape each caller parses, so load tests exercise the real code paths.
+FAKE_RESPONSES: dict[str, str | Callable[[str], str]] = {
+    "template_recommendation": json.dumps({
+        "template_name": "Simple Supply Contract",
+        "reason": "A simple one-time sale keeps your terms clear and your payment quick.",
+    }),
+    "proposal_analysis": _fake_proposal_analysis,
+    "compliance_advice": "1. **Risk Alerts**: No immediate risks found. Everything looks on track!\n"
+                         "2. **Next Payment**: Submit your next milestone update.\n"
+                         "3. **Action Plan**: Keep following the schedule.",
+    "contract_summary": "You will deliver the agreed crop and be paid the agreed price.",
+    "milestone_image": "The crop is in the vegetative stage and looks healthy.",
+    "crop_recommendation": json.dumps({"recommendations": []}),
+}
+
+
+class FakeBackend:
+    """
+    Network-free backend for load tests and local runs (LLM_BACKEND=fake).
+    Answers after `latency_ms` with the canned response for the call's purpose.
+    """
+    name = "fake"
+    available = True
+
+    def __init__(self, latency_ms: float = 0.0, responses: Optional[dict] = None):
+        self.latency_ms = latency_ms
+        self.responses = {**FAKE_RESPONSES, **(responses or {})}
+
+    async def generate(self, model: str, contents: list, timeout: float, purpose: str) -> tuple[str, int, int]:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        prompt = "\n".join(part for part in contents if isinstance(part, str))
+        response = self.responses.get(purpose, "OK")
+        text = response(prompt) if callable(response) else response
+        # Rough token estimate, about four characters per token
+        return text, len(prompt) // 4, len(text) // 4
+
+
+class LLMGateway:
+    """
+    The single entry point for LLM calls.
+
+    - Async API (`generate`), plus `generate_blocking` for sync routes on the threadpool
+    - A global semaphore caps concurrent calls; every attempt has a timeout
+    - Failures and unparseable answers are retried with exponential backoff and jitter
+    - Successful answers are cached by a hash of model + prompt, and concurrent
+      identical prompts share a single upstream call
+    - Per-purpose call, token and latency metrics
+    """
+    def __init__(self, backend, max_concurrency: int, timeout: float, max_attempts: int,
+                 retry_base_delay: float, cache_maxsize: int, cache_ttl: float):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.cache = TTLCache(maxsize=cache_maxsize, ttl=cache_ttl)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._metrics: dict[str, dict] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.in_flight = 0
+
+    def set_backend(self, backend):
+        """Swaps the backend, e.g. to a FakeBackend in load tests. Clears the response cache."""
+        self.backend = backend
+        self.cache.clear()
+
+    @property
+    def available(self) -> bool:
+        return self.backend.available
+
+    async def generate(
+        self,
+        contents: str | list,
+        *,
+        purpose: str,
+        model: Optional[str] = None,
+        parse: Optional[Callable[[str], Any]] = None,
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+    ) -> Any:
+        """
+        Returns the model's text, or parse(text) when a parser is given. A parser
+        error counts as a failed attempt, so only answers that parse are cached.
+        Raises LLMUnavailable when every attempt fails.
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        if not self.backend.available:
+            raise LLMUnavailable("LLM backend is not configured.")
+
+        model = model or DEFAULT_MODEL
+        contents = [contents] if isinstance(contents, str) else list(contents)
+        key = self._cache_key(model, contents) if use_cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._record(purpose, cache_hit=True)
+                return parse(cached) if parse else cached
+
+        if not key:
+            return (await self._call_with_retries(model, contents, purpose, parse, timeout))[1]
+
+        # Identical prompts already on their way upstream share that one call
+        while (shared := self._inflight.get(key)) is not None:
+            self._record(purpose, coalesced=True)
+            try:
+                text = await asyncio.shield(shared)
+                return parse(text) if parse else text
+            except asyncio.CancelledError:
+                # Only the leader's request went away (e.g. its client disconnected): take over
+                if asyncio.current_task().cancelling() or not shared.cancelled():
+                    raise
+
+        shared = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            text, result = await self._call_with_retries(model, contents, purpose, parse, timeout)
+        except asyncio.CancelledError:
+            # Not a failure of the prompt: callers waiting on it make the call themselves
+            shared.cancel()
+            raise
+        except BaseException as e:
+            shared.set_exception(e)
+            # Waiters re-raise it; this marks it retrieved even when there are none
+            shared.exception()
+            raise
+        else:
+            self.cache.set(key, text)
+            shared.set_result(text)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _call_with_retries(self, model, contents, purpose, parse, timeout) -> tuple[str, Any]:
+        last_error = None
+        for attempt in range(1, self.max_attempts + 1):
+            started = time.monotonic()
+            try:
+                async with self._semaphore:
+                    with self._lock:
+                        self.in_flight += 1
+                    try:
+                        text, prompt_tokens, output_tokens = await asyncio.wait_for(
+                            self.backend.generate(model, contents, timeout or self.timeout, purpose),
+                            timeout=timeout or self.timeout,
+                        )
+                    finally:
+                        with self._lock:
+                            self.in_flight -= 1
+                result = parse(text) if parse else text
+                self._record(purpose, latency=time.monotonic() - started,
+                             prompt_tokens=prompt_tokens, output_tokens=output_tokens)
+                return text, result
+            except Exception as e:
+                last_error = e
+                self._record(purpose, latency=time.monotonic() - started, error=e)
+                if attempt < self.max_attempts:
+                    self._record(purpose, retry=True)
+                    delay = self.retry_base_delay * 2 ** (attempt - 1)
+                    await asyncio.sleep(delay + random.uniform(0, delay))
+
+        raise LLMUnavailable(f"{purpose} failed after {self.max_attempts} attempts: {last_error!r}")
+
+    def generate_blocking(self, contents: str | list, **kwargs) -> Any:
+        """
+        Sync counterpart of generate() for code running in a worker thread. The
+        call still runs on the app's event loop, so the global limiter applies.
+        """
+        call = lambda: self.generate(contents, **kwargs)
+        try:
+            # Starlette's threadpool (sync routes) is an anyio worker thread
+            return anyio.from_thread.run(call)
+        except RuntimeError:
+            pass
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            return asyncio.run_coroutine_threadsafe(call(), loop).result()
+        # No app loop at all (scripts, one-off jobs)
+        return asyncio.run(call())
+
+    def _cache_key(self, model: str, contents: list) -> str:
+        digest = hashlib.sha256(model.encode())
+        for part in contents:
+            if isinstance(part, str):
+                digest.update(b"s" + part.encode())
+            elif isinstance(part, dict) and isinstance(part.get("data"), bytes):
+                digest.update(b"b" + part.get("mime_type", "").encode() + part["data"])
+            else:
+                digest.update(b"r" + repr(part).encode())
+        return digest.hexdigest()
+
+    def _record(self, purpose: str, latency: float = 0.0, prompt_tokens: int = 0, output_tokens: int = 0,
+                error: Optional[Exception] = None, cache_hit: bool = False, retry: bool = False,
+                coalesced: bool = False):
+        with self._lock:
+            m = self._metrics.setdefault(purpose, {
+                "calls": 0, "cache_hits": 0, "coalesced": 0, "errors": 0, "timeouts": 0, "retries": 0,
+                "prompt_tokens": 0, "output_tokens": 0, "total_latency": 0.0, "max_latency": 0.0,
+            })
+            if cache_hit:
+                m["cache_hits"] += 1
+                return
+            if retry:
+                m["retries"] += 1
+                return
+            if coalesced:
+                m["coalesced"] += 1
+                return
+            m["calls"] += 1
+            m["total_latency"] += latency
+            m["max_latency"] = max(m["max_latency"], latency)
+            m["prompt_tokens"] += prompt_tokens
+            m["output_tokens"] += output_tokens
+            if error is not None:
+                m["errors"] += 1
+                if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+                    m["timeouts"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            purposes = {
+                purpose: {
+                    **{k: v for k, v in m.items() if k not in ("total_latency", "max_latency")},
+                    "avg_latency_ms": round(m["total_latency"] / m["calls"] * 1000, 2) if m["calls"] else 0.0,
+                    "max_latency_ms": round(m["max_latency"] * 1000, 2),
+                }
+                for purpose, m in self._metrics.items()
+            }
+            return {
+                "backend": self.backend.name,
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "cache": self.cache.stats(),
+                "purposes": purposes,
+            }
+
+
+def _backend_from_env():
+    if os.getenv("LLM_BACKEND", "gemini").lower() == "fake":
+        return FakeBackend(latency_ms=float(os.getenv("LLM_FAKE_LATENCY_MS", "0")))
+    return GeminiBackend(os.getenv("GOOGLE_API_KEY"))
+
+
+llm_gateway = LLMGateway(
+    backend=_backend_from_env(),
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+    timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", "20")),
+    max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "3")),
+    retry_base_delay=float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5")),
+    cache_maxsize=int(os.getenv("LLM_CACHE_MAXSIZE", "512")),
+    cache_ttl=float(os.getenv("LLM_CACHE_TTL_SECONDS", "300")),
+)
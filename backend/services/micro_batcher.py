@@ -0,0 +1,192 @@
+# services/micro_batcher.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from helpers.bounded_executor import BoundedExecutor, ExecutorSaturated
+from services.image_preprocessing import BatchBuffer
+from services.prediction_cache import PredictionCache
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching in front of a DiseaseModel.
+
+    Each request is preprocessed on the shared inference executor, then queued.
+    A collector task takes the first queued image and waits up to `max_wait_ms`
+    for more, or until `max_batch_size` images are queued. It stacks them into one
+    tensor, runs a single forward pass and hands each caller its row. Forward
+    passes run one at a time on the batcher's own thread (the framework already
+    parallelises a pass across cores), and while one runs the next batch fills up,
+    so batches grow with load and stay at one image when the server is idle.
+
+    More than `max_queue` waiting images raises ExecutorSaturated (a 503).
+
+    With a `cache`, an image already classified by this model version is
+    answered without decoding, and identical images in flight share one slot.
+    """
+    def __init__(self, name: str, model, executor: BoundedExecutor,
+                 max_batch_size: int, max_wait_ms: float, max_queue: int,
+                 cache: PredictionCache | None = None):
+        self.name = name
+        self.model = model
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.cache = cache
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-batch")
+        # Only touched on the runner thread
+        self._buffer = BatchBuffer(self.max_batch_size)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rejected = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.max_observed_batch = 0
+        self.batch_sizes: dict[int, int] = {}
+        self.total_queue_wait = 0.0
+        self.total_forward_seconds = 0.0
+
+    async def predict(self, image_bytes: bytes) -> dict:
+        """Preprocesses, batches and classifies one upload."""
+        self._ensure_started()
+        if self._queue.qsize() >= self.max_queue:
+            with self._lock:
+                self.rejected += 1
+            raise ExecutorSaturated(self.name)
+        key = None
+        if self.cache is not None and self.model.version:
+            key, cached = await self.executor.run(self._lookup, image_bytes)
+            if cached is not None:
+                return cached
+            # The same photo may already be on its way through the model
+            while (shared := self._inflight.get(key)) is not None:
+                try:
+                    return self.model.format_prediction(await asyncio.shield(shared))
+                except asyncio.CancelledError:
+                    # Only the leader's request went away (e.g. its client disconnected): take over
+                    if asyncio.current_task().cancelling() or not shared.cancelled():
+                        raise
+        future = self._loop.create_future()
+        if key:
+            self._inflight[key] = future
+        try:
+            array = await self.executor.run(self.model.preprocess, image_bytes)
+            self._queue.put_nowait((array, future, time.monotonic()))
+            with self._lock:
+                self.requests += 1
+            result = self.model.format_prediction(await future)
+        except asyncio.CancelledError:
+            # Not a failure of the image: duplicates waiting on it queue their own copy instead
+            future.cancel()
+            raise
+        except BaseException as e:
+            # Duplicates waiting on this future fail the same way
+            if not future.done():
+                future.set_exception(e)
+                future.exception()
+            raise
+        finally:
+            if key:
+                self._inflight.pop(key, None)
+        if key:
+            await self.cache.store(key, result)
+        return result
+
+    def _lookup(self, image_bytes: bytes) -> tuple[str, dict | None]:
+        key = self.cache.key(self.model.version, image_bytes)
+        return key, self.cache.get(key)
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._collect())
+
+    async def _next_batch(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Callers that gave up (client disconnected) do not need a slot in the pass
+        return [item for item in batch if not item[1].done()]
+
+    async def _collect(self):
+        while True:
+            batch = await self._next_batch()
+            if not batch:
+                continue
+            started = time.monotonic()
+            try:
+                preds = await self._loop.run_in_executor(self._runner, self._forward, [array for array, _, _ in batch])
+            except Exception as e:
+                with self._lock:
+                    self.failed_batches += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            finished = time.monotonic()
+            with self._lock:
+                size = len(batch)
+                self.batches += 1
+                self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+                self.max_observed_batch = max(self.max_observed_batch, size)
+                self.total_forward_seconds += finished - started
+                self.total_queue_wait += sum(started - queued_at for _, _, queued_at in batch)
+            for (_, future, _), row in zip(batch, preds):
+                if not future.done():
+                    future.set_result(row)
+
+    def _forward(self, images: list):
+        # Scale the uint8 images straight into the reused float32 input tensor
+        return self.model.predict_batch(self._buffer.fill(images))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future, _ = self._queue.get_nowait()
+                if not future.done():
+                    future.cancel()
+        self._runner.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            images = sum(size * count for size, count in self.batch_sizes.items())
+            return {
+                "name": self.name,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "queued": self._queue.qsize() if self._queue else 0,
+                "requests": self.requests,
+                "rejected": self.rejected,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "avg_batch_size": round(images / self.batches, 2) if self.batches else 0.0,
+                "max_batch_size_seen": self.max_observed_batch,
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+                "avg_queue_wait_ms": round(self.total_queue_wait / images * 1000, 2) if images else 0.0,
+                "avg_forward_ms": round(self.total_forward_seconds / self.batches * 1000, 2) if self.batches else 0.0,
+            }
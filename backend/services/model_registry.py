@@ -0,0 +1,138 @@
+# services/model_registry.py
+
+import asyncio
+import importlib
+import logging
+import os
+import threading
+import time
+from enum import Enum
+
+from services.inference import inference_batcher
+from services.micro_batcher import MicroBatcher
+from services.model_store import ModelUnavailable
+
+logger = logging.getLogger("model_registry")
+
+
+class ModelState(str, Enum):
+    not_loaded = "not_loaded"
+    loading = "loading"
+    ready = "ready"
+    failed = "failed"
+
+
+class _Entry:
+    def __init__(self, target: str):
+        self.target = target
+        self.lock = threading.Lock()
+        self.model = None
+        self.state = ModelState.not_loaded
+        self.error: str | None = None
+        self.load_seconds: float | None = None
+        self.task: asyncio.Task | None = None
+
+
+class ModelRegistry:
+    """
+    Loads the disease models on first use or in a background warmup task, so
+    importing the app pulls in neither TensorFlow nor the model files and the
+    API serves requests straight away.
+
+    Models are registered as "module:Class" and imported when first loaded. A
+    request for a model that is still loading waits up to `load_wait` seconds,
+    then gets ModelUnavailable (a 503) instead of holding its connection for a
+    cold download. A failed load is retried on the next request.
+    """
+    def __init__(self, load_wait: float, warmup: bool):
+        self.load_wait = load_wait
+        self.warmup = warmup
+        self._entries: dict[str, _Entry] = {}
+        self._warmup_task: asyncio.Task | None = None
+
+    def register(self, name: str, target: str):
+        self._entries[name] = _Entry(target)
+
+    def model_class(self, name: str):
+        module_name, class_name = self._entries[name].target.split(":")
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def load(self, name: str):
+        """Returns the model, loading it in the calling thread if needed. Safe to call from several threads."""
+        entry = self._entries[name]
+        with entry.lock:
+            if entry.model is not None:
+                return entry.model
+            entry.state = ModelState.loading
+            started = time.monotonic()
+            try:
+                model = self.model_class(name)()
+            except Exception as e:
+                entry.state = ModelState.failed
+                entry.error = repr(e)
+                logger.exception("Loading the %s model failed.", name)
+                raise ModelUnavailable(f"The {name} model failed to load: {e}") from e
+            entry.model = model
+            entry.state = ModelState.ready
+            entry.error = None
+            entry.load_seconds = round(time.monotonic() - started, 2)
+            logger.info("Loaded the %s model in %.2fs.", name, entry.load_seconds)
+            return model
+
+    def _load_task(self, name: str) -> asyncio.Task:
+        entry = self._entries[name]
+        # One shared load per model; a finished (failed) task is replaced so the load is retried
+        if entry.task is None or entry.task.done():
+            entry.task = asyncio.create_task(asyncio.to_thread(self.load, name))
+        return entry.task
+
+    async def batcher(self, name: str) -> MicroBatcher:
+        """The micro-batcher for a model, loading the model first if needed."""
+        entry = self._entries[name]
+        if entry.model is None:
+            try:
+                await asyncio.wait_for(asyncio.shield(self._load_task(name)), self.load_wait)
+            except asyncio.TimeoutError:
+                raise ModelUnavailable(f"The {name} model is still loading, please retry shortly.")
+        return inference_batcher(name, entry.model)
+
+    async def start(self):
+        if self.warmup:
+            self._warmup_task = asyncio.create_task(self._warm_up())
+
+    async def _warm_up(self):
+        # One model at a time, so the two loads do not compete for CPU and memory
+        for name in self._entries:
+            try:
+                await self._load_task(name)
+            except ModelUnavailable:
+                pass
+
+    async def stop(self):
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+            self._warmup_task = None
+
+    def status(self) -> dict:
+        models = {
+            name: {
+                "state": entry.state.value,
+                "backend": entry.model.backend if entry.model is not None else None,
+                "load_seconds": entry.load_seconds,
+                "error": entry.error,
+            }
+            for name, entry in self._entries.items()
+        }
+        return {
+            "ready": all(entry.state == ModelState.ready for entry in self._entries.values()),
+            "models": models,
+        }
+
+
+model_registry = ModelRegistry(
+    load_wait=float(os.getenv("MODEL_LOAD_WAIT_SECONDS", "30")),
+    warmup=os.getenv("MODEL_WARMUP", "1").lower() in ("1", "true", "yes"),
+)
+model_registry.register("cotton", "services.cotton_model:CottonDiseaseModel")
+model_registry.register("tomato", "services.tomato_model:TomatoDiseaseModel")
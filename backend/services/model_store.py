@@ -0,0 +1,207 @@
+# services/model_store.py
+
+import fcntl
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+
+from services.http_client import http_clients
+
+logger = logging.getLogger("model_store")
+
+MODEL_CACHE_DIR = os.getenv(
+    "MODEL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "krishi-connect", "models")
+)
+# Offline: never touch the network, load only what is already cached
+MODEL_OFFLINE = os.getenv("MODEL_OFFLINE", os.getenv("HF_HUB_OFFLINE", "0")).lower() in ("1", "true", "yes")
+MODEL_DOWNLOAD_TIMEOUT_SECONDS = float(os.getenv("MODEL_DOWNLOAD_TIMEOUT_SECONDS", "60"))
+MODEL_LOCK_TIMEOUT_SECONDS = float(os.getenv("MODEL_LOCK_TIMEOUT_SECONDS", "600"))
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ModelUnavailable(Exception):
+    """Raised when a model file is neither cached nor downloadable (e.g. offline with a cold cache)."""
+
+
+def _sha256_of(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: str, data: bytes):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+@contextmanager
+def _file_lock(path: str, timeout: float):
+    """Exclusive inter-process lock, so only one worker downloads a given file."""
+    with open(path, "a") as lock_file:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() > deadline:
+                    raise ModelUnavailable(f"Timed out waiting for another process to download {path}")
+                time.sleep(0.2)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class ModelStore:
+    """
+    Persistent on-disk cache for model files from the Hugging Face Hub.
+
+    Files live under <cache_dir>/<repo--id>/<filename>, next to a .sha256
+    sidecar written at download time. A cached file is used only when its
+    checksum matches the sidecar (and the expected checksum, when one is
+    configured); otherwise it is downloaded again. Downloads go to a temp file
+    in the same directory and are moved into place with os.replace, holding a
+    file lock, so concurrent workers never see a partial file and only one of
+    them downloads.
+    """
+    def __init__(self, cache_dir: str, offline: bool, timeout: float, lock_timeout: float):
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+
+    def path_for(self, repo_id: str, filename: str) -> str:
+        return os.path.join(self.cache_dir, repo_id.replace("/", "--"), filename)
+
+    def fetch(self, repo_id: str, filename: str, sha256: str | None = None) -> str:
+        """Returns the local path of a verified copy of the file, downloading it if needed."""
+        path = self.path_for(repo_id, filename)
+        expected = sha256.lower() if sha256 else None
+        if self._verified(path, expected):
+            return path
+        if self.offline:
+            raise ModelUnavailable(f"{repo_id}/{filename} has no verified copy in the model cache ({self.cache_dir}) and offline mode is on.")
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with _file_lock(path + ".lock", self.lock_timeout):
+            # Another worker may have finished the download while we waited for the lock
+            if self._verified(path, expected):
+                return path
+            self._download(repo_id, filename, path, expected)
+        return path
+
+    def checksum(self, path: str) -> str:
+        """sha256 of a cached file, from its sidecar when there is one."""
+        try:
+            with open(path + ".sha256") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return _sha256_of(path)
+
+    def derived(self, source_path: str, suffix: str, build) -> str:
+        """
+        Returns source_path + suffix, a file built from a cached model by
+        build(source, target) (e.g. a TFLite export). It is rebuilt whenever the
+        source's checksum changes, with the same lock and atomic move as downloads.
+        """
+        path = source_path + suffix
+        source_sha = self.checksum(source_path)
+        if self._built_from(path, source_sha):
+            return path
+
+        with _file_lock(path + ".lock", self.lock_timeout):
+            if self._built_from(path, source_sha):
+                return path
+            started = time.monotonic()
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=suffix)
+            os.close(fd)
+            try:
+                build(source_path, tmp_path)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            _write_atomic(path + ".source", source_sha.encode())
+            logger.info("Built %s in %.1fs", path, time.monotonic() - started)
+        return path
+
+    def _built_from(self, path: str, source_sha: str) -> bool:
+        try:
+            with open(path + ".source") as f:
+                return os.path.exists(path) and f.read().strip() == source_sha
+        except FileNotFoundError:
+            return False
+
+    def _verified(self, path: str, expected: str | None) -> bool:
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path + ".sha256") as f:
+                recorded = f.read().strip()
+        except FileNotFoundError:
+            recorded = None
+        if recorded is None and expected is None:
+            return False
+        actual = _sha256_of(path)
+        if (recorded and actual != recorded) or (expected and actual != expected):
+            logger.warning("Cached model %s failed its checksum; it will be downloaded again.", path)
+            return False
+        return True
+
+    def _download(self, repo_id: str, filename: str, path: str, expected: str | None):
+        from huggingface_hub import hf_hub_url
+
+        url = hf_hub_url(repo_id=repo_id, filename=filename)
+        started = time.monotonic()
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            client = http_clients.sync_client("huggingface")
+            with os.fdopen(fd, "wb") as f, client.stream("GET", url, timeout=self.timeout, follow_redirects=True) as r:
+                r.raise_for_status()
+                # The Hub reports the sha256 of LFS files as their etag
+                etag = (r.headers.get("X-Linked-Etag") or r.headers.get("ETag") or "").strip('"').lower()
+                for chunk in r.iter_bytes(chunk_size=1024 * 1024):
+                    f.write(chunk)
+                    digest.update(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+
+            actual = digest.hexdigest()
+            for source, want in (("configured", expected), ("hub", etag if _SHA256.match(etag) else None)):
+                if want and actual != want:
+                    raise ModelUnavailable(
+                        f"Checksum mismatch for {repo_id}/{filename}: got {actual}, {source} checksum is {want}"
+                    )
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        _write_atomic(path + ".sha256", actual.encode())
+        logger.info("Downloaded %s/%s to %s in %.1fs", repo_id, filename, path, time.monotonic() - started)
+
+
+model_store = ModelStore(
+    cache_dir=MODEL_CACHE_DIR,
+    offline=MODEL_OFFLINE,
+    timeout=MODEL_DOWNLOAD_TIMEOUT_SECONDS,
+    lock_timeout=MODEL_LOCK_TIMEOUT_SECONDS,
+)
@@ -1,9 +1,10 @@
 # backend/services/onesignal_service.py
 
 import os
-import json
-import requests
-import asyncio
+
+import httpx
+
+from services.http_client import http_clients
 
 # Get your OneSignal credentials from the .env file
 ONE_SIGNAL_APP_ID = os.environ.get("ONE_SIGNAL_APP_ID")
@@ -13,27 +14,25 @@ ONE_SIGNAL_API_KEY = os.environ.get("ONE_SIGNAL_REST_API_KEY")
 if not all([ONE_SIGNAL_APP_ID, ONE_SIGNAL_API_KEY]):
     raise EnvironmentError("OneSignal credentials are not set in environment variables.")
 
-def send_notification_sync(payload: dict):
-    """
-    This is the synchronous function that actually makes the API call.
-    We will run it in a separate thread to avoid blocking our async app.
-    """
+async def send_notification(payload: dict):
+    """Makes the OneSignal API call on the shared, pooled HTTP client."""
     headers = {
         "accept": "application/json",
         "Authorization": f"Basic {ONE_SIGNAL_API_KEY}",
         "content-type": "application/json"
     }
     try:
-        response = requests.post(
+        response = await http_clients.async_client("onesignal", timeout=15).post(
             "https://onesignal.com/api/v1/notifications",
             headers=headers,
-            data=json.dumps(payload)
+            json=payload
         )
         response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
         print("Successfully sent push notification via OneSignal.")
         print(response.text)
         return response.json()
-    except requests.exceptions.RequestException as e:
+    # A 2xx with a body that is not JSON raises ValueError (json.JSONDecodeError), not an httpx error
+    except (httpx.HTTPError, ValueError) as e:
         print(f"Error sending OneSignal notification: {e}")
         return None
 
@@ -50,5 +49,4 @@ async def send_notification_to_all(headings: dict, contents: dict, url: str = No
     if url:
         payload["url"] = url
 
-    # Run the blocking 'requests' call in a non-blocking way
-    return await asyncio.to_thread(send_notification_sync, payload)
\ No newline at end of file
+    return await send_notification(payload)
\ No newline at end of file
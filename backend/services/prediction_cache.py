@@ -0,0 +1,36 @@
+# services/prediction_cache.py
+
+import hashlib
+import os
+
+from helpers.disk_cache import DiskCache
+from helpers.tiered_cache import TieredCache
+
+
+class PredictionCache(TieredCache):
+    """
+    Disease predictions keyed by model version + SHA-256 of the uploaded bytes,
+    so a re-submitted photo skips decoding and inference. An in-process LRU
+    answers most repeats, and an optional on-disk tier (PREDICTION_CACHE_DIR) is
+    shared by workers and survives restarts. The model version covers the
+    model file, the backend and the preprocessing, so changing any of them never
+    serves a stale answer.
+    """
+    @staticmethod
+    def key(model_version: str, image_bytes: bytes) -> str:
+        image_digest = hashlib.sha256(image_bytes).hexdigest()
+        return hashlib.sha256(f"{model_version}|{image_digest}".encode()).hexdigest()
+
+
+_cache_dir = os.getenv("PREDICTION_CACHE_DIR")
+_ttl = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+prediction_cache = PredictionCache(
+    memory_maxsize=int(os.getenv("PREDICTION_CACHE_MAXSIZE", "2048")),
+    ttl=_ttl,
+    disk=DiskCache(
+        _cache_dir,
+        max_bytes=int(os.getenv("PREDICTION_CACHE_DISK_MAX_MB", "256")) * 1024 * 1024,
+        ttl=_ttl,
+    ) if _cache_dir else None,
+)
@@ -0,0 +1,192 @@
+# services/recommendation_worker.py
+
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_, select, update
+
+from database.postgresConn import AsyncSessionLocal
+from models.all_model import CropList as CropListModel, RecommendationStatus
+from helpers.recommendation_engine import request_template_recommendation, FALLBACK_RECOMMENDATION
+
+logger = logging.getLogger("recommendation_worker")
+
+
+class RecommendationWorker:
+    """
+    Fills in contract template recommendations for new listings in the background,
+    so creating a listing never waits on the LLM.
+
+    A fixed number of worker tasks drain an in-process queue, which bounds the
+    number of concurrent LLM calls. Failed calls are retried with exponential
+    backoff and jitter. After the last attempt the listing gets the safe default
+    template and is marked failed. Listings still pending at startup (e.g. after
+    a restart) are queued again.
+
+    Every app process runs a worker and re-queues at startup, so a listing is
+    claimed (recommendation_claimed_at, one conditional UPDATE) before its LLM
+    call and only the process that wins the claim works on it. A claim older
+    than `claim_timeout` is taken to belong to a process that died and can be
+    claimed again.
+    """
+    def __init__(self, concurrency: int, max_attempts: int, retry_base_delay: float, claim_timeout: float):
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.claim_timeout = claim_timeout
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._queued: set[int] = set()
+        self.processed = 0
+        self.retries = 0
+        self.failed = 0
+        self.claimed_elsewhere = 0
+        self.total_seconds = 0.0
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+        await self._enqueue_pending()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    def enqueue(self, listing_id: int):
+        """Queues a listing. Safe to call from sync routes running on the threadpool."""
+        if self._loop is None:
+            # Not started (e.g. a script); the listing stays pending and is picked up on the next startup.
+            logger.warning("Recommendation worker not running; listing %s left pending.", listing_id)
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._put(listing_id)
+        else:
+            self._loop.call_soon_threadsafe(self._put, listing_id)
+
+    def _put(self, listing_id: int):
+        if listing_id in self._queued:
+            return
+        self._queued.add(listing_id)
+        self._queue.put_nowait(listing_id)
+
+    def _claimable(self):
+        """Pending listings that no live worker holds."""
+        stale = datetime.now(timezone.utc) - timedelta(seconds=self.claim_timeout)
+        return and_(
+            CropListModel.recommendation_status == RecommendationStatus.pending.value,
+            or_(CropListModel.recommendation_claimed_at.is_(None), CropListModel.recommendation_claimed_at < stale),
+        )
+
+    async def _claim(self, listing_id: int) -> bool:
+        """Atomically takes the listing for this process; False when another worker has it or it is done."""
+        async with AsyncSessionLocal() as db:
+            claimed = (await db.execute(
+                update(CropListModel)
+                .where(CropListModel.id == listing_id, self._claimable())
+                .values(recommendation_claimed_at=datetime.now(timezone.utc))
+                .returning(CropListModel.id)
+            )).scalar_one_or_none()
+            await db.commit()
+        return claimed is not None
+
+    async def _enqueue_pending(self):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(CropListModel.id)
+                .where(self._claimable())
+                .order_by(CropListModel.id)
+            )
+            pending = result.scalars().all()
+        for listing_id in pending:
+            self._put(listing_id)
+        if pending:
+            logger.info("Re-queued %d listings awaiting a recommendation.", len(pending))
+
+    async def _run(self):
+        while True:
+            listing_id = await self._queue.get()
+            try:
+                await self._process(listing_id)
+            except Exception:
+                logger.exception("Recommendation for listing %s failed unexpectedly.", listing_id)
+            finally:
+                self._queued.discard(listing_id)
+                self._queue.task_done()
+
+    async def _process(self, listing_id: int):
+        if not await self._claim(listing_id):
+            self.claimed_elsewhere += 1
+            return
+        async with AsyncSessionLocal() as db:
+            listing = await db.get(CropListModel, listing_id)
+
+        started = time.monotonic()
+        status = RecommendationStatus.ready
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                data = await request_template_recommendation(listing)
+                break
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    logger.warning("Giving up on listing %s after %d attempts: %s", listing_id, attempt, e)
+                    data = dict(FALLBACK_RECOMMENDATION)
+                    status = RecommendationStatus.failed
+                    break
+                self.retries += 1
+                delay = self.retry_base_delay * 2 ** (attempt - 1)
+                await asyncio.sleep(delay + random.uniform(0, delay))
+
+        async with AsyncSessionLocal() as db:
+            # Only a still-pending row is updated, so a duplicate job cannot overwrite a finished one.
+            await db.execute(
+                update(CropListModel)
+                .where(
+                    CropListModel.id == listing_id,
+                    CropListModel.recommendation_status == RecommendationStatus.pending.value,
+                )
+                .values(
+                    recommended_template_name=data.get("template_name"),
+                    recommendation_reason=data.get("reason"),
+                    recommendation_status=status.value,
+                )
+            )
+            await db.commit()
+
+        self.processed += 1
+        if status == RecommendationStatus.failed:
+            self.failed += 1
+        self.total_seconds += time.monotonic() - started
+
+    def stats(self) -> dict:
+        return {
+            "running": self._loop is not None,
+            "concurrency": self.concurrency,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "processed": self.processed,
+            "retries": self.retries,
+            "failed": self.failed,
+            "claimed_elsewhere": self.claimed_elsewhere,
+            "avg_seconds": round(self.total_seconds / self.processed, 3) if self.processed else 0.0,
+        }
+
+
+recommendation_worker = RecommendationWorker(
+    concurrency=int(os.getenv("RECOMMENDATION_WORKERS", "2")),
+    max_attempts=int(os.getenv("RECOMMENDATION_MAX_ATTEMPTS", "3")),
+    retry_base_delay=float(os.getenv("RECOMMENDATION_RETRY_BASE_SECONDS", "2")),
+    # Must outlast every attempt of one listing's LLM calls, backoff included
+    claim_timeout=float(os.getenv("RECOMMENDATION_CLAIM_TIMEOUT_SECONDS", "600")),
+)
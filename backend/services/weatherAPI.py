@@ -2,6 +2,8 @@
 import os
 import httpx
 
+from services.http_client import http_clients
+
 def generate_advisories(hourly_forecast: list):
     """
     Takes the hourly forecast list from Google Weather (forecastHours)
@@ -97,10 +99,9 @@ async def fetch_google_weather_and_advisories(lat: float = 18.52, lon: float = 7
     }
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(API_URL, params=params)
-            response.raise_for_status() 
-            weather_data = response.json()
+        response = await http_clients.async_client("google-weather").get(API_URL, params=params)
+        response.raise_for_status()
+        weather_data = response.json()
         
         hourly_forecast = weather_data.get('forecastHours', [])
         
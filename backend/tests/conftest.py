@@ -0,0 +1,9 @@
+# tests/conftest.py
+
+import os
+import tempfile
+
+# database.postgresConn builds its engines at import (a file URL, so the pool options apply);
+# tests that touch the database make their own SQLite engines
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'agrisarthi-tests.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret")
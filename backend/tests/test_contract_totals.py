@@ -0,0 +1,93 @@
+# tests/test_contract_totals.py
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from database.postgresConn import Base
+from models.all_model import Contract, Transaction, User, UserRole, Wallet
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    tables = [Base.metadata.tables[name] for name in ("users", "wallets", "contracts", "transactions")]
+    Base.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+    farmer = User(full_name="f", email="f@x.in", hashed_password="x", role=UserRole.farmer)
+    buyer = User(full_name="b", email="b@x.in", hashed_password="x", role=UserRole.buyer)
+    session.add_all([farmer, buyer])
+    session.flush()
+    session.add(Wallet(user_id=buyer.id, balance=0))
+    for _ in range(2):
+        session.add(Contract(listing_id=1, buyer_id=buyer.id, farmer_id=farmer.id,
+                             quantity_proposed=10, price_per_unit_agreed=Decimal("20.00")))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _ledger_totals(db, contract_id):
+    sums = {}
+    for kind in ("escrow", "release"):
+        sums[kind] = db.scalar(select(func.coalesce(func.sum(Transaction.amount), 0)).where(
+            Transaction.contract_id == contract_id, Transaction.type == kind))
+    return Decimal(str(sums["escrow"])), Decimal(str(sums["release"]))
+
+
+def _assert_totals_match_ledger(db):
+    db.expire_all()
+    for contract in db.scalars(select(Contract)):
+        assert (contract.escrow_total, contract.released_total) == _ledger_totals(db, contract.id)
+
+
+def _add(db, contract_id, amount, kind):
+    wallet = db.scalars(select(Wallet)).first()
+    tx = Transaction(wallet_id=wallet.id, contract_id=contract_id, amount=Decimal(amount), type=kind)
+    db.add(tx)
+    db.commit()
+    return tx
+
+
+def test_insert_updates_totals(db):
+    _add(db, 1, "200.00", "escrow")
+    _add(db, 1, "50.00", "release")
+    _add(db, 2, "30.00", "escrow")
+    _add(db, None, "99.00", "deposit")
+    _assert_totals_match_ledger(db)
+    assert db.get(Contract, 1).escrow_total == Decimal("200.00")
+
+
+def test_update_amount_type_and_contract(db):
+    tx = _add(db, 1, "200.00", "escrow")
+    tx.amount = Decimal("150.00")
+    db.commit()
+    _assert_totals_match_ledger(db)
+    tx.type = "release"
+    db.commit()
+    _assert_totals_match_ledger(db)
+    tx.contract_id = 2
+    tx.amount = Decimal("10.00")
+    db.commit()
+    _assert_totals_match_ledger(db)
+    assert db.get(Contract, 1).released_total == Decimal("0.00")
+
+
+def test_delete_removes_from_totals(db):
+    _add(db, 1, "200.00", "escrow")
+    tx = _add(db, 1, "75.00", "escrow")
+    db.delete(tx)
+    db.commit()
+    _assert_totals_match_ledger(db)
+    assert db.get(Contract, 1).escrow_total == Decimal("200.00")
+
+
+def test_rollback_leaves_totals_unchanged(db):
+    _add(db, 1, "200.00", "escrow")
+    wallet = db.scalars(select(Wallet)).first()
+    db.add(Transaction(wallet_id=wallet.id, contract_id=1, amount=Decimal("5.00"), type="escrow"))
+    db.flush()
+    db.rollback()
+    _assert_totals_match_ledger(db)
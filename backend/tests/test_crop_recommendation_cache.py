@@ -0,0 +1,77 @@
+# tests/test_crop_recommendation_cache.py
+
+import pytest
+
+from helpers.crop_recommendation_cache import ABSOLUTE_BUCKETS, RELATIVE_BUCKETS, cache_key, quantize_params
+
+FARM = {
+    "nitrogen": 82.0, "phosphorus": 41.0, "potassium": 38.0, "pH": 6.47,
+    "temperature": 24.6, "humidity": 61.0, "rainfall": 910.0,
+    "latitude": 18.5204, "longitude": 73.8567,
+    "water_available_liters": 12500.0, "area_hectares": 2.0,
+    "location": "  Pune,   Maharashtra ", "notes": "Drip IRRIGATION",
+}
+
+
+def test_absolute_values_snap_to_their_bucket():
+    q = quantize_params(FARM, scale=1.0)
+    assert (q["nitrogen"], q["phosphorus"], q["potassium"]) == (80.0, 40.0, 40.0)
+    assert q["pH"] == 6.4
+    assert (q["temperature"], q["humidity"], q["rainfall"]) == (25.0, 60.0, 900.0)
+    assert (q["latitude"], q["longitude"]) == (18.5, 73.9)
+
+
+def test_relative_values_snap_to_three_significant_figures():
+    q = quantize_params(FARM, scale=1.0)
+    for key in RELATIVE_BUCKETS:
+        # Within half a 10% step of the input
+        assert abs(q[key] / FARM[key] - 1) <= 0.05 + 1e-3
+        assert len(str(q[key]).replace(".", "").strip("0")) <= 3
+
+
+def test_text_is_normalized():
+    q = quantize_params(FARM)
+    assert q["location"] == "pune, maharashtra"
+    assert q["notes"] == "drip irrigation"
+    assert quantize_params({**FARM, "notes": "   "})["notes"] is None
+
+
+def test_missing_values_stay_missing():
+    q = quantize_params({})
+    assert set(q) == {*ABSOLUTE_BUCKETS, *RELATIVE_BUCKETS, "location", "notes"}
+    assert all(value is None for value in q.values())
+
+
+def test_zero_and_negative_relative_values_pass_through():
+    q = quantize_params({**FARM, "water_available_liters": 0, "area_hectares": -1})
+    assert (q["water_available_liters"], q["area_hectares"]) == (0, -1)
+
+
+def test_scale_zero_keeps_exact_values():
+    q = quantize_params(FARM, scale=0)
+    for key in (*ABSOLUTE_BUCKETS, *RELATIVE_BUCKETS):
+        assert q[key] == FARM[key]
+
+
+def test_larger_scale_merges_more_farms():
+    a, b = {**FARM, "nitrogen": 62.0}, {**FARM, "nitrogen": 78.0}
+    assert quantize_params(a, scale=1.0)["nitrogen"] != quantize_params(b, scale=1.0)["nitrogen"]
+    assert quantize_params(a, scale=4.0)["nitrogen"] == quantize_params(b, scale=4.0)["nitrogen"]
+
+
+def test_farms_in_the_same_buckets_share_a_key():
+    nearby = {**FARM, "nitrogen": 78.5, "pH": 6.5, "temperature": 25.2, "rainfall": 890.0,
+              "water_available_liters": 12800.0, "location": "pune, maharashtra", "notes": "drip irrigation"}
+    assert cache_key(quantize_params(FARM), "v1") == cache_key(quantize_params(nearby), "v1")
+
+
+@pytest.mark.parametrize("change", [{"nitrogen": 120.0}, {"pH": 7.5}, {"area_hectares": 5.0}, {"location": "Nashik"}])
+def test_different_buckets_get_different_keys(change):
+    assert cache_key(quantize_params(FARM), "v1") != cache_key(quantize_params({**FARM, **change}), "v1")
+
+
+def test_key_depends_on_version_not_dict_order():
+    q = quantize_params(FARM)
+    assert cache_key(q, "v1") != cache_key(q, "v2")
+    assert cache_key(dict(reversed(list(q.items()))), "v1") == cache_key(q, "v1")
+    assert len(cache_key(q, "v1")) == 64
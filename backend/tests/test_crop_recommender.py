@@ -0,0 +1,137 @@
+# tests/test_crop_recommender.py
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services import crop_recommender
+from services.crop_recommender import recommend, recommend_rule_based
+
+PARAMS = {"nitrogen": 80, "phosphorus": 40, "potassium": 40, "pH": 6.5, "temperature": 25, "rainfall": 900}
+GEMINI_ANSWER = [{"name": "Gemini Crop", "suitability_score": 0.9, "reason": "From the LLM."}]
+
+
+class FakeGemini:
+    """Stands in for recommend_with_gemini: answers `result` (or raises it) after `delay` seconds."""
+    def __init__(self, delay: float, result=GEMINI_ANSWER):
+        self.delay = delay
+        self.result = result
+        self.finished = False
+        self.cancelled = False
+
+    async def __call__(self, params, top_k=5):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        self.finished = True
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = crop_recommender._RecommendationStats()
+    monkeypatch.setattr(crop_recommender, "recommendation_stats", stats)
+    monkeypatch.setattr(crop_recommender, "GEMINI_DEADLINE_SECONDS", 0.1)
+    monkeypatch.setattr(crop_recommender, "llm_gateway", SimpleNamespace(available=True))
+    return stats
+
+
+def _use(monkeypatch, gemini: FakeGemini, cache_late: bool = True) -> FakeGemini:
+    monkeypatch.setattr(crop_recommender, "recommend_with_gemini", gemini)
+    monkeypatch.setattr(crop_recommender, "CACHE_LATE_GEMINI", cache_late)
+    return gemini
+
+
+def test_rule_based_when_gemini_is_disabled(monkeypatch, stats):
+    monkeypatch.setattr(crop_recommender, "llm_gateway", SimpleNamespace(available=False))
+    recommendations, source = asyncio.run(recommend(PARAMS, top_k=3))
+    assert source == "rule-based"
+    assert recommendations == recommend_rule_based(PARAMS, top_k=3)
+    assert stats.counts["rule_based_gemini_disabled"] == 1
+
+
+def test_gemini_within_the_deadline_wins(monkeypatch, stats):
+    _use(monkeypatch, FakeGemini(delay=0.01))
+    assert asyncio.run(recommend(PARAMS)) == (GEMINI_ANSWER, "gemini")
+    snapshot = stats.snapshot()
+    assert snapshot["gemini"] == 1
+    assert snapshot["gemini_win_ratio"] == 1.0
+
+
+@pytest.mark.parametrize("result", [None, [], RuntimeError("bad answer")])
+def test_failed_or_empty_gemini_falls_back(monkeypatch, stats, result):
+    _use(monkeypatch, FakeGemini(delay=0.01, result=result))
+    recommendations, source = asyncio.run(recommend(PARAMS))
+    assert source == "rule-based"
+    assert recommendations == recommend_rule_based(PARAMS)
+    assert stats.counts["rule_based_gemini_failed"] == 1
+
+
+def test_deadline_returns_rule_based_and_lets_gemini_finish(monkeypatch, stats):
+    gemini = _use(monkeypatch, FakeGemini(delay=0.3), cache_late=True)
+
+    async def run():
+        started = time.monotonic()
+        answer = await recommend(PARAMS)
+        elapsed = time.monotonic() - started
+        late = set(crop_recommender._late_gemini_calls)
+        await asyncio.gather(*late)
+        # Done callbacks run on the next loop iteration
+        await asyncio.sleep(0)
+        return answer, elapsed, late
+
+    (recommendations, source), elapsed, late = asyncio.run(run())
+    assert source == "rule-based"
+    assert elapsed < 0.25
+    assert len(late) == 1
+    assert gemini.finished
+    assert not crop_recommender._late_gemini_calls
+    assert stats.counts["rule_based_deadline"] == 1
+    assert stats.counts["late_gemini_cached"] == 1
+
+
+def test_late_gemini_failure_is_counted(monkeypatch, stats):
+    _use(monkeypatch, FakeGemini(delay=0.2, result=None), cache_late=True)
+
+    async def run():
+        await recommend(PARAMS)
+        await asyncio.gather(*crop_recommender._late_gemini_calls)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert stats.counts["late_gemini_failed"] == 1
+
+
+def test_deadline_cancels_gemini_when_late_answers_are_not_cached(monkeypatch, stats):
+    gemini = _use(monkeypatch, FakeGemini(delay=0.3), cache_late=False)
+
+    async def run():
+        answer = await recommend(PARAMS)
+        await asyncio.sleep(0.01)
+        return answer
+
+    assert asyncio.run(run())[1] == "rule-based"
+    assert gemini.cancelled
+    assert not crop_recommender._late_gemini_calls
+
+
+def test_cancelled_request_cancels_gemini(monkeypatch, stats):
+    gemini = _use(monkeypatch, FakeGemini(delay=0.3))
+
+    async def run():
+        request = asyncio.create_task(recommend(PARAMS))
+        await asyncio.sleep(0.02)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert gemini.cancelled
+    assert sum(stats.counts.values()) == 0
@@ -0,0 +1,62 @@
+# tests/test_listing_search.py
+
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from helpers.listing_search import ListingSearchFilters, build_search_query
+
+
+def _sql(q=None, limit=20, offset=0, **filters) -> str:
+    """The query as the search route's asyncpg engine would send it, values inlined."""
+    query = build_search_query(q, ListingSearchFilters(**filters), limit, offset)
+    return " ".join(str(query.compile(dialect=asyncpg_dialect(), compile_kwargs={"literal_binds": True})).split())
+
+
+def test_no_text_lists_active_listings_newest_first():
+    sql = _sql()
+    assert "crop_lists.status = 'active'" in sql
+    assert "@@" not in sql and "word_similarity" not in sql
+    assert "ORDER BY crop_lists.created_at DESC, crop_lists.id DESC" in sql
+    assert sql.endswith("LIMIT 20 OFFSET 0")
+
+
+def test_blank_text_is_treated_as_no_text():
+    assert _sql("   ") == _sql()
+
+
+def test_filters_become_where_clauses():
+    sql = _sql(min_price=Decimal("10.50"), max_price=Decimal("99"),
+               harvest_from=date(2026, 1, 1), harvest_to=date(2026, 6, 30))
+    assert "crop_lists.expected_price_per_unit >= 10.50" in sql
+    assert "crop_lists.expected_price_per_unit <= 99" in sql
+    assert "crop_lists.harvest_date >= '2026-01-01'" in sql
+    assert "crop_lists.harvest_date <= '2026-06-30'" in sql
+
+
+def test_unset_filters_are_left_out():
+    sql = _sql()
+    for column in ("expected_price_per_unit", "harvest_date >=", "soil_type"):
+        assert f"crop_lists.{column}" not in sql.split("WHERE", 1)[1]
+
+
+def test_soil_type_matches_case_insensitively():
+    sql = _sql(soil_type="  Black ")
+    assert "lower(crop_lists.soil_type) = 'black'" in sql
+
+
+def test_text_search_combines_full_text_and_trigram_matches():
+    sql = _sql("tomatos", limit=5, offset=10)
+    assert "crop_lists.search_vector @@ websearch_to_tsquery('simple'::regconfig, 'tomatos')" in sql
+    for column in ("crop_type", "farming_practice", "location"):
+        assert f"'tomatos' <% crop_lists.{column}" in sql
+    assert "ts_rank_cd(crop_lists.search_vector" in sql
+    assert "greatest(" in sql
+    assert "ORDER BY rank DESC, crop_lists.id DESC" in sql
+    assert sql.endswith("LIMIT 5 OFFSET 10")
+
+
+def test_text_is_trimmed_and_quoted():
+    sql = _sql("  o'neil farm ")
+    assert "websearch_to_tsquery('simple'::regconfig, 'o''neil farm')" in sql
@@ -0,0 +1,116 @@
+# tests/test_llm_gateway.py
+
+import asyncio
+import json
+
+import pytest
+
+from services.llm_gateway import FakeBackend, LLMGateway, LLMUnavailable
+
+
+class CountingBackend(FakeBackend):
+    """FakeBackend that counts calls and fails the first `failures` of them."""
+    def __init__(self, latency_ms: float = 0.0, failures: int = 0, responses=None):
+        super().__init__(latency_ms, responses)
+        self.calls = 0
+        self.failures = failures
+
+    async def generate(self, model, contents, timeout, purpose):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("upstream down")
+        return await super().generate(model, contents, timeout, purpose)
+
+
+def _gateway(backend, max_attempts: int = 3) -> LLMGateway:
+    return LLMGateway(backend, max_concurrency=4, timeout=5, max_attempts=max_attempts,
+                      retry_base_delay=0, cache_maxsize=16, cache_ttl=60)
+
+
+def test_identical_prompts_share_one_call():
+    async def run():
+        backend = CountingBackend(latency_ms=100)
+        gateway = _gateway(backend)
+        results = await asyncio.gather(*(gateway.generate("same prompt", purpose="test") for _ in range(3)))
+        return backend, gateway, results
+
+    backend, gateway, results = asyncio.run(run())
+    assert backend.calls == 1
+    assert results == ["OK"] * 3
+    assert gateway.stats()["purposes"]["test"]["coalesced"] == 2
+
+
+def test_waiter_survives_cancelled_leader():
+    async def run():
+        backend = CountingBackend(latency_ms=200)
+        gateway = _gateway(backend)
+        leader = asyncio.create_task(gateway.generate("same prompt", purpose="test"))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(gateway.generate("same prompt", purpose="test"))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        result = await asyncio.wait_for(waiter, timeout=5)
+        return backend, leader, result
+
+    backend, leader, result = asyncio.run(run())
+    assert leader.cancelled()
+    assert result == "OK"
+    # The waiter made the call again rather than inheriting the cancellation
+    assert backend.calls == 2
+
+
+def test_cancelled_waiter_does_not_cancel_leader():
+    async def run():
+        gateway = _gateway(CountingBackend(latency_ms=200))
+        leader = asyncio.create_task(gateway.generate("same prompt", purpose="test"))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(gateway.generate("same prompt", purpose="test"))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        return waiter, await asyncio.wait_for(leader, timeout=5)
+
+    waiter, result = asyncio.run(run())
+    assert waiter.cancelled()
+    assert result == "OK"
+
+
+def test_failures_are_retried():
+    backend = CountingBackend(failures=2)
+    gateway = _gateway(backend)
+    assert asyncio.run(gateway.generate("prompt", purpose="test")) == "OK"
+    stats = gateway.stats()["purposes"]["test"]
+    assert backend.calls == 3
+    assert (stats["errors"], stats["retries"]) == (2, 2)
+
+
+def test_unavailable_after_every_attempt_fails():
+    backend = CountingBackend(failures=10)
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(_gateway(backend, max_attempts=2).generate("prompt", purpose="test"))
+    assert backend.calls == 2
+
+
+def test_unparseable_answers_are_retried_and_not_cached():
+    answers = iter(["not json", json.dumps({"ok": True})])
+    backend = CountingBackend(responses={"test": lambda prompt: next(answers)})
+    gateway = _gateway(backend)
+
+    assert asyncio.run(gateway.generate("prompt", purpose="test", parse=json.loads)) == {"ok": True}
+    assert backend.calls == 2
+    assert asyncio.run(gateway.generate("prompt", purpose="test", parse=json.loads)) == {"ok": True}
+    assert backend.calls == 2
+
+
+def test_answers_are_cached_by_model_and_prompt():
+    backend = CountingBackend()
+    gateway = _gateway(backend)
+
+    async def run():
+        await gateway.generate("prompt", purpose="test")
+        await gateway.generate("prompt", purpose="test")
+        await gateway.generate("prompt", purpose="test", model="other-model")
+        await gateway.generate("prompt", purpose="test", use_cache=False)
+
+    asyncio.run(run())
+    assert backend.calls == 3
+    assert gateway.stats()["purposes"]["test"]["cache_hits"] == 1
@@ -0,0 +1,67 @@
+# tests/test_micro_batcher.py
+
+import asyncio
+import time
+
+import numpy as np
+
+from helpers.bounded_executor import BoundedExecutor
+from services.micro_batcher import MicroBatcher
+from services.prediction_cache import PredictionCache
+
+
+class SlowModel:
+    version = "test"
+
+    def __init__(self):
+        self.forwarded = 0
+
+    def preprocess(self, image_bytes: bytes) -> np.ndarray:
+        return np.zeros((224, 224, 3), dtype=np.uint8)
+
+    def predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        self.forwarded += len(batch)
+        time.sleep(0.2)
+        return np.tile([0.3, 0.7], (len(batch), 1))
+
+    def format_prediction(self, preds) -> dict:
+        return {"disease": "b", "confidence": float(preds[1])}
+
+
+def _batcher(model) -> MicroBatcher:
+    return MicroBatcher(
+        "test", model, BoundedExecutor("test", max_workers=2, max_pending=8),
+        max_batch_size=1, max_wait_ms=1, max_queue=8,
+        cache=PredictionCache(memory_maxsize=8, ttl=60, disk=None),
+    )
+
+
+def test_duplicate_survives_cancelled_leader():
+    async def run():
+        model = SlowModel()
+        batcher = _batcher(model)
+        leader = asyncio.create_task(batcher.predict(b"same photo"))
+        await asyncio.sleep(0.05)
+        follower = asyncio.create_task(batcher.predict(b"same photo"))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        result = await asyncio.wait_for(follower, timeout=5)
+        await batcher.stop()
+        return leader, result
+
+    leader, result = asyncio.run(run())
+    assert leader.cancelled()
+    assert result == {"disease": "b", "confidence": 0.7}
+
+
+def test_duplicates_share_one_forward_pass():
+    async def run():
+        model = SlowModel()
+        batcher = _batcher(model)
+        results = await asyncio.gather(*(batcher.predict(b"same photo") for _ in range(3)))
+        await batcher.stop()
+        return model, results
+
+    model, results = asyncio.run(run())
+    assert model.forwarded == 1
+    assert all(r == results[0] for r in results)
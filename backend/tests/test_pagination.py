@@ -0,0 +1,76 @@
+# tests/test_pagination.py
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from database.postgresConn import Base
+from helpers.pagination import NEXT_CURSOR_HEADER, PageParams, decode_cursor, encode_cursor, finish_page, paginate
+from models.all_model import User, UserRole
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[User.__table__])
+    session = sessionmaker(bind=engine)()
+    start = datetime(2026, 1, 1, 12, 0)
+    # Pairs of rows share a created_at, so the id tie-break matters
+    session.add_all(
+        User(id=i, email=f"u{i}@x.in", hashed_password="x", role=UserRole.farmer,
+             created_at=start + timedelta(minutes=i // 2))
+        for i in range(1, 12)
+    )
+    session.commit()
+    yield session
+    session.close()
+
+
+def _read_all(db, limit, descending=True):
+    ids, cursor, pages = [], None, 0
+    while True:
+        page = PageParams(limit=limit, cursor=decode_cursor(cursor) if cursor else None)
+        response = Response()
+        rows = finish_page(db.scalars(paginate(select(User), User, page, descending)), page, response)
+        ids += [row.id for row in rows]
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return ids, pages
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 3, 4, 5, 6, 7, 891011)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(datetime(2026, 1, 1), 1)[:-3], "WyJ4IiwgMV0"])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(cursor)
+    assert e.value.status_code == 400
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 11, 50])
+def test_pages_cover_every_row_once_newest_first(db, limit):
+    ids, pages = _read_all(db, limit)
+    assert ids == sorted(range(1, 12), key=lambda i: (i // 2, i), reverse=True)
+    assert pages == -(-11 // limit)
+
+
+def test_pages_ascending(db):
+    ids, _ = _read_all(db, 4, descending=False)
+    assert ids == sorted(range(1, 12), key=lambda i: (i // 2, i))
+
+
+def test_no_cursor_on_last_page(db):
+    page = PageParams(limit=11, cursor=None)
+    response = Response()
+    rows = finish_page(db.scalars(paginate(select(User), User, page)), page, response)
+    assert len(rows) == 11
+    assert NEXT_CURSOR_HEADER not in response.headers
@@ -0,0 +1,122 @@
+# tests/test_recommendation_cache.py
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from helpers import recommendation_cache as module
+from helpers.recommendation_cache import RecommendationCache, fingerprint, listing_features, value_bracket
+from models.all_model import TemplateRecommendationCache
+
+ANSWER = {"template_name": "Simple Supply Contract", "reason": "Quick payment."}
+
+
+def _listing(**overrides):
+    fields = {"crop_type": "Tomato", "farming_practice": "Organic", "soil_type": "Black", "unit": "kg"}
+    return SimpleNamespace(**{**fields, **overrides})
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    TemplateRecommendationCache.__table__.create(engine)
+    sessions = sessionmaker(bind=engine)
+    monkeypatch.setattr(module, "SessionLocal", sessions)
+    return sessions
+
+
+def _cache(**overrides) -> RecommendationCache:
+    options = {"maxsize": 100, "ttl": 3600, "memory_maxsize": 16, "memory_ttl": 60, "prune_every": 100}
+    return RecommendationCache(**{**options, **overrides})
+
+
+def test_value_brackets():
+    assert value_bracket(Decimal("0")) == 0
+    assert value_bracket(Decimal("9999.99")) == 0
+    # A value equal to a bound falls in the next bracket up
+    assert value_bracket(Decimal("10000")) == 1
+    assert value_bracket(Decimal("2000000")) == len(module.VALUE_BRACKETS)
+
+
+def test_near_identical_listings_share_a_fingerprint():
+    a = listing_features(_listing(), Decimal("20000"), "v1")
+    b = listing_features(_listing(crop_type="  tomato ", farming_practice="ORGANIC"), Decimal("45000"), "v1")
+    assert fingerprint(a) == fingerprint(b)
+
+
+def test_fingerprint_separates_brackets_versions_and_fields():
+    base = fingerprint(listing_features(_listing(), Decimal("20000"), "v1"))
+    assert fingerprint(listing_features(_listing(), Decimal("60000"), "v1")) != base
+    assert fingerprint(listing_features(_listing(), Decimal("20000"), "v2")) != base
+    assert fingerprint(listing_features(_listing(soil_type="Red"), Decimal("20000"), "v1")) != base
+
+
+def test_missing_fields_normalize_to_unspecified():
+    features = listing_features(_listing(farming_practice=None, soil_type="   "), Decimal("1"), "v1")
+    assert features["farming_practice"] == features["soil_type"] == "unspecified"
+
+
+def test_miss_then_memory_hit(sessions):
+    cache = _cache()
+    assert cache.get("k") is None
+    cache.set("k", ANSWER, {"crop_type": "tomato"})
+    assert cache.get("k") == ANSWER
+    stats = cache.stats()
+    assert (stats["misses"], stats["memory_hits"], stats["db_hits"], stats["stores"]) == (1, 1, 0, 1)
+
+
+def test_returned_dicts_are_copies(sessions):
+    cache = _cache()
+    cache.set("k", ANSWER, {})
+    cache.get("k")["template_name"] = "changed"
+    assert cache.get("k") == ANSWER
+
+
+def test_database_tier_is_shared_and_counts_hits(sessions):
+    _cache().set("k", ANSWER, {"crop_type": "tomato"})
+    # Another worker process: empty memory tier, same table
+    other = _cache()
+    assert other.get("k") == ANSWER
+    assert other.get("k") == ANSWER
+    stats = other.stats()
+    assert (stats["db_hits"], stats["memory_hits"]) == (1, 1)
+    with sessions() as db:
+        assert db.scalar(select(TemplateRecommendationCache.hit_count)) == 1
+
+
+def test_expired_rows_are_misses(sessions):
+    _cache(ttl=-1).set("k", ANSWER, {})
+    cache = _cache()
+    assert cache.get("k") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_prune_drops_expired_and_least_recently_used(sessions):
+    cache = _cache(maxsize=2, prune_every=4)
+    cache.set("expired", ANSWER, {})
+    with sessions() as db:
+        row = db.get(TemplateRecommendationCache, "expired")
+        row.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.commit()
+    for key in ("oldest", "newer", "newest"):
+        cache.set(key, ANSWER, {})
+    with sessions() as db:
+        remaining = set(db.scalars(select(TemplateRecommendationCache.fingerprint)))
+    assert remaining == {"newer", "newest"}
+    assert cache.stats()["pruned"] == 2
+
+
+def test_database_errors_degrade_to_misses(monkeypatch):
+    # No table: every query fails
+    monkeypatch.setattr(module, "SessionLocal", sessionmaker(bind=create_engine("sqlite://")))
+    cache = _cache()
+    assert cache.get("k") is None
+    cache.set("k", ANSWER, {})
+    assert cache.stats()["errors"] == 2
+    # The memory tier still answers
+    assert cache.get("k") == ANSWER
@@ -0,0 +1,112 @@
+# tests/test_ttl_cache.py
+
+import threading
+
+import pytest
+
+from helpers import ttl_cache
+from helpers.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ttl_cache, "time", clock)
+    return clock
+
+
+def test_hit_and_miss_counters():
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("b", "default") == "default"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 2, round(1 / 3, 4))
+
+
+def test_falsy_values_are_hits():
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("zero", 0)
+    cache.set("none", None)
+    assert cache.get("zero", "missing") == 0
+    assert cache.get("none", "missing") is None
+    assert cache.stats()["hits"] == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    clock.now += 10
+    assert cache.get("a") == 1
+    clock.now += 0.001
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["expirations"] == 1
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("short", 1, ttl=1)
+    cache.set("long", 2, ttl=100)
+    clock.now += 50
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+
+
+def test_set_refreshes_expiry(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    clock.now += 8
+    cache.set("a", 2)
+    clock.now += 8
+    assert cache.get("a") == 2
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(maxsize=3, ttl=60)
+    for key in "abc":
+        cache.set(key, key)
+    # Reading "a" makes "b" the least recently used
+    cache.get("a")
+    cache.set("d", "d")
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+    assert cache.stats()["evictions"] == 1
+    assert len(cache) == 3
+
+
+def test_pop_and_clear():
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "gone") == "gone"
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get("b") is None
+
+
+def test_concurrent_writers_respect_maxsize():
+    cache = TTLCache(maxsize=50, ttl=60)
+
+    def write(offset):
+        for i in range(500):
+            cache.set(offset + i, i)
+            cache.get(offset + i // 2)
+
+    threads = [threading.Thread(target=write, args=(n * 1000,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 50
+    assert cache.stats()["evictions"] == 8 * 500 - 50
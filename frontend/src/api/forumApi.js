@@ -1,6 +1,7 @@
 // // src/api/forumApi.js
 
 import { API_BASE_URL } from "./apiConfig";
+import { fetchAllPages } from "./pagination";
 
 export const forumApi = {
   // Get all posts (with optional category and search)
@@ -11,7 +12,7 @@ export const forumApi = {
     if (category && category !== 'All') params.append('category', category);
     if (query) params.append('q', query);
 
-    const response = await fetch(`${API_BASE_URL}/api/forum/posts?${params.toString()}`, {
+    const response = await fetchAllPages(`${API_BASE_URL}/api/forum/posts?${params.toString()}`, {
       headers: { Authorization: `Bearer ${token}` } // <-- Always use JWT
     });
 
@@ -0,0 +1,27 @@
+// src/api/pagination.js
+
+// List endpoints return one page at a time; the cursor for the next page is in this header
+export const NEXT_CURSOR_HEADER = "X-Next-Cursor";
+const PAGE_SIZE = 200; // the backend's maximum
+
+// Drop-in for fetch() on a paginated list endpoint: follows the cursor through every page
+// and resolves to a Response whose JSON body is the whole list. A failed page is returned as is.
+export const fetchAllPages = async (url, options = {}) => {
+  const items = [];
+  let cursor = null;
+  do {
+    const pageUrl = new URL(url);
+    pageUrl.searchParams.set("limit", PAGE_SIZE);
+    if (cursor) pageUrl.searchParams.set("cursor", cursor);
+
+    const response = await fetch(pageUrl.toString(), options);
+    if (!response.ok) return response;
+    items.push(...(await response.json()));
+    cursor = response.headers.get(NEXT_CURSOR_HEADER);
+  } while (cursor);
+
+  return new Response(JSON.stringify(items), {
+    status: 200,
+    headers: { "Content-Type": "application/json" },
+  });
+};
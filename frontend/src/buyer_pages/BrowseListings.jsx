@@ -15,6 +15,7 @@ import {
 } from "lucide-react";
 import { useAuthStore } from "../authStore";
 import { API_BASE_URL } from "../api/apiConfig";
+import { fetchAllPages } from "../api/pagination";
 
 // --- 2. NEW HELPER COMPONENT for the modal ---
 // This reusable component creates the nice icon + text row
@@ -246,7 +247,7 @@ const BrowseListings = () => {
           url.searchParams.append("location", location);
         }
 
-        const response = await fetch(url.toString(), {
+        const response = await fetchAllPages(url.toString(), {
           headers: {
             Authorization: `Bearer ${token}`,
           },
@@ -18,6 +18,7 @@ import {
 import { useAuthStore } from "../authStore";
 import NegotiationChatModal from "../farmer_business_components/NegotiationChatModal";
 import { API_BASE_URL } from "../api/apiConfig";
+import { fetchAllPages } from "../api/pagination";
 
 // --- HELPER COMPONENTS (Unchanged) ---
 
@@ -164,9 +165,9 @@ const BuyerContractsPage = () => {
     try {
       const headers = { Authorization: `Bearer ${token}` };
 
-      const negotiatingPromise = fetch(`${API_BASE_URL}/api/contracts/my-contracts?status=negotiating`, { headers });
+      const negotiatingPromise = fetchAllPages(`${API_BASE_URL}/api/contracts/my-contracts?status=negotiating`, { headers });
       const ongoingPromise = fetch(`${API_BASE_URL}/api/contracts/ongoing`, { headers });
-      const rejectedPromise = fetch(`${API_BASE_URL}/api/contracts/my-contracts?status=rejected`, { headers });
+      const rejectedPromise = fetchAllPages(`${API_BASE_URL}/api/contracts/my-contracts?status=rejected`, { headers });
 
       const responses = await Promise.all([negotiatingPromise, ongoingPromise, rejectedPromise]);
 
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useCallback } from 'react';
 import { PlusCircle, X, Loader2 as Loader } from 'lucide-react';
 import { useAuthStore } from '../authStore';
 import { Link } from 'react-router-dom'; // Import Link
+import { fetchAllPages } from '../api/pagination';
 
 // --- Add Funds Modal Component (Updated to handle live API) ---
 const AddFundsModal = ({ onClose, onAddFunds }) => {
@@ -168,7 +169,7 @@ const Payments = () => {
       // --- FIX 1: Corrected API path for transactions ---
       const [walletRes, transRes] = await Promise.all([
         fetch(`${API_BASE_URL}/api/wallet/me`, { headers }),
-        fetch(`${API_BASE_URL}/api/wallet/me/transactions`, { headers }) // <-- ADDED /me/
+        fetchAllPages(`${API_BASE_URL}/api/wallet/me/transactions`, { headers }) // <-- ADDED /me/
       ]);
 
       if (!walletRes.ok || !transRes.ok) {
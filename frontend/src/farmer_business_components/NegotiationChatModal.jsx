@@ -3,9 +3,10 @@ import React, { useState, useEffect, useRef } from 'react';
 import { useAuthStore } from '../authStore';
 import { X, Send, Loader2, Handshake } from 'lucide-react';
 import { API_BASE_URL } from '../api/apiConfig';
+import { fetchAllPages } from '../api/pagination';
 
 const fetchNegotiationHistory = async (contractId, token) => {
-    const response = await fetch(`${API_BASE_URL}/api/contracts/${contractId}/negotiation-history`, {
+    const response = await fetchAllPages(`${API_BASE_URL}/api/contracts/${contractId}/negotiation-history`, {
         headers: { Authorization: `Bearer ${token}` },
     });
     if (!response.ok) throw new Error("Failed to fetch chat history.");
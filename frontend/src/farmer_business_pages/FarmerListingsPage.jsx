@@ -3,6 +3,7 @@ import { useNavigate, Outlet } from 'react-router-dom';
 import { useAuthStore } from '../authStore'; // <-- 1. Import Auth Store
 import { Loader2, Inbox, Sparkles, Calendar, MapPin, Package } from 'lucide-react'; // <-- 2. Import Icons
 import { API_BASE_URL } from '../api/apiConfig';
+import { fetchAllPages } from '../api/pagination';
 
 // --- Main Component ---
 export default function FarmerListingsPage() {
@@ -30,7 +31,7 @@ export default function FarmerListingsPage() {
 
     try {
       // This route fetches ALL active listings
-      const response = await fetch(`${API_BASE_URL}/api/croplists/`, {
+      const response = await fetchAllPages(`${API_BASE_URL}/api/croplists/`, {
         headers: { Authorization: `Bearer ${token}` },
       });
 
@@ -17,6 +17,7 @@ import {
 } from 'lucide-react';
 import { useAuthStore } from '../authStore';
 import { API_BASE_URL} from '../api/apiConfig';
+import { fetchAllPages } from '../api/pagination';
 // --- MODAL COMPONENTS ---
 
 const WithdrawFundsModal = ({ onClose, onWithdraw, currentBalance }) => {
@@ -341,7 +342,7 @@ const FinancePage = () => {
             const headers = { Authorization: `Bearer ${token}` };
             const [walletRes, transRes] = await Promise.all([
                 fetch(`${API_BASE_URL}/api/wallet/me`, { headers }),
-                fetch(`${API_BASE_URL}/api/wallet/me/transactions`, { headers })
+                fetchAllPages(`${API_BASE_URL}/api/wallet/me/transactions`, { headers })
             ]);
             if (!walletRes.ok || !transRes.ok) throw new Error("Failed to load payment data. Please try again later.");
             const walletData = await walletRes.json();